@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+モジュールの import 時間のベンチマーク
+
+モジュールごとに新しいインタープリタを `python -X importtime` で起動し、
+import にかかった累積時間と pygame が読み込まれたかどうかを表示する。
+
+    python benchmarks/import_time.py --repeat 5
+    python benchmarks/import_time.py number_drive.plate_sampler number_drive.game
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# 既定で計測するモジュール（描画なしで使う層 → ゲーム本体の順）
+DEFAULT_MODULES = [
+    "number_drive.config",
+    "number_drive.number_plate",
+    "number_drive.difficulty",
+    "number_drive.plate_sampler",
+    "number_drive.tools.difficulty_estimator",
+    "number_drive.game",
+]
+
+# -X importtime の出力行（"import time: self [us] | cumulative | imported package"）
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module: str):
+    """
+    新しいインタープリタでモジュールを import し、累積時間を計測する
+
+    Args:
+        module: モジュール名
+
+    Returns:
+        (import の累積時間（マイクロ秒）, pygame が読み込まれたかどうか)
+    """
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    code = f"import sys, {module}; print('pygame' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    cumulative = 0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and match.group(4) == module:
+            cumulative = int(match.group(2))
+    return cumulative, result.stdout.strip().splitlines()[-1] == "True"
+
+
+def parse_args(argv=None):
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description="モジュールの import 時間を計測する")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="計測するモジュール")
+    parser.add_argument("--repeat", type=int, default=5, help="モジュールごとの計測回数（中央値を表示）")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """メイン関数"""
+    args = parse_args(argv)
+    print(f"{'module':<42} {'median':>10} {'min':>10}  pygame")
+    for module in args.modules:
+        samples = []
+        loads_pygame = False
+        for _ in range(args.repeat):
+            cumulative, loads_pygame = measure(module)
+            samples.append(cumulative)
+        print(f"{module:<42} {statistics.median(samples) / 1000:>8.1f}ms {min(samples) / 1000:>8.1f}ms  "
+              f"{'yes' if loads_pygame else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+描画方式（サーフェスとテクスチャ）のベンチマーク
+
+同じ画面のコードを --display window（pygame.Surface への転送と display.flip）と
+--display texture（pygame._sdl2.video のテクスチャのコピーと present）で描画し、
+画面ごとの1フレームの描画時間を比較する。方式ごとに新しいインタープリタで計測する。
+
+    python benchmarks/render_backend.py --frames 600
+    SDL_VIDEODRIVER=x11 python benchmarks/render_backend.py   # 実際のウィンドウで計測
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+BACKENDS = ["window", "texture"]
+SCENES = ["title", "prepare", "playing", "paused", "result"]
+
+
+def enter_scene(game, scene: str):
+    """
+    計測する画面の状態にする
+
+    Args:
+        game: ゲームのインスタンス
+        scene: 画面の名前（SCENES のいずれか）
+    """
+    from number_drive.game_enums import GameMode, GameState
+
+    game.game_mode = GameMode.HARD
+    if scene == "title":
+        game.change_state(GameState.TITLE)
+    elif scene == "prepare":
+        game.change_state(GameState.PREPARE)
+    elif scene in ("playing", "paused"):
+        game.change_state(GameState.PLAYING)
+        game.game_screen.session.current_input = "123"
+        if scene == "paused":
+            game.game_screen.show_modal = True
+            game.game_screen._setup_modal_buttons()
+    else:
+        game.clear_time = 42.5
+        game.change_state(GameState.RESULT)
+
+
+def run_backend(display: str, frames: int, warmup: int) -> dict:
+    """
+    1つの描画方式で各画面を描画して時間を計る（子プロセスで実行される）
+
+    Args:
+        display: --display に指定する描画方式
+        frames: 画面ごとに計測するフレーム数
+        warmup: 計測前に描画するフレーム数（キャッシュやテクスチャの作成を除くため）
+
+    Returns:
+        画面ごとの1フレームの描画時間（ミリ秒）と転送数
+    """
+    import pygame
+    from number_drive.game import Game
+
+    pygame.init()
+    game = Game(seed=1, display_mode=display)
+    results = {"display": game.display_mode, "scenes": {}}
+    for scene in SCENES:
+        enter_scene(game, scene)
+        for _ in range(warmup):
+            game.render()
+        stats = getattr(game.screen, "stats", None)
+        uploads_before = dict(stats) if stats else None
+
+        samples = []
+        for _ in range(frames):
+            start = time.perf_counter()
+            game.render()
+            samples.append((time.perf_counter() - start) * 1000)
+
+        samples.sort()
+        scene_result = {
+            "mean_ms": statistics.fmean(samples),
+            "median_ms": statistics.median(samples),
+            "p95_ms": samples[int(len(samples) * 0.95) - 1],
+        }
+        if stats:
+            for name, value in stats.items():
+                scene_result[f"{name}_per_frame"] = (value - uploads_before[name]) / frames
+        results["scenes"][scene] = scene_result
+    pygame.quit()
+    return results
+
+
+def parse_args(argv=None):
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description="サーフェスとテクスチャの描画方式を比較する")
+    parser.add_argument("--frames", type=int, default=600, help="画面ごとに計測するフレーム数")
+    parser.add_argument("--warmup", type=int, default=30, help="計測前に描画するフレーム数")
+    parser.add_argument("--backend", choices=BACKENDS, help=argparse.SUPPRESS)  # 子プロセス用
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """メイン関数"""
+    args = parse_args(argv)
+    if args.backend:
+        print(json.dumps(run_backend(args.backend, args.frames, args.warmup)))
+        return
+
+    results = {}
+    for backend in BACKENDS:
+        completed = subprocess.run(
+            [sys.executable, __file__, "--backend", backend, "--frames", str(args.frames),
+             "--warmup", str(args.warmup)],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        results[backend] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    print(f"video driver: {os.environ['SDL_VIDEODRIVER']}, frames per scene: {args.frames}")
+    for backend, result in results.items():
+        if result["display"] != backend:
+            print(f"Warning: {backend} is not available, measured {result['display']} instead")
+    print(f"{'scene':<10} {'surface ms':>11} {'texture ms':>11} {'speedup':>8}  {'uploads/frame':>13}")
+    for scene in SCENES:
+        surface = results["window"]["scenes"][scene]
+        texture = results["texture"]["scenes"][scene]
+        uploads = texture.get("uploads_per_frame", 0.0) + texture.get("shape_uploads_per_frame", 0.0)
+        print(f"{scene:<10} {surface['median_ms']:>11.3f} {texture['median_ms']:>11.3f} "
+              f"{surface['median_ms'] / texture['median_ms']:>7.2f}x  {uploads:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
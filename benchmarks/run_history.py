@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+プレイの記録の集計（number_drive.tools.run_report）のベンチマーク
+
+架空のプレイの記録を作り、JSON Lines を1行ずつ読む集計・列ごとのバイナリへの変換・
+memmap での集計の時間を計る。大量の件数は列ごとのバイナリを直接作って計る。
+
+    python benchmarks/run_history.py --runs 100000 --column-runs 20000000
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from number_drive.tools import run_report  # noqa: E402
+
+QUESTIONS_PER_RUN = 10
+
+
+def write_jsonl(path: Path, runs: int, seed: int):
+    """
+    架空のプレイの記録を JSON Lines で書き出す
+
+    Args:
+        path: 出力先
+        runs: プレイの数（1プレイにつき QUESTIONS_PER_RUN 問の記録も書く）
+        seed: 乱数のシード
+    """
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for run in range(runs):
+            run_id = f"{run:032x}"
+            total = 0.0
+            wrong_total = 0
+            for _ in range(QUESTIONS_PER_RUN):
+                seconds = rng.lognormvariate(1.0, 0.4)
+                wrong = int(rng.random() < 0.15)
+                total += seconds
+                wrong_total += wrong
+                f.write(json.dumps({
+                    "t": "q", "run": run_id, "p": 0, "op": rng.choice(run_report.OPERATIONS),
+                    "a": rng.randint(10, 99), "b": rng.randint(0, 99), "sec": round(seconds, 3), "wrong": wrong
+                }, separators=(",", ":")) + "\n")
+            f.write(json.dumps({
+                "t": "run", "run": run_id, "ts": 0, "day": f"2026-10-{run % 28 + 1:02d}",
+                "mode": rng.choice(run_report.MODES), "type": "STANDARD", "time": round(total, 3),
+                "answered": QUESTIONS_PER_RUN, "questions": QUESTIONS_PER_RUN, "wrong": wrong_total, "winner": None
+            }, separators=(",", ":")) + "\n")
+
+
+def write_columns(directory: Path, runs: int, seed: int):
+    """
+    架空のプレイの記録を列ごとのバイナリで直接書き出す（export_columns と同じ形式）
+
+    Args:
+        directory: 出力先
+        runs: プレイの数
+        seed: 乱数のシード
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    directory.mkdir(parents=True, exist_ok=True)
+    for prefix, columns, rows in (("runs", run_report.RUN_COLUMNS, runs),
+                                  ("questions", run_report.QUESTION_COLUMNS, runs * QUESTIONS_PER_RUN)):
+        files = {name: open(directory / f"{prefix}.{name}.bin", "wb") for name in columns}
+        for start in range(0, rows, run_report.CHUNK_ROWS):
+            n = min(run_report.CHUNK_ROWS, rows - start)
+            if prefix == "runs":
+                values = {
+                    "mode": rng.integers(0, len(run_report.MODES), n), "type": np.zeros(n),
+                    "day": 20000 + rng.integers(0, 365, n), "time": rng.lognormal(3.3, 0.3, n),
+                    "questions": np.full(n, QUESTIONS_PER_RUN), "wrong": rng.poisson(1.5, n)
+                }
+            else:
+                values = {
+                    "op": rng.integers(0, len(run_report.OPERATIONS), n), "a": rng.integers(10, 100, n),
+                    "b": rng.integers(0, 100, n), "sec": rng.lognormal(1.0, 0.4, n), "wrong": rng.poisson(0.15, n)
+                }
+            for name, dtype in columns.items():
+                values[name].astype(dtype).tofile(files[name])
+        for f in files.values():
+            f.close()
+    meta = {
+        "runs": runs, "questions": runs * QUESTIONS_PER_RUN, "skipped": 0,
+        "run_columns": run_report.RUN_COLUMNS, "question_columns": run_report.QUESTION_COLUMNS,
+        "modes": run_report.MODES, "run_types": run_report.RUN_TYPES, "operations": run_report.OPERATIONS
+    }
+    with open(directory / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+def timed(label: str, records: int, function):
+    """処理を1回実行して時間と1秒あたりの件数を表示する"""
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.2f} s  {records / elapsed:>14,.0f} records/s")
+    return result
+
+
+def parse_args(argv=None):
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description="プレイの記録の集計時間を計る")
+    parser.add_argument("--runs", type=int, default=100000, help="JSON Lines で作るプレイの数")
+    parser.add_argument("--column-runs", type=int, default=2000000, help="列ごとのバイナリで作るプレイの数")
+    parser.add_argument("--seed", type=int, default=0, help="乱数のシード")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """メイン関数"""
+    args = parse_args(argv)
+    records = args.runs * (QUESTIONS_PER_RUN + 1)
+    column_records = args.column_runs * (QUESTIONS_PER_RUN + 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        log = tmp / "runs.jsonl"
+        write_jsonl(log, args.runs, args.seed)
+        print(f"{args.runs:,} runs ({records:,} records, {log.stat().st_size / 1e6:.1f} MB JSON Lines)")
+        streamed = timed("stream JSON Lines", records, lambda: run_report.summarize_files([str(log)]).to_dict())
+        timed("export columns", records,
+              lambda: run_report.export_columns(run_report.read_records([log]), tmp / "exported"))
+        mapped = timed("memmap columns", records, lambda: run_report.summarize_columns(tmp / "exported").to_dict())
+        for mode in run_report.MODES:
+            a, b = streamed["clear_time"][mode], mapped["clear_time"][mode]
+            print(f"  {mode:<8} p50 stream={a['p50']:.2f} memmap={b['p50']:.2f}  "
+                  f"mean stream={a['mean']:.3f} memmap={b['mean']:.3f}")
+
+        write_columns(tmp / "synthetic", args.column_runs, args.seed)
+        print(f"\n{args.column_runs:,} runs ({column_records:,} records) as columns")
+        timed("memmap columns", column_records, lambda: run_report.summarize_columns(tmp / "synthetic").to_dict())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+数字テキスト描画のベンチマーク
+
+グリフアトラスによる描画と pygame.font.Font.render による描画を比較する。
+
+    python benchmarks/text_render.py --iterations 5000
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pygame
+
+from number_drive.config import MEDIUM_FONT_SIZE, LARGE_FONT_SIZE, WHITE, MAIN_COLOR_PINK, get_font
+from number_drive.glyph_atlas import get_glyph_atlas
+
+
+def make_texts(iterations, changing_every_frame=False):
+    """
+    ゲーム中と同じ形式の文字列をフレームごとに作成する
+
+    通常は60FPSでのプレイを想定し、タイマーは0.1秒ごと、入力は0.5秒ごと、
+    問題数は5秒ごとに変わる。changing_every_frame を指定すると毎フレームすべて変わる。
+    """
+    texts = []
+    for frame in range(iterations):
+        if changing_every_frame:
+            texts.append((f"Time: {frame * 0.1:.1f}", f"Q: {frame % 10 + 1}/10", str(frame * 37 % 10000)))
+        else:
+            seconds = frame / 60
+            texts.append((f"Time: {seconds:.1f}", f"Q: {int(seconds // 5) % 10 + 1}/10", str(int(seconds * 2) * 37 % 10000)))
+    return texts
+
+
+def bench_font_render(screen, texts):
+    """Font.render で毎回ラスタライズして描画する"""
+    status_font = get_font(MEDIUM_FONT_SIZE)
+    input_font = get_font(LARGE_FONT_SIZE)
+    start = time.perf_counter()
+    for timer, question, answer in texts:
+        screen.blit(status_font.render(timer, True, WHITE), (30, 20))
+        screen.blit(status_font.render(question, True, WHITE), (600, 20))
+        screen.blit(input_font.render(answer, True, MAIN_COLOR_PINK), (350, 450))
+    return time.perf_counter() - start
+
+
+def bench_glyph_atlas(screen, texts):
+    """グリフアトラスから文字を転送して描画する"""
+    status_atlas = get_glyph_atlas(MEDIUM_FONT_SIZE, WHITE)
+    input_atlas = get_glyph_atlas(LARGE_FONT_SIZE, MAIN_COLOR_PINK)
+    start = time.perf_counter()
+    for timer, question, answer in texts:
+        status_atlas.blit(screen, timer, topleft=(30, 20))
+        status_atlas.blit(screen, question, topleft=(600, 20))
+        input_atlas.blit(screen, answer, topleft=(350, 450))
+    return time.perf_counter() - start
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="数字テキスト描画のベンチマーク")
+    parser.add_argument("--iterations", type=int, default=5000, help="描画するフレーム数")
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((800, 600))
+    texts = make_texts(args.iterations)
+    worst_texts = make_texts(args.iterations, changing_every_frame=True)
+
+    # アトラスの作成（起動時の1回分）とフォント読み込みは計測から除く
+    build_start = time.perf_counter()
+    get_glyph_atlas(MEDIUM_FONT_SIZE, WHITE)
+    get_glyph_atlas(LARGE_FONT_SIZE, MAIN_COLOR_PINK)
+    build_time = time.perf_counter() - build_start
+
+    per_frame = 1_000_000 / args.iterations
+    print(f"frames:           {args.iterations}")
+    print(f"atlas build:      {build_time * 1000:.2f} ms (once)")
+    for label, frame_texts in (("gameplay (60 FPS)", texts), ("every frame changes", worst_texts)):
+        font_time = bench_font_render(screen, frame_texts)
+        atlas_time = bench_glyph_atlas(screen, frame_texts)
+        print(f"[{label}]")
+        print(f"  Font.render:      {font_time * per_frame:.1f} us/frame")
+        print(f"  GlyphAtlas.blit:  {atlas_time * per_frame:.1f} us/frame")
+        print(f"  speedup:          {font_time / atlas_time:.2f}x")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
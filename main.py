@@ -2,18 +2,118 @@
 """
 NumberDrive! - ナンバープレートの数字を使った計算ゲーム
 """
+import argparse
 import sys
 import pygame
+from number_drive import audio
+from number_drive.config import NO_REPEAT_SESSIONS
 from number_drive.game import Game
+from number_drive.game_enums import RunType
+
+
+def parse_args(argv=None):
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description="NumberDrive! - ナンバープレートの数字を使った計算ゲーム")
+    parser.add_argument(
+        "--latency-report", metavar="PATH",
+        help="キー入力から表示までの遅延を計測し、終了時にJSONで書き出す"
+    )
+    parser.add_argument(
+        "--display", choices=["window", "scaled", "canvas", "texture"], default="window",
+        help="画面の出力方法（window: 等倍, scaled: SDLで拡大, canvas: 論理キャンバスを一度だけ拡大, "
+             "texture: SDLのレンダラーにテクスチャで描画）"
+    )
+    parser.add_argument(
+        "--fullscreen", action="store_true",
+        help="フルスクリーンで表示する（--display scaled/canvas/texture と組み合わせて使用）"
+    )
+    parser.add_argument(
+        "--seed", type=int,
+        help="乱数のシード（装飾や車の配置を固定する）"
+    )
+    parser.add_argument(
+        "--weighted-plates", action="store_true",
+        help="難易度ごとの目標分布に従って問題の数字を選ぶ"
+    )
+    parser.add_argument(
+        "--run-type", choices=["standard", "endless", "time-attack", "versus"], default="standard",
+        help="最初に選択しておくプレイの種類（タイトル画面の左右キーでも切り替えられる）"
+    )
+    parser.add_argument(
+        "--metrics-port", type=int, metavar="PORT",
+        help="計測値をPrometheus形式で http://127.0.0.1:PORT/metrics に公開する"
+    )
+    parser.add_argument(
+        "--profile-dir", metavar="DIR",
+        help="F12キーまたはSIGUSR1で取得したプロファイルの出力先（デフォルト: ~/.cache/number_drive/profiles）"
+    )
+    parser.add_argument(
+        "--profile-seconds", type=float, default=10.0,
+        help="1回のプロファイル取得の時間（秒）"
+    )
+    parser.add_argument(
+        "--low-memory", action="store_true",
+        help="省メモリモード（車の画像を画面間で共有し、背景の装飾を8ビットで保持する）"
+    )
+    parser.add_argument(
+        "--memory-report", metavar="PATH",
+        help="画面ごとのサーフェスのメモリ使用量とフレームごとの一時サーフェスの最大量を終了時にJSONで書き出す"
+    )
+    parser.add_argument(
+        "--run-log", metavar="PATH",
+        help="プレイと問題ごとの記録をJSON Lines形式で追記する（python -m number_drive.tools.run_report で集計できる）"
+    )
+    parser.add_argument(
+        "--no-type-ahead", action="store_true",
+        help="マルバツの表示中に打ったキーを捨てる（デフォルトでは次の問題の入力として適用する）"
+    )
+    parser.add_argument(
+        "--auto-submit", action="store_true",
+        help="答えと同じ文字数を入力したら Enter を押さずに確定する"
+    )
+    parser.add_argument(
+        "--no-repeat", metavar="N", type=int, nargs="?", const=NO_REPEAT_SESSIONS, default=0,
+        help=f"直近N回のプレイで出した問題を出さない（回数の省略時は{NO_REPEAT_SESSIONS}回、起動をまたいで引き継ぐ）"
+    )
+    parser.add_argument(
+        "--record", metavar="PATH",
+        help="プレイを記録する（python -m number_drive.tools.replay_export で動画やPNG連番に書き出せる）"
+    )
+    parser.add_argument(
+        "--no-sound", action="store_true",
+        help="効果音を鳴らさない"
+    )
+    return parser.parse_args(argv)
 
 
 def main():
     """メイン関数"""
-    # Pygameの初期化
+    args = parse_args()
+    
+    # Pygameの初期化（ミキサーは効果音の遅延が小さくなるバッファで初期化する）
+    audio.pre_init()
     pygame.init()
     
     # ゲームの作成と実行
-    game = Game()
+    game = Game(
+        latency_report=args.latency_report,
+        display_mode=args.display,
+        fullscreen=args.fullscreen,
+        seed=args.seed,
+        weighted_plates=args.weighted_plates,
+        run_type=RunType[args.run_type.upper().replace("-", "_")],
+        metrics_port=args.metrics_port,
+        profile_dir=args.profile_dir,
+        profile_seconds=args.profile_seconds,
+        low_memory=args.low_memory,
+        memory_report=args.memory_report,
+        run_log=args.run_log,
+        sound=not args.no_sound,
+        type_ahead=not args.no_type_ahead,
+        auto_submit=args.auto_submit,
+        no_repeat_sessions=args.no_repeat,
+        record=args.record
+    )
     game.run()
 
 
@@ -0,0 +1,214 @@
+"""
+効果音を合成して鳴らすモジュール
+
+効果音は起動時に一度だけ合成して pygame.mixer.Sound にしておき、鳴らすときは
+確保済みのチャンネルで再生するだけにする（再生のたびにデコードやチャンネルの確保をしない）。
+ミキサーを初期化できない環境（音声デバイスがない場合など）では何も鳴らさずに動く。
+"""
+import math
+import time
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pygame
+
+from number_drive.config import AUDIO_BUFFER, AUDIO_CHANNELS, AUDIO_FREQUENCY, AUDIO_VOLUME
+from number_drive.instrumentation import LatencyHistogram
+
+# 効果音の名前
+KEY = "key"
+CORRECT = "correct"
+WRONG = "wrong"
+TICK = "tick"
+GO = "go"
+RESULT = "result"
+
+# 効果音ごとの音の並び（周波数Hz, 長さ秒, 波形）。周波数の組は開始から終了へのグライド
+SOUND_NOTES: Dict[str, Sequence[Tuple[Tuple[float, float], float, str]]] = {
+    KEY: [((1800, 1800), 0.025, "square")],
+    CORRECT: [((880, 880), 0.06, "sine"), ((1320, 1320), 0.12, "sine")],
+    WRONG: [((220, 160), 0.18, "square")],
+    TICK: [((1000, 1000), 0.06, "sine")],
+    GO: [((1500, 1500), 0.25, "sine")],
+    RESULT: [((660, 660), 0.09, "sine"), ((880, 880), 0.09, "sine"),
+             ((1100, 1100), 0.09, "sine"), ((1320, 1320), 0.25, "sine")],
+}
+
+# 効果音ごとの音量の倍率（キーの音は頻繁に鳴るので控えめにする）
+SOUND_GAIN = {KEY: 0.25, WRONG: 0.5}
+
+# ミキサーのサンプル形式ごとの (array の型, 振幅, オフセット)
+SAMPLE_FORMATS = {
+    -8: ("b", 127, 0),
+    8: ("B", 127, 128),
+    -16: ("h", 32767, 0),
+    16: ("H", 32767, 32768),
+    32: ("f", 1.0, 0),
+}
+
+
+def pre_init():
+    """
+    ミキサーをバッファの小さい設定で初期化するよう予約する
+
+    pygame.init（または pygame.mixer.init）より前に呼び出す必要がある。
+    """
+    pygame.mixer.pre_init(AUDIO_FREQUENCY, -16, 2, AUDIO_BUFFER)
+
+
+def synthesize(notes, frequency: int) -> List[float]:
+    """
+    音の並びを -1〜1 のサンプル列に合成する
+
+    Args:
+        notes: (周波数の組, 長さ秒, 波形) の並び
+        frequency: サンプリング周波数
+
+    Returns:
+        モノラルのサンプル列
+    """
+    samples: List[float] = []
+    attack = int(frequency * 0.003)  # クリック音を防ぐ立ち上がり
+    for (start_hz, end_hz), seconds, waveform in notes:
+        count = int(frequency * seconds)
+        phase = 0.0
+        for i in range(count):
+            hz = start_hz + (end_hz - start_hz) * i / count
+            phase += 2.0 * math.pi * hz / frequency
+            value = math.sin(phase)
+            if waveform == "square":
+                value = 0.6 if value >= 0.0 else -0.6
+            # 立ち上がりの後は指数的に減衰させる
+            envelope = min(1.0, i / attack) if attack else 1.0
+            envelope *= math.exp(-4.0 * i / count)
+            samples.append(value * envelope)
+    return samples
+
+
+class AudioFeedback:
+    """
+    効果音を鳴らすクラス
+
+    チャンネルは起動時に AUDIO_CHANNELS 本を予約しておき、キーの音は先頭の1本を
+    使い回し（前の音は止めて鳴らし直す）、それ以外は残りを順番に使う。
+    空きを探したり待ったりしないので、連打しても再生の呼び出しは一定時間で終わる。
+    キー入力の受信から再生を指示するまでの時間に、ミキサーのバッファ分の時間を足して
+    キー入力から音が出るまでの遅延として記録する。
+    """
+
+    def __init__(self, enabled: bool = True):
+        """
+        効果音の初期化（合成とチャンネルの確保）
+
+        Args:
+            enabled: 効果音を鳴らすかどうか（Falseならミキサーを止める）
+        """
+        self.enabled = False
+        self.sounds: Dict[str, pygame.mixer.Sound] = {}
+        self.channels: List[pygame.mixer.Channel] = []
+        self.mixer_settings: Optional[Tuple[int, int, int]] = None
+        self.buffer_ms = AUDIO_BUFFER * 1000.0 / AUDIO_FREQUENCY
+        self.latency = LatencyHistogram()
+        self.played: Dict[str, int] = {name: 0 for name in SOUND_NOTES}
+        self._key_time: Optional[float] = None
+        self._next_channel = 1
+
+        if not enabled:
+            if pygame.mixer.get_init():
+                pygame.mixer.quit()
+            return
+
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            self.mixer_settings = pygame.mixer.get_init()
+            frequency, size, channels = self.mixer_settings
+            sample_format = SAMPLE_FORMATS.get(size)
+            if sample_format is None:
+                # 対応していないサンプル形式では鳴らさない
+                return
+            self.buffer_ms = AUDIO_BUFFER * 1000.0 / frequency
+
+            # 効果音をミキサーの形式で合成しておく
+            typecode, amplitude, offset = sample_format
+            for name, notes in SOUND_NOTES.items():
+                gain = AUDIO_VOLUME * SOUND_GAIN.get(name, 1.0)
+                data = array(typecode)
+                for value in synthesize(notes, frequency):
+                    sample = value * gain * amplitude + offset
+                    data.extend([sample if typecode == "f" else int(sample)] * channels)
+                self.sounds[name] = pygame.mixer.Sound(buffer=data.tobytes())
+
+            # 効果音用のチャンネルを予約する（他の Sound.play には使われない）
+            pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), AUDIO_CHANNELS))
+            pygame.mixer.set_reserved(AUDIO_CHANNELS)
+            self.channels = [pygame.mixer.Channel(i) for i in range(AUDIO_CHANNELS)]
+        except pygame.error:
+            # 音声デバイスがないなどでミキサーを使えない場合は鳴らさない
+            self.sounds = {}
+            self.channels = []
+            return
+        self.enabled = len(self.channels) >= 2
+
+    def key_received(self):
+        """KEYDOWNの受信時刻を記録する（次に鳴らすキー入力の音の遅延計測に使う）"""
+        self._key_time = time.perf_counter()
+
+    def play(self, name: str, pan: Optional[float] = None, from_key: bool = False):
+        """
+        効果音を鳴らす
+
+        Args:
+            name: 効果音の名前
+            pan: 左右の位置（-1: 左, 0: 中央, 1: 右、Noneなら中央）
+            from_key: キー入力に対する音かどうか（遅延を記録する）
+        """
+        if not self.enabled:
+            return
+        if name == KEY:
+            channel = self.channels[0]
+        else:
+            channel = self.channels[self._next_channel]
+            self._next_channel = self._next_channel % (len(self.channels) - 1) + 1
+        channel.play(self.sounds[name])
+        if pan is not None:
+            # 再生すると左右の音量は戻るので、再生の後に設定する
+            channel.set_volume(min(1.0, 1.0 - pan), min(1.0, 1.0 + pan))
+        self.played[name] += 1
+
+        if from_key and self._key_time is not None:
+            self.latency.add((time.perf_counter() - self._key_time) * 1000.0 + self.buffer_ms)
+            self._key_time = None
+
+    def report(self) -> dict:
+        """
+        設定と計測結果をまとめる
+
+        Returns:
+            ミキサーの設定・再生回数・キー入力から音が出るまでの遅延を含む辞書
+        """
+        frequency, size, channels = self.mixer_settings or (None, None, None)
+        return {
+            "enabled": self.enabled,
+            "frequency": frequency,
+            "sample_format": size,
+            "output_channels": channels,
+            "buffer_samples": AUDIO_BUFFER,
+            "buffer_ms": self.buffer_ms,
+            "pool_channels": len(self.channels),
+            "played": dict(self.played),
+            "key_to_sound": self.latency.to_dict()
+        }
+
+    def summary(self) -> str:
+        """
+        キー入力から音が出るまでの遅延の要約を文字列で取得する
+
+        Returns:
+            1行の要約（鳴らしていない場合はその旨）
+        """
+        if not self.enabled:
+            return "audio: disabled"
+        stats = self.latency.to_dict()
+        return (f"audio: n={stats['count']} mean={stats['mean_ms']:.1f}ms "
+                f"max={stats['max_ms']:.1f}ms (buffer {self.buffer_ms:.1f}ms)")
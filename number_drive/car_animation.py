@@ -0,0 +1,82 @@
+"""
+装飾の車の動き（揺れと走り抜け）を計算するモジュール
+
+ここでは時刻や進み具合から車の中心と角度を求めるだけで、描画は
+RotationFrames（sprites.py）で事前に回転しておいた絵を転送して行う。
+"""
+import math
+from typing import Tuple
+
+from number_drive.config import CAR_BOB_PIXELS, CAR_WOBBLE_DEGREES, CAR_WOBBLE_PERIOD
+
+# 画像の車の向き（-1: 左向き）。左右反転すると右向きになる
+CAR_FACING = -1
+
+# 走り抜けるときに弾む回数
+DRIVE_BOUNCES = 3
+
+Pose = Tuple[Tuple[float, float], float]
+
+
+def drive_direction(flip_x: bool) -> int:
+    """
+    車が前に進む向きを取得する
+
+    Args:
+        flip_x: 画像を左右反転しているかどうか
+
+    Returns:
+        1なら右、-1なら左
+    """
+    return -CAR_FACING if flip_x else CAR_FACING
+
+
+def wobble_pose(position: Tuple[float, float], base_angle: float, t: float, index: int = 0) -> Pose:
+    """
+    その場で揺れる車の中心と角度を計算する
+
+    時刻0では元の位置・角度になる。複数の車がそろって揺れないよう、番号ごとに周期をずらす。
+
+    Args:
+        position: 車の中心の位置
+        base_angle: 元の角度（度）
+        t: 経過時間（秒）
+        index: 車の番号
+
+    Returns:
+        (中心の座標, 角度)
+    """
+    phase = 2.0 * math.pi * t / (CAR_WOBBLE_PERIOD * (1.0 + 0.15 * index))
+    angle = base_angle + CAR_WOBBLE_DEGREES * math.sin(phase)
+    # 1回揺れる間に2回弾む
+    y = position[1] - CAR_BOB_PIXELS * abs(math.sin(phase))
+    return (position[0], y), angle
+
+
+def drive_pose(position: Tuple[float, float], base_angle: float, progress: float, direction: int,
+               car_width: float, screen_width: float) -> Pose:
+    """
+    画面を走り抜けて元の位置に戻ってくる車の中心と角度を計算する
+
+    進み具合0と1では元の位置・角度になる。画面の端から出た車は反対側の端から入ってくる。
+
+    Args:
+        position: 元の中心の位置
+        base_angle: 元の角度（度）
+        progress: 進み具合（0〜1）
+        direction: 進む向き（1: 右, -1: 左）
+        car_width: 画面から完全に出るのに必要な幅（回転した絵の幅）
+        screen_width: 画面の幅
+
+    Returns:
+        (中心の座標, 角度)
+    """
+    progress = min(max(progress, 0.0), 1.0)
+    eased = progress * progress * (3.0 - 2.0 * progress)  # ゆっくり出てゆっくり止まる
+    span = screen_width + car_width
+    x = position[0] + direction * eased * span
+    x = (x + car_width / 2) % span - car_width / 2
+    bounce = math.sin(math.pi * DRIVE_BOUNCES * progress)
+    angle = base_angle + CAR_WOBBLE_DEGREES / 2 * bounce
+    y = position[1] - CAR_BOB_PIXELS * abs(bounce)
+    return (x, y), angle
@@ -1,7 +1,10 @@
 """
 ゲームの設定値を定義するモジュール
+
+定数だけを使うツールや出題ロジックから読み込まれるため、pygame は
+フォントを初めて読み込むときまで import しない。
 """
-import pygame
+import os
 from pathlib import Path
 
 # 画面サイズ
@@ -11,6 +14,11 @@ SCREEN_HEIGHT = 600  # ひと回り小さく
 # フレームレート
 FPS = 60
 
+# ゲームロジックの更新頻度（描画のフレームレートとは独立した固定ステップ）
+LOGIC_HZ = 240
+LOGIC_STEP = 1.0 / LOGIC_HZ
+MAX_LOGIC_STEPS_PER_FRAME = 60  # 1フレームで追いつく上限（これを超えた遅れは捨てる）
+
 # 色の定義
 BACKGROUND_COLOR = (5, 5, 20)  # より暗い背景色（ロゴと同じ）
 MAIN_COLOR_PINK = (255, 0, 255)  # 鮮やかなネオンピンク
@@ -32,6 +40,7 @@ DECORATION_COLOR = (0, 255, 255, 10)  # 装飾用の色（透明度を固定）
 PLATE_YELLOW = (255, 240, 0)  # 軽自動車・自家用/普通車・事業用の黄色
 PLATE_WHITE = (255, 255, 255)  # 普通車・自家用の白色
 PLATE_GREEN = (0, 180, 0)  # かけ算用の緑色
+PLATE_BLACK = (30, 30, 30)  # 軽自動車・事業用の黒色（わり算用）
 
 # フォントサイズ
 TITLE_FONT_SIZE = 48  # タイトル用（少し小さく）
@@ -41,28 +50,67 @@ SMALL_FONT_SIZE = 16  # 小さめのテキスト用（ピクセルフォント
 
 # ゲーム設定
 TOTAL_QUESTIONS = 10  # 出題数
+FEEDBACK_DURATION = 0.5  # 正解・不正解のマルバツを表示する秒数（この間は入力を受け付けない）
+TIME_ATTACK_SECONDS = 60  # タイムアタックの制限時間（秒）
+QUESTION_PREFETCH = 2  # 先に生成してプレートを描画しておく問題数（エンドレス・タイムアタックでも一定）
+TYPE_AHEAD_LIMIT = 8  # マルバツの表示中に打ったキーを溜めておく数（表示が消えたら順に適用する）
+NO_REPEAT_SESSIONS = 20  # --no-repeat で回数を省略したときに、同じ問題を出さないようにする直近のプレイ回数
+
+# 車のアニメーション（回転した絵は角度の刻みごとに事前に用意する）
+CAR_FRAME_STEP = 1  # 事前に回転しておく角度の刻み（度）
+CAR_FRAME_STEP_LOW_MEMORY = 2  # 省メモリモードでの角度の刻み（度）
+CAR_WOBBLE_DEGREES = 6  # 揺れる角度の幅（元の角度からの片側、度）
+CAR_WOBBLE_PERIOD = 1.8  # 揺れの周期（秒、車ごとに少しずつずらす）
+CAR_BOB_PIXELS = 3  # 揺れに合わせて上下に動く幅（ピクセル）
+CAR_DRIVE_SECONDS = 0.9  # 正解したときに車が画面を走り抜けて戻るまでの秒数
+
+# 効果音（ミキサーは pygame.init より前に設定する）
+AUDIO_FREQUENCY = 44100  # サンプリング周波数
+AUDIO_BUFFER = 256  # ミキサーのバッファのサンプル数（小さいほど鳴るまでが速い、約5.8ms）
+AUDIO_CHANNELS = 8  # 効果音用に確保しておくチャンネル数
+AUDIO_VOLUME = 0.5  # 効果音の音量（0〜1）
 
 # アセットのパス
 BASE_DIR = Path(__file__).parent.parent
 IMAGES_DIR = BASE_DIR / "images"
 FONTS_DIR = BASE_DIR / "fonts"
 
+# 計算結果などのキャッシュを保存するディレクトリ
+CACHE_DIR = Path(os.environ.get("NUMBER_DRIVE_CACHE_DIR", Path.home() / ".cache" / "number_drive"))
+
 # ロゴのパス
 LOGO_PATH = IMAGES_DIR / "logo.png"
 PIXEL_FONT_PATH = FONTS_DIR / "press_start_2p.ttf"
 
-# フォントの読み込み
+# フォントの読み込み（サイズごとに一度だけ読み込んで使い回す）
+_font_cache = {}
+font_cache_stats = {"hits": 0, "misses": 0}
+
 def get_font(size):
     """指定したサイズのフォントを取得する"""
     # サイズを整数に変換
     size = int(size)
+    font = _font_cache.get(size)
+    if font is not None:
+        font_cache_stats["hits"] += 1
+        return font
+    font_cache_stats["misses"] += 1
+    import pygame  # 描画するときだけ必要
+    
     # ピクセルフォントを使用
     try:
-        return pygame.font.Font(str(PIXEL_FONT_PATH), size)
+        font = pygame.font.Font(str(PIXEL_FONT_PATH), size)
     except Exception as e:
         print(f"Error loading font: {e}")
         # フォントが見つからない場合はデフォルトフォントを使用
-        return pygame.font.SysFont("Arial", size)
+        font = pygame.font.SysFont("Arial", size)
+    _font_cache[size] = font
+    return font
 
-# ナンバープレートの除外ルール
-EXCLUDED_NUMBERS = [13, 42, 49]  # 下二桁に特定の番号がつく場合は除外
+# ナンバープレートの除外ルール（一連指定番号4桁のパターン、"?" は任意の数字、plate_rules.py でコンパイルする）
+EXCLUDED_SERIAL_PATTERNS = [
+    "??13", "??42", "??49",  # 下二桁に特定の番号がつく場合は除外
+    "4219", "4249",  # 42-19（死に行く）、42-49（死に至る）
+]
+# 出題に使う一連指定番号の形式（前半の数字が1〜99になる「・1-23」と「12-34」）
+QUESTION_PLATE_FORMATS = ("three_digit", "four_digit")
@@ -0,0 +1,299 @@
+"""
+問題の難しさを表す特徴量とプレイヤーモデルを定義するモジュール
+"""
+import random
+
+from number_drive.config import FEEDBACK_DURATION
+from number_drive.number_plate import OPERATIONS, OperationType
+
+
+def count_digits(number: int) -> int:
+    """
+    桁数を数える
+
+    Args:
+        number: 数値（負の数は絶対値で数える）
+
+    Returns:
+        桁数
+    """
+    return len(str(abs(number)))
+
+
+def count_carries(a: int, b: int) -> int:
+    """
+    足し算 a + b の繰り上がりの回数を数える
+
+    Args:
+        a: 足される数
+        b: 足す数
+
+    Returns:
+        繰り上がりの回数
+    """
+    carries = 0
+    carry = 0
+    while a or b:
+        carry = 1 if a % 10 + b % 10 + carry >= 10 else 0
+        carries += carry
+        a //= 10
+        b //= 10
+    return carries
+
+
+def count_borrows(a: int, b: int) -> int:
+    """
+    引き算 a - b の繰り下がりの回数を数える（答えが負の場合は大きい方から小さい方を引く）
+
+    Args:
+        a: 引かれる数
+        b: 引く数
+
+    Returns:
+        繰り下がりの回数
+    """
+    if a < b:
+        a, b = b, a
+    borrows = 0
+    borrow = 0
+    while a or b:
+        borrow = 1 if a % 10 - b % 10 - borrow < 0 else 0
+        borrows += borrow
+        a //= 10
+        b //= 10
+    return borrows
+
+
+class QuestionFeatures:
+    """1問の難しさに関わる特徴量"""
+
+    __slots__ = ("operation_type", "front", "back", "answer", "operand_digits",
+                 "carries", "borrows", "negative", "answer_digits")
+
+    def __init__(self, operation_type: OperationType, front: int, back: int):
+        """
+        特徴量を計算する
+
+        Args:
+            operation_type: 演算子の種類
+            front: 前半の数字
+            back: 後半の数字
+        """
+        self.operation_type = operation_type
+        self.front = front
+        self.back = back
+        self.answer = OPERATIONS[operation_type].apply(front, back)
+        self.operand_digits = count_digits(front) + count_digits(back)
+        self.carries = count_carries(front, back) if operation_type == OperationType.ADDITION else 0
+        self.borrows = count_borrows(front, back) if operation_type == OperationType.SUBTRACTION else 0
+        self.negative = self.answer < 0
+        self.answer_digits = count_digits(self.answer)
+
+    @property
+    def typed_chars(self) -> int:
+        """回答として入力する文字数（マイナス記号を含む）"""
+        return self.answer_digits + (1 if self.negative else 0)
+
+
+class LinearPlayerModel:
+    """
+    1問あたりの回答時間を特徴量の線形和で近似するプレイヤーモデル
+
+    思考時間 = 演算ごとの基本時間 + 桁数・繰り上がり・繰り下がり・負の答え・答えの桁数に
+    比例する時間を対数正規分布のばらつきで揺らしたもの。入力時間は1文字ごとの打鍵時間、
+    誤答の確率は繰り上がり・繰り下がりの回数に比例して増える。
+
+    独自のモデルは solve_time(features, rng) と error_probability(features) を持つ
+    クラスとして実装すれば、そのまま差し替えて使える。
+    """
+
+    def __init__(self, read_time: float = 0.8, base_times=None, per_digit: float = 0.35,
+                 per_carry: float = 0.6, per_borrow: float = 0.8, negative_penalty: float = 1.0,
+                 per_answer_digit: float = 0.5, key_time: float = 0.18, noise_sigma: float = 0.25,
+                 base_error: float = 0.02, error_per_step: float = 0.03):
+        """
+        プレイヤーモデルの初期化
+
+        Args:
+            read_time: 問題を読む時間（秒）
+            base_times: 演算ごとの基本思考時間（秒）
+            per_digit: オペランドの1桁あたりの思考時間（秒）
+            per_carry: 繰り上がり1回あたりの思考時間（秒）
+            per_borrow: 繰り下がり1回あたりの思考時間（秒）
+            negative_penalty: 答えが負になる場合の追加時間（秒）
+            per_answer_digit: 答えが2桁を超える場合の1桁あたりの追加時間（秒）
+            key_time: 1文字あたりの打鍵時間（秒、Enterキーを含む）
+            noise_sigma: 思考時間のばらつき（対数正規分布の標準偏差）
+            base_error: 誤答の基本確率
+            error_per_step: 繰り上がり・繰り下がり1回あたりに増える誤答確率
+        """
+        self.read_time = read_time
+        self.base_times = base_times or {
+            OperationType.ADDITION: 1.0,
+            OperationType.SUBTRACTION: 1.4,
+            OperationType.MULTIPLICATION: 2.5,
+            OperationType.DIVISION: 2.8
+        }
+        self.per_digit = per_digit
+        self.per_carry = per_carry
+        self.per_borrow = per_borrow
+        self.negative_penalty = negative_penalty
+        self.per_answer_digit = per_answer_digit
+        self.key_time = key_time
+        self.noise_sigma = noise_sigma
+        self.base_error = base_error
+        self.error_per_step = error_per_step
+
+    def solve_time(self, features: QuestionFeatures, rng: random.Random) -> float:
+        """
+        1回分の思考時間と入力時間を求める
+
+        Args:
+            features: 問題の特徴量
+            rng: 乱数生成器
+
+        Returns:
+            秒数
+        """
+        thinking = (
+            self.base_times[features.operation_type]
+            + self.per_digit * features.operand_digits
+            + self.per_carry * features.carries
+            + self.per_borrow * features.borrows
+            + (self.negative_penalty if features.negative else 0.0)
+            + self.per_answer_digit * max(0, features.answer_digits - 2)
+        )
+        # 平均が変わらないように補正した対数正規分布のばらつき
+        noise = rng.lognormvariate(-self.noise_sigma ** 2 / 2, self.noise_sigma)
+        return self.read_time + thinking * noise + self.key_time * (features.typed_chars + 1)
+
+    def error_probability(self, features: QuestionFeatures) -> float:
+        """
+        誤答する確率を求める
+
+        Args:
+            features: 問題の特徴量
+
+        Returns:
+            0〜1の確率
+        """
+        steps = features.carries + features.borrows + max(0, features.answer_digits - 2)
+        return min(0.9, self.base_error + self.error_per_step * steps)
+
+
+def after_feedback(seconds: float, type_ahead: bool = False) -> float:
+    """
+    マルバツの表示の後に続く入力にかかる時間を、表示の始まりから数えた時間にする
+
+    先行入力がなければ表示が消えるまで入力できないので表示時間が足される。
+    先行入力があれば表示中も入力できるので、表示時間より長くはかからない限り表示時間で済む。
+
+    Args:
+        seconds: 入力にかかる時間（秒）
+        type_ahead: 表示中に打ったキーが適用されるかどうか
+
+    Returns:
+        表示の始まりから入力を終えるまでの秒数
+    """
+    if type_ahead:
+        return max(FEEDBACK_DURATION, seconds)
+    return FEEDBACK_DURATION + seconds
+
+
+def simulate_question(model, features: QuestionFeatures, rng: random.Random,
+                      type_ahead: bool = False, auto_submit: bool = False) -> float:
+    """
+    1問を正解するまでの時間をシミュレーションする
+
+    誤答した場合はマルバツの表示時間だけ入力できず、解き直しになる（先行入力があれば
+    表示中に解き直しを打ち始められる）。誤答した入力は表示が消えるときに消えるので、
+    解き直しはどちらの場合も答えを最初から打ち直す。自動確定ではEnterキーの1打鍵分
+    （モデルの key_time）が短くなる。
+
+    Args:
+        model: プレイヤーモデル
+        features: 問題の特徴量
+        rng: 乱数生成器
+        type_ahead: マルバツの表示中に打ったキーが適用されるかどうか
+        auto_submit: 答えと同じ文字数を入力したら自動で確定するかどうか
+
+    Returns:
+        正解するまでの秒数（正解後のマルバツ表示は含まない）
+    """
+    saved = getattr(model, "key_time", 0.0) if auto_submit else 0.0
+    elapsed = model.solve_time(features, rng) - saved
+    error_probability = model.error_probability(features)
+    while rng.random() < error_probability:
+        elapsed += after_feedback(model.solve_time(features, rng) * 0.5 - saved, type_ahead)
+    return elapsed
+
+
+def simulate_session(model, plates, rng: random.Random, type_ahead: bool = False,
+                     auto_submit: bool = False) -> float:
+    """
+    1ゲーム分のクリアタイムをシミュレーションする
+
+    入力の設定を変えても乱数の使い方は変わらないので、同じシードなら同じ問題・同じ
+    思考時間で設定ごとのクリアタイムを比べられる。
+
+    Args:
+        model: プレイヤーモデル
+        plates: 出題順のナンバープレート
+        rng: 乱数生成器
+        type_ahead: マルバツの表示中に打ったキーが適用されるかどうか
+        auto_submit: 答えと同じ文字数を入力したら自動で確定するかどうか
+
+    Returns:
+        クリアタイム（秒）
+    """
+    clear_time = 0.0
+    for i, plate in enumerate(plates):
+        features = QuestionFeatures(plate.operation_type, plate.front_number, plate.back_number)
+        seconds = simulate_question(model, features, rng, type_ahead, auto_submit)
+        # 最初の問題以外は前の問題の正解後にマルバツが表示され、その間もタイマーは進む
+        clear_time += after_feedback(seconds, type_ahead) if i else seconds
+    return clear_time
+
+
+# 難しさのスコアを段階に分ける境界（スコアがこの値以上なら次の段階）
+DIFFICULTY_LEVEL_THRESHOLDS = (1.0, 2.0, 3.0)
+DIFFICULTY_LEVELS = len(DIFFICULTY_LEVEL_THRESHOLDS) + 1
+
+
+def difficulty_score(features: QuestionFeatures) -> float:
+    """
+    問題の難しさをスコアにする
+
+    繰り上がり・繰り下がり・負の答え・答えの桁数（掛け算の積の大きさ）・
+    オペランドの桁数から計算する。0に近いほど簡単。
+
+    Args:
+        features: 問題の特徴量
+
+    Returns:
+        難しさのスコア
+    """
+    return (
+        1.0 * features.carries
+        + 1.2 * features.borrows
+        + 1.5 * (1 if features.negative else 0)
+        + 1.0 * max(0, features.answer_digits - 2)
+        + 0.5 * max(0, features.operand_digits - 3)
+    )
+
+
+def difficulty_level(score: float) -> int:
+    """
+    スコアを難しさの段階（0: 簡単 〜 DIFFICULTY_LEVELS - 1: 難しい）に変換する
+
+    Args:
+        score: 難しさのスコア
+
+    Returns:
+        難しさの段階
+    """
+    level = 0
+    for threshold in DIFFICULTY_LEVEL_THRESHOLDS:
+        if score >= threshold:
+            level += 1
+    return level
@@ -2,118 +2,490 @@
 ゲームのメインクラスと処理を定義するモジュール
 """
 import pygame
+import random
 import sys
 import time
 from typing import List, Tuple, Optional
 
-from number_drive.game_enums import GameState, GameMode
+from number_drive.game_enums import GameState, GameMode, RunType
 from number_drive.screens.title_screen import TitleScreen
 from number_drive.screens.game_screen import GameScreen
 from number_drive.screens.result_screen import ResultScreen
 from number_drive.screens.prepare_screen import PrepareScreen
-from number_drive.config import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, BACKGROUND_COLOR, LOGO_PATH
+from number_drive.screens.versus_screen import VersusScreen
+from number_drive.config import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, FPS, BACKGROUND_COLOR, BLACK, LOGO_PATH, CACHE_DIR,
+    LOGIC_HZ, LOGIC_STEP, MAX_LOGIC_STEPS_PER_FRAME
+)
+from number_drive.surface_pool import SurfacePool
+from number_drive.layout import LayoutCache, compute_letterbox
+from number_drive.plate_sampler import DifficultyWeightedSampler
+from number_drive.instrumentation import Instrumentation, LatencyTracker
+from number_drive.metrics import GameMetrics, MetricsServer
+from number_drive.profiling import ProfileCapture
+from number_drive.memory import MemoryAccounting
+from number_drive.sprites import SpriteCache
+from number_drive.render_backend import TEXTURE_BACKEND_AVAILABLE, TextureCanvas
+from number_drive.text_cache import TextCache
+from number_drive.question_stream import PlateSurfaceCache
+from number_drive.run_log import RunLog
+from number_drive.recent_questions import filter_for_sessions, recent_questions_path
+from number_drive.replay import SessionRecorder
+from number_drive import audio
+from number_drive import glyph_atlas
+
+
+def _letterbox_for_window(width: int, height: int) -> pygame.Rect:
+    """ウィンドウサイズに対する論理キャンバスの描画領域を計算する（レイアウトキャッシュ用）"""
+    return compute_letterbox((SCREEN_WIDTH, SCREEN_HEIGHT), (width, height))
 
 
 class Game:
     """ゲームのメインクラス"""
     
-    def __init__(self):
-        """ゲームの初期化"""
+    # 画面に関係なく常に受け取るイベントの種類
+    GAME_EVENT_TYPES = (pygame.QUIT, pygame.VIDEORESIZE)
+    
+    # マウス座標を論理キャンバスの座標に変換するイベントの種類
+    MOUSE_EVENT_TYPES = (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
+    
+    # プロファイルの取得を開始・終了するキー（どの画面でも有効）
+    PROFILE_KEY = pygame.K_F12
+    
+    def __init__(self, latency_report: Optional[str] = None, display_mode: str = "window",
+                 fullscreen: bool = False, seed: Optional[int] = None, weighted_plates: bool = False,
+                 metrics_port: Optional[int] = None, profile_dir: Optional[str] = None,
+                 profile_seconds: float = 10.0, low_memory: bool = False,
+                 memory_report: Optional[str] = None, run_type: RunType = RunType.STANDARD,
+                 run_log: Optional[str] = None, sound: bool = True, type_ahead: bool = True,
+                 auto_submit: bool = False, no_repeat_sessions: int = 0, record: Optional[str] = None):
+        """
+        ゲームの初期化
+        
+        Args:
+            latency_report: キー入力から表示までの遅延を計測する場合の出力先パス
+            display_mode: 画面の出力方法
+                "window": 論理サイズのウィンドウにそのまま描画する
+                "scaled": 論理サイズで描画し、SDL（pygame.SCALED）で拡大する
+                "canvas": 論理サイズのキャンバスに描画し、最後に一度だけ拡大して転送する
+                "texture": pygame._sdl2.video のレンダラーにテクスチャとして描画する
+            fullscreen: フルスクリーンで表示するかどうか（"scaled"、"canvas"、"texture"のみ）
+            seed: 乱数のシード（指定すると装飾や車の配置が毎回同じになる）
+            weighted_plates: 難しさの目標分布に従って出題するかどうか
+            metrics_port: 計測値をPrometheus形式で公開するローカルホストのポート番号
+            profile_dir: F12キーまたはSIGUSR1で取得したプロファイルの出力先
+            profile_seconds: 1回のプロファイル取得の時間（秒）
+            low_memory: 省メモリモード（画像を画面間で共有し、装飾を8ビットで保持する）
+            memory_report: サーフェスのメモリ使用量を終了時に書き出す場合の出力先パス
+            run_type: 最初に選択しておくプレイの種類（タイトル画面で切り替えられる）
+            run_log: プレイと問題ごとの記録をJSON Linesで追記する場合の出力先パス
+            sound: 効果音を鳴らすかどうか
+            type_ahead: マルバツの表示中に打ったキーを次の問題に適用するかどうか
+            auto_submit: 答えと同じ文字数を入力したら自動で確定するかどうか
+            no_repeat_sessions: 直近何回のプレイと同じ問題を出さないようにするか（0なら無効）
+                出題した問題は CACHE_DIR に保存し、次に起動したときも引き継ぐ
+            record: プレイを記録する場合の出力先パス（python -m number_drive.tools.replay_export で動画にできる）
+                シードを指定しなければ、記録から再生できるようにシードを決めて使う
+        """
+        audio.pre_init()  # ミキサーのバッファを小さくする（pygame.init より前に設定する）
         pygame.init()
         pygame.display.set_caption("NumberDrive!")
         
         # ウィンドウアイコンの設定（ロゴがあれば）
+        icon = None
         try:
             icon = pygame.image.load(str(LOGO_PATH))
             pygame.display.set_icon(icon)
         except:
             pass
         
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        if display_mode == "texture" and not TEXTURE_BACKEND_AVAILABLE:
+            print("Warning: pygame._sdl2.video is not available, falling back to --display window")
+            display_mode = "window"
+        
+        # 描画先の作成（screenは常に論理サイズのサーフェス、"texture"では同じ使い方ができる TextureCanvas）
+        self.display_mode = display_mode
+        self.window = None  # "canvas"モードでのみ使用する実ウィンドウ
+        self._scaled_canvas = None
+        self._window_dirty = True
+        fullscreen_flag = pygame.FULLSCREEN if fullscreen else 0
+        if display_mode == "scaled":
+            self.screen = pygame.display.set_mode(
+                (SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SCALED | pygame.RESIZABLE | fullscreen_flag)
+        elif display_mode == "canvas":
+            window_size = (0, 0) if fullscreen else (SCREEN_WIDTH, SCREEN_HEIGHT)
+            self.window = pygame.display.set_mode(window_size, pygame.RESIZABLE | fullscreen_flag)
+            self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        elif display_mode == "texture":
+            # 拡大と縦横比の維持はレンダラーの論理サイズで行われる（マウス座標もSDLが変換する）
+            self.screen = TextureCanvas.create_window((SCREEN_WIDTH, SCREEN_HEIGHT), "NumberDrive!", fullscreen)
+            if icon is not None:
+                self.screen.window.set_icon(icon)
+        else:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         self.clock = pygame.time.Clock()
         self.running = True
         self.state = GameState.TITLE
         self.game_mode = GameMode.EASY
+        self.run_type = run_type
+        if record and seed is None:
+            seed = random.randrange(2 ** 31)
+        self.seed = seed
+        
+        # 入力の設定（回答の確定まわり）
+        self.type_ahead = type_ahead
+        self.auto_submit = auto_submit
+        
+        # 固定ステップのロジック時計（ティック数で数えるので誤差が溜まらない）
+        self.logic_ticks = 0
+        self._logic_accumulator = 0.0
+        
+        # レイアウトキャッシュ（各画面より先に作成する）
+        self.layout_cache = LayoutCache()
+        
+        # サーフェスのメモリ集計と画像の読み込み（各画面より先に作成する）
+        self.low_memory = low_memory
+        self.memory_report = memory_report
+        self.memory = MemoryAccounting()
+        if isinstance(self.screen, pygame.Surface):
+            self.memory.track("display", "screen", self.screen)
+        self.memory.track("display", "window", self.window)
+        # 半透明レイヤーの共有プールと各キャッシュ（キャッシュになくて描画中に作ったサーフェスは集計に数える）
+        self.surface_pool = SurfacePool(self.memory)
+        self.memory.add_source("surface_pool", self.surface_pool.surfaces)
+        glyph_atlas.set_memory_accounting(self.memory)
+        self.memory.add_source("glyph_atlas", glyph_atlas.atlas_surfaces)
+        self.text_cache = TextCache(memory=self.memory)
+        self.memory.add_source("text_cache", self.text_cache.surfaces)
+        self.plate_cache = PlateSurfaceCache(memory=self.memory)  # 事前描画したプレート（対戦では2人で共有する）
+        self.memory.add_source("plate_cache", self.plate_cache.surfaces)
+        self.sprites = SpriteCache(self.memory, low_memory)
+        
+        # 難しさの目標分布に従うサンプラー（無効の場合は一様に出題する）
+        self.plate_sampler = DifficultyWeightedSampler() if weighted_plates else None
+        
+        # 直近のプレイで出題した問題（有効な場合のみ、対戦では2人に同じ問題を出すため使わない）
+        self.recent_questions = filter_for_sessions(no_repeat_sessions) if no_repeat_sessions > 0 else None
+        self.recent_questions_file = recent_questions_path()  # 保存先（Noneなら保存しない）
+        
+        # フレームごとの計測値
+        self.instrumentation = Instrumentation()
+        
+        # 効果音（起動時に合成してチャンネルを確保しておく）
+        self.audio = audio.AudioFeedback(sound)
+        
+        # プレイの記録（有効な場合のみ）
+        self.run_log = RunLog(run_log) if run_log else None
+        
+        # プレイの記録（有効な場合のみ、再生に必要な設定とその時点の出題履歴を先頭に書く）
+        self.recorder = None
+        if record:
+            recent = None
+            if self.recent_questions is not None:
+                recent = {"capacity": self.recent_questions.capacity, "entries": self.recent_questions.entries()}
+            self.recorder = SessionRecorder(record, seed, {
+                "weighted_plates": weighted_plates, "low_memory": low_memory, "run_type": run_type.name,
+                "type_ahead": type_ahead, "auto_submit": auto_submit, "recent_questions": recent
+            })
+        
+        # キー入力から表示までの遅延計測（有効な場合のみ）
+        self.latency_report = latency_report
+        self.latency_tracker = LatencyTracker() if latency_report else None
         
         # 各画面の初期化
         self.title_screen = TitleScreen(self)
         self.prepare_screen = PrepareScreen(self)
         self.game_screen = GameScreen(self)
+        self.versus_screen = VersusScreen(self)
         self.result_screen = ResultScreen(self)
         
+        # 状態ごとの画面（イベント・更新・描画の振り分けに使用）
+        self.screens = {
+            GameState.TITLE: self.title_screen,
+            GameState.PREPARE: self.prepare_screen,
+            GameState.PLAYING: self.game_screen,
+            GameState.VERSUS: self.versus_screen,
+            GameState.RESULT: self.result_screen
+        }
+        self._apply_event_filter()
+        
+        # 計測値の公開（有効な場合のみ）
+        self.metrics = None
+        self.metrics_server = None
+        if metrics_port is not None:
+            event_types = set(self.GAME_EVENT_TYPES)
+            for screen in self.screens.values():
+                event_types.update(screen.EVENT_TYPES)
+            self.metrics = GameMetrics(sorted(event_types), self.memory)
+            self.metrics_server = MetricsServer(self.metrics, metrics_port)
+        
+        # F12キー・SIGUSR1によるプロファイル取得
+        self.profile_capture = ProfileCapture(profile_dir or CACHE_DIR / "profiles", profile_seconds)
+        self.profile_capture.install_signal_handler()
+        
         # ゲーム結果
         self.clear_time = 0.0
+        self.answered_count = 0  # 正解した問題数（エンドレス・タイムアタックの結果）
+        self.versus_winner = 0  # 対戦で先に全問解いたプレイヤーの番号
+        self.versus_scores = (0, 0)  # 対戦の終了時に2人が解いた問題数
         self.best_times = {
             GameMode.EASY: float('inf'),
             GameMode.NORMAL: float('inf'),
-            GameMode.HARD: float('inf')
+            GameMode.HARD: float('inf'),
+            GameMode.EXPERT: float('inf')
         }
     
     def run(self):
         """ゲームのメインループ"""
+        if self.metrics_server:
+            self.metrics_server.start()
+            print(f"Metrics: http://{self.metrics_server.host}:{self.metrics_server.port}/metrics")
+        
+        previous = time.perf_counter()
         while self.running:
+            self.profile_capture.poll(self.state, self.game_mode)
+            frame_start = time.perf_counter()
+            state = self.state
+            
+            # 前のフレームからの経過時間分だけロジックを進めてから入力を処理する
+            self.advance_logic(frame_start - previous)
+            previous = frame_start
             self.handle_events()
-            self.update()
             self.render()
-            self.clock.tick(FPS)
+            work_seconds = time.perf_counter() - frame_start
+            frame_ms = self.clock.tick(FPS)
+            
+            if self.metrics:
+                self.metrics.record_frame(state, frame_ms / 1000.0, work_seconds,
+                                          self.clock.get_fps(), self.instrumentation)
+        
+        if self.metrics_server:
+            self.metrics_server.stop()
+        self.profile_capture.stop(self.state, self.game_mode)
+        
+        if self.latency_tracker:
+            self.latency_tracker.export(self.latency_report, settings={
+                "fps": FPS, "display_mode": self.display_mode, "audio": self.audio.report()})
+            print(self.latency_tracker.summary())
+            print(self.audio.summary())
+        
+        if self.memory_report:
+            self.memory.export(self.memory_report)
+            print(self.memory.summary())
+        
+        if self.run_log:
+            self.run_log.close()
+        
+        self.save_recent_questions()
+        
+        if self.recorder:
+            self.recorder.close(self.logic_ticks)
         
         pygame.quit()
         sys.exit()
     
     def handle_events(self):
         """イベント処理"""
+        instrumentation = self.instrumentation
+        instrumentation.begin_event_frame()
+        
+        # 連続するMOUSEMOTIONは最後の1件だけを画面に渡す
+        pending_motion = None
+        if self.latency_tracker:
+            self.latency_tracker.begin_drain()
         for event in pygame.event.get():
+            instrumentation.count_received(event.type)
+            
+            if event.type == pygame.KEYDOWN and event.key == self.PROFILE_KEY:
+                self.profile_capture.request()
+                continue
+            
+            if event.type == pygame.KEYDOWN:
+                self.audio.key_received()
+                if self.latency_tracker:
+                    self.latency_tracker.key_received(self.state.name.lower(), event.key)
+            
+            if event.type == pygame.MOUSEMOTION:
+                if pending_motion is not None:
+                    instrumentation.count_coalesced()
+                pending_motion = event
+                continue
+            
+            # 他のイベントより前に保留中のMOUSEMOTIONを処理して順序を保つ
+            if pending_motion is not None:
+                self.dispatch_event(pending_motion)
+                pending_motion = None
+            
             if event.type == pygame.QUIT:
                 self.running = False
+            elif event.type == pygame.VIDEORESIZE:
+                # ウィンドウサイズが変わったらレイアウトを計算し直す
+                self.layout_cache.invalidate()
+                self._window_dirty = True
             
-            # 現在の画面に応じたイベント処理
-            if self.state == GameState.TITLE:
-                self.title_screen.handle_event(event)
-            elif self.state == GameState.PREPARE:
-                self.prepare_screen.handle_event(event)
-            elif self.state == GameState.PLAYING:
-                self.game_screen.handle_event(event)
-            elif self.state == GameState.RESULT:
-                self.result_screen.handle_event(event)
+            self.dispatch_event(event)
+        
+        if pending_motion is not None:
+            self.dispatch_event(pending_motion)
+    
+    def dispatch_event(self, event):
+        """
+        現在の画面にイベントを渡す（記録が有効なら、渡したイベントを記録する）
+        
+        Args:
+            event: Pygameのイベント
+        """
+        screen = self.screens[self.state]
+        if event.type in screen.EVENT_TYPES:
+            if self.window is not None and event.type in self.MOUSE_EVENT_TYPES:
+                event = self._to_canvas_event(event)
+            self.instrumentation.count_dispatched()
+            if self.recorder is not None:
+                self.recorder.record_event(self.logic_ticks, event)
+            screen.handle_event(event)
+    
+    def _apply_event_filter(self):
+        """現在の画面が扱うイベントだけをSDLのキューに入れるよう設定する"""
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed([*self.GAME_EVENT_TYPES, *self.screens[self.state].EVENT_TYPES])
+    
+    def _to_canvas_event(self, event):
+        """
+        マウスイベントの座標をウィンドウ座標から論理キャンバスの座標に変換する
+        
+        Args:
+            event: Pygameのマウスイベント
+        
+        Returns:
+            座標を変換したイベント
+        """
+        target = self.layout_cache.get(_letterbox_for_window, self.window.get_size())
+        x = (event.pos[0] - target.x) * SCREEN_WIDTH // target.width
+        y = (event.pos[1] - target.y) * SCREEN_HEIGHT // target.height
+        return pygame.event.Event(event.type, {**event.dict, "pos": (x, y)})
+    
+    def _present_canvas(self):
+        """論理キャンバスを一度だけ拡大してウィンドウに転送する"""
+        target = self.layout_cache.get(_letterbox_for_window, self.window.get_size())
+        if self._window_dirty:
+            # サイズ変更後はウィンドウ（余白部分）を塗り直す
+            self.window = pygame.display.get_surface()
+            self.window.fill(BLACK)
+            self._window_dirty = False
+        
+        if target.size == self.screen.get_size():
+            self.window.blit(self.screen, target)
+            return
+        
+        if self._scaled_canvas is None or self._scaled_canvas.get_size() != target.size:
+            self._scaled_canvas = pygame.Surface(target.size, 0, self.screen)
+            self.memory.track("display", "scaled_canvas", self._scaled_canvas)
+        pygame.transform.scale(self.screen, target.size, self._scaled_canvas)
+        self.window.blit(self._scaled_canvas, target)
+    
+    @property
+    def logic_time(self) -> float:
+        """ロジック時計の現在時刻（秒、LOGIC_HZ 刻み）"""
+        return self.logic_ticks / LOGIC_HZ
+    
+    def advance_logic(self, elapsed: float) -> int:
+        """
+        経過した実時間の分だけ、固定ステップでゲームロジックを進める
+        
+        描画が遅れたフレームでは複数ティックをまとめて実行して追いつく。
+        MAX_LOGIC_STEPS_PER_FRAME を超える遅れ（ウィンドウの移動などによる停止）は
+        捨てるため、その間はロジック時計も止まる。
+        
+        Args:
+            elapsed: 前回からの経過時間（秒）
+        
+        Returns:
+            実行したティック数
+        """
+        self._logic_accumulator += elapsed
+        steps = 0
+        while self._logic_accumulator >= LOGIC_STEP:
+            if steps >= MAX_LOGIC_STEPS_PER_FRAME:
+                self._logic_accumulator = 0.0
+                break
+            self.update()
+            self._logic_accumulator -= LOGIC_STEP
+            steps += 1
+        return steps
     
     def update(self):
-        """ゲーム状態の更新"""
-        if self.state == GameState.TITLE:
-            self.title_screen.update()
-        elif self.state == GameState.PREPARE:
-            self.prepare_screen.update()
-        elif self.state == GameState.PLAYING:
-            self.game_screen.update()
-        elif self.state == GameState.RESULT:
-            self.result_screen.update()
+        """ゲーム状態の更新（ロジックの1ティック分）"""
+        self.logic_ticks += 1
+        self.screens[self.state].update()
     
     def render(self):
         """画面の描画"""
+        self.memory.begin_frame()
         self.screen.fill(BACKGROUND_COLOR)
+        self.screens[self.state].render(self.screen)
+        if self.window is not None:
+            self._present_canvas()
+        if self.display_mode == "texture":
+            self.screen.present()
+        else:
+            pygame.display.flip()
+        self.memory.end_frame(self.state.name.lower())
         
-        if self.state == GameState.TITLE:
-            self.title_screen.render(self.screen)
-        elif self.state == GameState.PREPARE:
-            self.prepare_screen.render(self.screen)
-        elif self.state == GameState.PLAYING:
-            self.game_screen.render(self.screen)
-        elif self.state == GameState.RESULT:
-            self.result_screen.render(self.screen)
-        
-        pygame.display.flip()
+        if self.latency_tracker:
+            self.latency_tracker.frame_presented()
+    
+    def save_recent_questions(self):
+        """直近のプレイで出題した問題を保存する（有効な場合のみ）"""
+        if self.recent_questions is not None and self.recent_questions_file is not None:
+            self.recent_questions.save(self.recent_questions_file)
     
     def change_state(self, new_state: GameState):
         """ゲーム状態を変更する"""
         self.state = new_state
+        self._apply_event_filter()
         
         # 状態変更時の初期化処理
         if new_state == GameState.PREPARE:
             self.prepare_screen.reset()
         elif new_state == GameState.PLAYING:
+            if self.run_log:
+                self.run_log.begin_run()
             self.game_screen.reset()
-        elif new_state == GameState.RESULT:
+        elif new_state == GameState.VERSUS:
+            if self.run_log:
+                self.run_log.begin_run()
+            self.versus_screen.reset()
+        
+        if new_state == GameState.RESULT:
+            self.audio.play(audio.RESULT)
+            self.save_recent_questions()
+            if self.recorder:
+                self.recorder.flush()
+        
+        if new_state == GameState.RESULT and self.run_log:
+            winner = self.versus_winner if self.run_type == RunType.VERSUS else None
+            self.run_log.end_run(self.game_mode, self.run_type, self.clear_time, self.answered_count, winner)
+        
+        if new_state == GameState.RESULT and self.run_type == RunType.STANDARD:
+            # ベストタイムとクリアタイムの計測は TOTAL_QUESTIONS 問のプレイのみ
             if self.clear_time < self.best_times[self.game_mode]:
                 self.best_times[self.game_mode] = self.clear_time
+            if self.metrics:
+                self.metrics.record_run(self.game_mode, self.clear_time)
+    
+    def create_rng(self, name: str) -> random.Random:
+        """
+        用途ごとに独立した乱数生成器を作成する
+        
+        Args:
+            name: 用途の名前（シードと組み合わせて系列を分ける）
+        
+        Returns:
+            乱数生成器（シード未指定の場合は毎回異なる系列）
+        """
+        if self.seed is None:
+            return random.Random()
+        return random.Random(f"{self.seed}:{name}")
     
     def set_game_mode(self, mode: GameMode):
         """ゲームモードを設定する"""
@@ -9,6 +9,7 @@ class GameState(Enum):
     TITLE = auto()
     PREPARE = auto()
     PLAYING = auto()
+    VERSUS = auto()
     RESULT = auto()
 
 
@@ -17,3 +18,12 @@ class GameMode(Enum):
     EASY = auto()    # 足し算のみ
     NORMAL = auto()  # 足し算と引き算
     HARD = auto()    # 足し算、引き算、掛け算
+    EXPERT = auto()  # 足し算、引き算、掛け算、割り算
+
+
+class RunType(Enum):
+    """1回のプレイの終わり方を表す列挙型"""
+    STANDARD = auto()     # TOTAL_QUESTIONS 問を解くまでのタイムを競う
+    ENDLESS = auto()      # 終わりなく出題し、やめるまでに解いた数を数える
+    TIME_ATTACK = auto()  # 制限時間内に解いた数を競う
+    VERSUS = auto()       # 2人で同じ問題を解き、先に TOTAL_QUESTIONS 問解いた方の勝ち
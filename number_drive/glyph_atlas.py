@@ -0,0 +1,221 @@
+"""
+ピクセルフォントの文字を事前にラスタライズして描画するモジュール
+"""
+import pygame
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from number_drive.config import get_font
+from number_drive.memory import MemoryAccounting
+
+# アトラスに事前に登録する文字（ASCIIの表示可能文字）
+DEFAULT_CHARSET = "".join(chr(code) for code in range(32, 127))
+
+# (サイズ, 色) ごとのアトラス
+_atlases: Dict[Tuple[int, tuple], "GlyphAtlas"] = {}
+
+# 組み立て済み文字列のキャッシュの利用状況（全アトラスの合計）
+text_cache_stats = {"hits": 0, "misses": 0}
+
+# 新しく作ったサーフェスを数える集計先（アトラスは全体で共有するので、集計先も全体で1つ）
+_memory: Optional[MemoryAccounting] = None
+
+
+class GlyphAtlas:
+    """
+    1つのサイズと色の文字をまとめて保持するグリフアトラス
+
+    文字ごとにFreeTypeで一度だけラスタライズして1枚のサーフェスに並べておき、
+    文字列は文字の領域を blits で並べて組み立てる。Press Start 2P は等幅の
+    ピクセルフォントなので、組み立てた結果は Font.render と同じになる。
+    組み立てた文字列は直近のものだけ保持するため、タイマーのように数フレームに
+    一度しか変わらない文字列は、変わらない間は1回の転送で描画できる。
+    """
+
+    def __init__(self, size: int, color: Tuple[int, int, int], charset: str = DEFAULT_CHARSET,
+                 max_cached_strings: int = 16):
+        """
+        グリフアトラスの初期化
+
+        Args:
+            size: フォントサイズ
+            color: 文字色
+            charset: 事前にラスタライズする文字
+            max_cached_strings: 組み立て済みの文字列を保持する数
+        """
+        self.font = get_font(size)
+        self.color = color
+        self.height = self.font.get_height()
+        self.rects: Dict[str, pygame.Rect] = {}
+        self.surface = None
+        self.max_cached_strings = max_cached_strings
+        self._strings: "OrderedDict[str, pygame.Surface]" = OrderedDict()
+        self._build(charset)
+
+    def _build(self, charset: str):
+        """
+        文字をラスタライズしてアトラスのサーフェスを作成する
+
+        Args:
+            charset: アトラスに含める文字
+        """
+        chars = list(dict.fromkeys(list(self.rects) + list(charset)))
+        glyphs = [self.font.render(char, True, self.color) for char in chars]
+        width = sum(glyph.get_width() for glyph in glyphs)
+        surface = pygame.Surface((max(width, 1), self.height), pygame.SRCALPHA)
+
+        x = 0
+        for char, glyph in zip(chars, glyphs):
+            surface.blit(glyph, (x, 0), special_flags=pygame.BLEND_RGBA_MAX)  # 透明なアトラスへそのまま複写
+            self.rects[char] = pygame.Rect(x, 0, glyph.get_width(), self.height)
+            x += glyph.get_width()
+        if pygame.display.get_surface() is not None:
+            # 表示用のピクセル形式に合わせておくと転送が速くなる
+            surface = surface.convert_alpha()
+        self.surface = surface
+        if _memory is not None:
+            for glyph in glyphs:
+                _memory.transient(glyph)
+            _memory.transient(surface)
+
+    def size(self, text: str) -> Tuple[int, int]:
+        """
+        文字列を描画したときのサイズを取得する
+
+        Args:
+            text: 文字列
+
+        Returns:
+            (幅, 高さ)
+        """
+        self._ensure(text)
+        rects = self.rects
+        return sum(rects[char].width for char in text), self.height
+
+    def get_rect(self, text: str, **kwargs) -> pygame.Rect:
+        """
+        文字列を描画する位置を取得する（Surface.get_rect と同じ指定方法）
+
+        Args:
+            text: 文字列
+            **kwargs: center=(x, y) などの配置指定
+
+        Returns:
+            描画位置の矩形
+        """
+        rect = pygame.Rect((0, 0), self.size(text))
+        for name, value in kwargs.items():
+            setattr(rect, name, value)
+        return rect
+
+    def render(self, text: str) -> pygame.Surface:
+        """
+        文字列を組み立てたサーフェスを取得する（Font.render の代わり）
+
+        Args:
+            text: 文字列
+
+        Returns:
+            文字列を描画したサーフェス（共有されるため描き換えてはいけない）
+        """
+        strings = self._strings
+        rendered = strings.get(text)
+        if rendered is not None:
+            text_cache_stats["hits"] += 1
+            strings.move_to_end(text)
+            return rendered
+        text_cache_stats["misses"] += 1
+
+        rendered = pygame.Surface(self.size(text), pygame.SRCALPHA)
+        atlas = self.surface
+        rects = self.rects
+        x = 0
+        sequence = []
+        for char in text:
+            area = rects[char]
+            sequence.append((atlas, (x, 0), area, pygame.BLEND_RGBA_MAX))
+            x += area.width
+        rendered.blits(sequence, doreturn=False)
+        if _memory is not None:
+            _memory.transient(rendered)
+
+        strings[text] = rendered
+        if len(strings) > self.max_cached_strings:
+            strings.popitem(last=False)
+        return rendered
+
+    def blit(self, surface: pygame.Surface, text: str, **kwargs) -> pygame.Rect:
+        """
+        文字列を描画する
+
+        Args:
+            surface: 描画対象のサーフェス
+            text: 文字列
+            **kwargs: center=(x, y) などの配置指定
+
+        Returns:
+            描画した領域の矩形
+        """
+        rendered = self.render(text)
+        rect = rendered.get_rect(**kwargs)
+        surface.blit(rendered, rect)
+        return rect
+
+    def _ensure(self, text: str):
+        """
+        アトラスにない文字があれば追加する
+
+        Args:
+            text: 描画する文字列
+        """
+        rects = self.rects
+        missing = [char for char in text if char not in rects]
+        if missing:
+            self._build("".join(missing))
+            self._strings.clear()
+
+
+def atlas_surfaces():
+    """
+    作成済みのグリフアトラスが保持しているサーフェスを列挙する（メモリ集計用）
+
+    Returns:
+        (名前, サーフェス) のリスト
+    """
+    surfaces = []
+    for (size, color), atlas in list(_atlases.items()):
+        surfaces.append((f"atlas:{size}:{color}", atlas.surface))
+        for text, rendered in list(atlas._strings.items()):
+            surfaces.append((f"text:{size}:{text}", rendered))
+    return surfaces
+
+
+def set_memory_accounting(memory: Optional[MemoryAccounting]):
+    """
+    アトラスが新しく作ったサーフェスを数える集計先を設定する
+
+    Args:
+        memory: 集計先（Noneなら数えない）
+    """
+    global _memory
+    _memory = memory
+
+
+def get_glyph_atlas(size: int, color: Tuple[int, int, int], preload: bool = True) -> GlyphAtlas:
+    """
+    指定したサイズと色のグリフアトラスを取得する（初回のみ作成）
+
+    Args:
+        size: フォントサイズ
+        color: 文字色
+        preload: ASCIIの文字を事前にラスタライズするかどうか
+            （Falseなら使われた文字だけを追加していくため、大きな文字でもメモリが少なくて済む）
+
+    Returns:
+        グリフアトラス
+    """
+    key = (int(size), tuple(color))
+    atlas = _atlases.get(key)
+    if atlas is None:
+        atlas = _atlases[key] = GlyphAtlas(int(size), tuple(color), DEFAULT_CHARSET if preload else "")
+    return atlas
@@ -0,0 +1,291 @@
+"""
+ゲームループの計測値を集計するモジュール
+"""
+import json
+import platform
+import pygame
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+
+# キー入力から表示までの遅延ヒストグラムの区切り（ミリ秒、上限値）
+LATENCY_BUCKETS_MS = (2, 4, 8, 12, 16, 20, 25, 33, 50, 67, 100, 150, 250, 500)
+
+
+class Instrumentation:
+    """
+    フレームごとの計測値を集計するクラス
+
+    イベントについては、SDLのキューから受け取った数（種類別）、
+    画面へ渡した数、MOUSEMOTIONの間引きで捨てた数をフレーム単位で記録する。
+    """
+
+    def __init__(self):
+        """計測値の初期化"""
+        self.frames = 0
+        self.received_events = Counter()  # 現フレームで受け取ったイベント数（種類別）
+        self.dispatched_events = 0  # 現フレームで画面へ渡したイベント数
+        self.coalesced_events = 0  # 現フレームで間引いたMOUSEMOTIONの数
+        self.total_received_events = Counter()
+        self.total_dispatched_events = 0
+        self.total_coalesced_events = 0
+        self.last_frame_events: Dict[str, int] = {}
+
+    def begin_event_frame(self):
+        """新しいフレームのイベント集計を開始する"""
+        if self.frames:
+            self.last_frame_events = self.frame_event_counts()
+        self.frames += 1
+        self.received_events.clear()
+        self.dispatched_events = 0
+        self.coalesced_events = 0
+
+    def count_received(self, event_type: int):
+        """
+        受け取ったイベントを記録する
+
+        Args:
+            event_type: イベントの種類
+        """
+        self.received_events[event_type] += 1
+        self.total_received_events[event_type] += 1
+
+    def count_dispatched(self):
+        """画面へ渡したイベントを記録する"""
+        self.dispatched_events += 1
+        self.total_dispatched_events += 1
+
+    def count_coalesced(self):
+        """間引いたMOUSEMOTIONを記録する"""
+        self.coalesced_events += 1
+        self.total_coalesced_events += 1
+
+    def frame_event_counts(self) -> Dict[str, int]:
+        """
+        現フレームのイベント数を取得する
+
+        Returns:
+            イベント名ごとの受信数と、dispatched/coalescedの合計を含む辞書
+        """
+        counts = {pygame.event.event_name(event_type): count
+                  for event_type, count in self.received_events.items()}
+        counts["dispatched"] = self.dispatched_events
+        counts["coalesced"] = self.coalesced_events
+        return counts
+
+
+class LatencyHistogram:
+    """遅延をミリ秒単位の固定区間で数えるヒストグラム"""
+
+    def __init__(self):
+        """ヒストグラムの初期化"""
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)  # 最後の区間は上限超え
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, latency_ms: float):
+        """
+        遅延を1件記録する
+
+        Args:
+            latency_ms: 遅延（ミリ秒）
+        """
+        index = len(LATENCY_BUCKETS_MS)
+        for i, upper in enumerate(LATENCY_BUCKETS_MS):
+            if latency_ms <= upper:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def percentile(self, fraction: float) -> float:
+        """
+        区間の上限値から近似したパーセンタイルを取得する
+
+        Args:
+            fraction: 0〜1の割合（例: 0.95）
+
+        Returns:
+            近似したパーセンタイル値（ミリ秒）
+        """
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return float(LATENCY_BUCKETS_MS[i]) if i < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        """
+        書き出し用の辞書に変換する
+
+        Returns:
+            区間ごとの件数と要約統計を含む辞書
+        """
+        labels = [f"<={upper}" for upper in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max_ms,
+            "buckets_ms": dict(zip(labels, self.counts))
+        }
+
+
+class LatencyTracker:
+    """
+    キー入力から画面表示までの遅延を計測するクラス
+
+    KEYDOWNが届いた時刻と、その入力が反映されたフレームの pygame.display.flip が
+    返った時刻との差を画面ごとに集計する。Pygameのイベントには届いた時刻がないので、
+    前回キューを空にした時刻を届いた時刻とみなす（遅いフレームの間キューで待った時間も
+    含めた、遅延の上限値になる）。
+
+    マルバツの表示中に先行入力として溜めたキーは、まだ画面に反映されていないので
+    defer_key で保留し、key_applied で適用されたときに次のフレームで確定する。
+    """
+
+    def __init__(self, max_samples: int = 1000):
+        """
+        遅延計測の初期化
+
+        Args:
+            max_samples: 書き出し用に保持する直近のサンプル数
+        """
+        self.frame = 0
+        self.pending: List[Tuple[float, str, int]] = []  # (届いた時刻, 画面名, キー)
+        self.deferred: Dict[int, Tuple[float, str, int]] = {}  # 先行入力として溜めたキー
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.samples: Deque[Tuple[int, str, int, float]] = deque(maxlen=max_samples)
+        self._last_drain: Optional[float] = None
+        self._arrival_bound = 0.0
+        self._next_token = 0
+
+    def begin_drain(self):
+        """イベントキューを空にする直前に呼び出す（この回に受け取るキーが届いた時刻の下限を決める）"""
+        now = time.perf_counter()
+        self._arrival_bound = self._last_drain if self._last_drain is not None else now
+        self._last_drain = now
+
+    def key_received(self, screen_name: str, key: int):
+        """
+        KEYDOWNの受信を記録する
+
+        Args:
+            screen_name: 入力を受け取った画面の名前
+            key: キーコード
+        """
+        self.pending.append((self._arrival_bound, screen_name, key))
+
+    def defer_key(self) -> Optional[int]:
+        """
+        最後に受け取ったキーを、画面に反映されるまで保留する
+
+        Returns:
+            key_applied・discard_key に渡す番号（保留するキーがなければNone）
+        """
+        if not self.pending:
+            return None
+        token = self._next_token
+        self._next_token += 1
+        self.deferred[token] = self.pending.pop()
+        return token
+
+    def key_applied(self, token: Optional[int]):
+        """
+        保留したキーが適用されたことを記録する（次のフレームの表示で遅延を確定する）
+
+        Args:
+            token: defer_key の戻り値
+        """
+        entry = self.deferred.pop(token, None)
+        if entry is not None:
+            self.pending.append(entry)
+
+    def discard_key(self, token: Optional[int]):
+        """
+        保留したキーを適用せずに捨てる（遅延は記録しない）
+
+        Args:
+            token: defer_key の戻り値
+        """
+        self.deferred.pop(token, None)
+
+    def frame_presented(self):
+        """フレームの表示完了を記録し、保留中の入力の遅延を確定する"""
+        self.frame += 1
+        if not self.pending:
+            return
+        presented_at = time.perf_counter()
+        for received_at, screen_name, key in self.pending:
+            latency_ms = (presented_at - received_at) * 1000.0
+            histogram = self.histograms.get(screen_name)
+            if histogram is None:
+                histogram = self.histograms[screen_name] = LatencyHistogram()
+            histogram.add(latency_ms)
+            self.samples.append((self.frame, screen_name, key, latency_ms))
+        self.pending.clear()
+
+    def report(self, settings: Optional[dict] = None) -> dict:
+        """
+        計測結果をまとめる
+
+        Args:
+            settings: 比較用に記録する実行環境の設定（FPSなど）
+
+        Returns:
+            画面ごとのヒストグラムと直近のサンプルを含む辞書
+        """
+        return {
+            "environment": {
+                "platform": platform.platform(),
+                "python": platform.python_version(),
+                "pygame": pygame.version.ver,
+                "video_driver": pygame.display.get_driver() if pygame.display.get_init() else None
+            },
+            "settings": settings or {},
+            "frames": self.frame,
+            "screens": {name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())},
+            "samples": [
+                {"frame": frame, "screen": screen_name, "key": pygame.key.name(key), "latency_ms": latency_ms}
+                for frame, screen_name, key, latency_ms in self.samples
+            ]
+        }
+
+    def export(self, path: Path, settings: Optional[dict] = None):
+        """
+        計測結果をJSONファイルに書き出す
+
+        Args:
+            path: 出力先のパス
+            settings: 比較用に記録する実行環境の設定（FPSなど）
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(settings), f, indent=2)
+
+    def summary(self) -> str:
+        """
+        画面ごとの遅延の要約を文字列で取得する
+
+        Returns:
+            1画面1行の要約
+        """
+        lines = []
+        for name, histogram in sorted(self.histograms.items()):
+            stats = histogram.to_dict()
+            lines.append(
+                f"{name}: n={stats['count']} mean={stats['mean_ms']:.1f}ms "
+                f"p95<={stats['p95_ms']:.0f}ms max={stats['max_ms']:.1f}ms"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,131 @@
+"""
+画面サイズごとのレイアウトを計算・キャッシュするモジュール
+"""
+import pygame
+from typing import Callable, Dict, Tuple
+
+
+class GameLayout:
+    """ゲーム画面の各要素の位置とサイズ"""
+
+    def __init__(self, width: int, height: int):
+        """
+        ゲーム画面のレイアウトを計算する
+
+        Args:
+            width: 描画先の幅
+            height: 描画先の高さ
+        """
+        self.size = (width, height)
+        self.center_x = width // 2
+
+        # 上下の装飾ライン
+        self.top_line = ((width * 0.1, 60), (width * 0.9, 60))
+        self.bottom_line = ((width * 0.1, height - 60), (width * 0.9, height - 60))
+
+        # タイマーと問題数
+        self.timer_topleft = (30, 20)
+        self.question_topright = (width - 30, 20)
+
+        # ナンバープレートと光彩、計算式
+        plate_width = width * 0.45  # 幅を少し大きく
+        plate_height = int(plate_width * 0.5)  # 縦横比を1:2に調整
+        plate_x = (width - plate_width) // 2
+        plate_y = height // 3 - 20  # 少し上に移動
+        self.plate = (plate_x, plate_y, plate_width, plate_height)
+        self.plate_glow_size = (plate_width + 6, plate_height + 6)
+        self.plate_glow_topleft = (plate_x - 3, plate_y - 3)
+        self.equation_center = (self.center_x, plate_y - 40)
+
+        # 入力エリア（背景の幅は入力内容に合わせて描画時に決める）
+        self.input_center = (self.center_x, height * 2 // 3 + 50)  # さらに下に移動
+        self.input_label_gap = 25  # 入力エリアからさらに離す
+
+        # フィードバック（画面の60%サイズの大きなマルバツ）
+        self.feedback_size = int(min(width, height) * 0.6)
+        self.feedback_center = (self.center_x, height // 2)
+
+        # 操作ヘルプ
+        self.help_center = (self.center_x, height - 30)
+
+        # モーダルウィンドウ
+        modal_width = min(650, width - 20)  # さらに幅を広げる
+        modal_height = 300  # 高さはそのまま
+        modal_x = (width - modal_width) // 2
+        modal_y = (height - modal_height) // 2
+        self.modal_rect = pygame.Rect(modal_x, modal_y, modal_width, modal_height)
+        self.modal_title_center = (self.center_x, modal_y + 50)
+        self.modal_message_center = (self.center_x, modal_y + 100)
+        self.modal_help_center = (self.center_x, modal_y + modal_height - 30)
+
+        # モーダルのボタン（中断、閉じる）
+        button_spacing = 60  # ボタン間隔をさらに広げる
+        button_width = min(250, (modal_width - button_spacing) // 2 - 10)  # さらに幅を広げる
+        button_height = 60  # 高さはそのまま
+        modal_center_y = height // 2
+        self.quit_button = pygame.Rect(
+            self.center_x - button_width - button_spacing // 2,
+            modal_center_y + 40,  # 少し下に移動
+            button_width,
+            button_height
+        )
+        self.close_button = pygame.Rect(
+            self.center_x + button_spacing // 2,
+            modal_center_y + 40,  # 少し下に移動
+            button_width,
+            button_height
+        )
+
+
+def compute_letterbox(canvas_size: Tuple[int, int], window_size: Tuple[int, int]) -> pygame.Rect:
+    """
+    縦横比を保ったまま論理キャンバスをウィンドウに収める領域を計算する
+
+    Args:
+        canvas_size: 論理キャンバスのサイズ
+        window_size: ウィンドウのサイズ
+
+    Returns:
+        ウィンドウ内の描画領域
+    """
+    scale = min(window_size[0] / canvas_size[0], window_size[1] / canvas_size[1])
+    width = max(1, int(canvas_size[0] * scale))
+    height = max(1, int(canvas_size[1] * scale))
+    rect = pygame.Rect(0, 0, width, height)
+    rect.center = (window_size[0] // 2, window_size[1] // 2)
+    return rect
+
+
+class LayoutCache:
+    """
+    レイアウトを描画先のサイズごとに一度だけ計算して保持するクラス
+
+    レイアウトの計算関数とサイズの組み合わせをキーにするため、
+    同じサイズで描画している間は毎フレームの再計算が発生しない。
+    ウィンドウサイズが変わったときは invalidate で破棄する。
+    """
+
+    def __init__(self):
+        """レイアウトキャッシュの初期化"""
+        self._layouts: Dict[tuple, object] = {}
+
+    def get(self, builder: Callable, size: Tuple[int, int]):
+        """
+        レイアウトを取得する（未計算なら計算する）
+
+        Args:
+            builder: サイズ（幅, 高さ）を受け取ってレイアウトを返す関数
+            size: 描画先のサイズ
+
+        Returns:
+            計算済みのレイアウト
+        """
+        key = (builder, size[0], size[1])
+        layout = self._layouts.get(key)
+        if layout is None:
+            layout = self._layouts[key] = builder(*size)
+        return layout
+
+    def invalidate(self):
+        """保持しているレイアウトをすべて破棄する"""
+        self._layouts.clear()
@@ -0,0 +1,177 @@
+"""
+サーフェスのメモリ使用量を集計するモジュール
+"""
+import json
+import pygame
+import weakref
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+
+def surface_bytes(surface: pygame.Surface) -> int:
+    """
+    サーフェスのピクセルデータのバイト数を求める
+
+    Args:
+        surface: サーフェス
+
+    Returns:
+        バイト数（1行あたりのバイト数 × 高さ）
+    """
+    return surface.get_pitch() * surface.get_height()
+
+
+class MemoryAccounting:
+    """
+    サーフェスのメモリ使用量を集計するクラス
+
+    画像などの長く保持するサーフェスは track で所有者ごとに登録し（弱参照なので
+    破棄されれば集計から外れる）、キャッシュのように中身が入れ替わるものは
+    add_source で集計時に列挙する関数を登録する。描画中に作ったサーフェス（キャッシュに
+    なかった文字列・プレート・回転した絵など）は作った側が transient で数え、
+    フレームごとの合計の最大値を記録する。
+    """
+
+    def __init__(self):
+        """集計の初期化"""
+        self._tracked: Dict[str, Dict[str, "weakref.ref[pygame.Surface]"]] = {}
+        self._sources: Dict[str, Callable[[], Iterable[Tuple[str, pygame.Surface]]]] = {}
+        self.frame_transient_bytes = 0
+        self.frame_transient_count = 0
+        self.last_transient_bytes = 0
+        self.peak_transient_bytes = 0
+        self.peak_transient_by_state: Dict[str, int] = {}
+        self.frames = 0
+
+    def track(self, owner: str, name: str, surface: Optional[pygame.Surface]) -> Optional[pygame.Surface]:
+        """
+        長く保持するサーフェスを登録する
+
+        Args:
+            owner: 所有者の名前（画面名など）
+            name: サーフェスの名前
+            surface: サーフェス（Noneの場合は何もしない）
+
+        Returns:
+            渡したサーフェス（そのまま代入に使える）
+        """
+        if surface is not None:
+            self._tracked.setdefault(owner, {})[name] = weakref.ref(surface)
+        return surface
+
+    def add_source(self, owner: str, source: Callable[[], Iterable[Tuple[str, pygame.Surface]]]):
+        """
+        集計時に保持中のサーフェスを列挙する関数を登録する
+
+        Args:
+            owner: 所有者の名前
+            source: (名前, サーフェス) を列挙する関数
+        """
+        self._sources[owner] = source
+
+    def transient(self, surface: pygame.Surface) -> pygame.Surface:
+        """
+        描画中に作ったサーフェスを数える（描画の外で呼ばれた分は次の begin_frame で捨てる）
+
+        Args:
+            surface: 作ったサーフェス
+
+        Returns:
+            渡したサーフェス（そのまま式の中で使える）
+        """
+        self.frame_transient_bytes += surface.get_pitch() * surface.get_height()
+        self.frame_transient_count += 1
+        return surface
+
+    def begin_frame(self):
+        """フレームごとの一時サーフェスの集計を開始する"""
+        self.frame_transient_bytes = 0
+        self.frame_transient_count = 0
+
+    def end_frame(self, state_name: str):
+        """
+        フレームの一時サーフェスの集計を確定する
+
+        Args:
+            state_name: フレームを描画した画面の名前
+        """
+        self.frames += 1
+        transient_bytes = self.frame_transient_bytes
+        self.last_transient_bytes = transient_bytes
+        if transient_bytes > self.peak_transient_bytes:
+            self.peak_transient_bytes = transient_bytes
+        if transient_bytes > self.peak_transient_by_state.get(state_name, 0):
+            self.peak_transient_by_state[state_name] = transient_bytes
+
+    def live_surfaces(self) -> Dict[str, Dict[str, int]]:
+        """
+        所有者ごとの保持中のサーフェスを集計する
+
+        Returns:
+            所有者名ごとの {"surfaces": 枚数, "bytes": バイト数}
+        """
+        owners: Dict[str, Dict[str, int]] = {}
+        seen = set()
+        for owner, surfaces in list(self._tracked.items()):
+            for ref in list(surfaces.values()):
+                surface = ref()
+                if surface is not None:
+                    self._add(owners, owner, surface, seen)
+        for owner, source in list(self._sources.items()):
+            for _, surface in source():
+                self._add(owners, owner, surface, seen)
+        return owners
+
+    @staticmethod
+    def _add(owners: Dict[str, Dict[str, int]], owner: str, surface: pygame.Surface, seen: set):
+        """同じサーフェスを二重に数えないように集計に加える"""
+        if id(surface) in seen:
+            return
+        seen.add(id(surface))
+        totals = owners.setdefault(owner, {"surfaces": 0, "bytes": 0})
+        totals["surfaces"] += 1
+        totals["bytes"] += surface_bytes(surface)
+
+    def report(self) -> dict:
+        """
+        集計結果をまとめる
+
+        Returns:
+            保持中のサーフェスと一時サーフェスの最大値を含む辞書
+        """
+        owners = self.live_surfaces()
+        return {
+            "live_bytes": sum(totals["bytes"] for totals in owners.values()),
+            "owners": dict(sorted(owners.items())),
+            "frames": self.frames,
+            "transient_peak_bytes": self.peak_transient_bytes,
+            "transient_peak_bytes_by_screen": dict(sorted(self.peak_transient_by_state.items()))
+        }
+
+    def export(self, path: Path):
+        """
+        集計結果をJSONファイルに書き出す
+
+        Args:
+            path: 出力先のパス
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def summary(self) -> str:
+        """
+        集計結果の要約を文字列で取得する
+
+        Returns:
+            所有者ごとに1行の要約と一時サーフェスの最大値
+        """
+        report = self.report()
+        lines = [
+            f"{owner}: {totals['surfaces']} surfaces, {totals['bytes'] / 1024:.1f} KiB"
+            for owner, totals in report["owners"].items()
+        ]
+        lines.append(f"live total: {report['live_bytes'] / 1024:.1f} KiB, "
+                     f"transient peak per frame: {report['transient_peak_bytes'] / 1024:.1f} KiB")
+        return "\n".join(lines)
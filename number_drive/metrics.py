@@ -0,0 +1,281 @@
+"""
+実行中のゲームの計測値をPrometheusのテキスト形式で公開するモジュール
+"""
+import pygame
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from number_drive import config, glyph_atlas, text_cache
+from number_drive.game_enums import GameMode, GameState
+from number_drive.memory import MemoryAccounting
+
+# フレーム時間のヒストグラムの区切り（秒、上限値）
+FRAME_TIME_BUCKETS = (0.001, 0.002, 0.004, 0.008, 0.012, 0.0167, 0.02, 0.025, 0.033, 0.05, 0.1, 0.25)
+
+# クリアタイムのヒストグラムの区切り（秒、上限値）
+CLEAR_TIME_BUCKETS = (20, 30, 40, 50, 60, 75, 90, 120, 180, 300)
+
+METRIC_PREFIX = "number_drive"
+
+
+class FixedHistogram:
+    """
+    区切りを固定したヒストグラム（Prometheusのhistogramと同じ形式で書き出せる）
+
+    配列は作成時に確保し、記録では要素を書き換えるだけなのでロックを取らない。
+    書き込むのはゲームループのスレッドだけで、読み出し側は snapshot で
+    その時点の値をコピーして使う。
+    """
+
+    __slots__ = ("buckets", "counts", "total")
+
+    def __init__(self, buckets: Sequence[float]):
+        """
+        ヒストグラムの初期化
+
+        Args:
+            buckets: 区間の上限値（昇順）
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 最後の区間は上限超え
+        self.total = 0.0
+
+    def observe(self, value: float):
+        """
+        値を1件記録する
+
+        Args:
+            value: 記録する値
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+    def snapshot(self):
+        """
+        現在の値をコピーする
+
+        Returns:
+            (区間ごとの件数のリスト, 合計値)
+        """
+        return list(self.counts), self.total
+
+
+class GameMetrics:
+    """
+    ゲームループの計測値を集めるクラス
+
+    状態・モード・イベントの種類ごとの記録先はすべて作成時に用意しておき、
+    フレームごとの記録では辞書の追加や確保をしない。
+    """
+
+    def __init__(self, event_types: Iterable[int], memory: Optional[MemoryAccounting] = None):
+        """
+        計測値の初期化
+
+        Args:
+            event_types: 種類別に数えるイベントの種類（それ以外は "other" にまとめる）
+            memory: サーフェスのメモリ集計（指定した場合は使用量も公開する）
+        """
+        self.memory = memory
+        self.frame_seconds = {state: FixedHistogram(FRAME_TIME_BUCKETS) for state in GameState}
+        self.frame_work_seconds = {state: FixedHistogram(FRAME_TIME_BUCKETS) for state in GameState}
+        self.clear_time_seconds = {mode: FixedHistogram(CLEAR_TIME_BUCKETS) for mode in GameMode}
+        self.runs_completed = {mode: 0 for mode in GameMode}
+        self.fps = 0.0
+
+        self.event_names = {event_type: pygame.event.event_name(event_type) for event_type in event_types}
+        self.events_received = {event_type: 0 for event_type in self.event_names}
+        self.events_received_other = 0
+        self.events_dispatched = 0
+        self.events_coalesced = 0
+
+    def record_frame(self, state: GameState, frame_seconds: float, work_seconds: float,
+                     fps: float, instrumentation):
+        """
+        1フレーム分の計測値を記録する
+
+        Args:
+            state: フレームを処理した時点のゲーム状態
+            frame_seconds: 前のフレームからの経過時間（待ち時間を含む）
+            work_seconds: イベント処理・更新・描画にかかった時間
+            fps: 直近の平均FPS
+            instrumentation: フレームのイベント数を持つ Instrumentation
+        """
+        self.frame_seconds[state].observe(frame_seconds)
+        self.frame_work_seconds[state].observe(work_seconds)
+        self.fps = fps
+
+        received = self.events_received
+        for event_type, count in instrumentation.received_events.items():
+            if event_type in received:
+                received[event_type] += count
+            else:
+                self.events_received_other += count
+        self.events_dispatched += instrumentation.dispatched_events
+        self.events_coalesced += instrumentation.coalesced_events
+
+    def record_run(self, mode: GameMode, clear_time: float):
+        """
+        クリアしたゲームを記録する
+
+        Args:
+            mode: ゲームモード
+            clear_time: クリアタイム（秒）
+        """
+        self.runs_completed[mode] += 1
+        self.clear_time_seconds[mode].observe(clear_time)
+
+    def render(self) -> str:
+        """
+        計測値をPrometheusのテキスト形式で書き出す（HTTPサーバーのスレッドから呼ばれる）
+
+        Returns:
+            テキスト形式の計測値
+        """
+        lines: List[str] = []
+
+        _write_histograms(lines, "frame_seconds", "Frame interval including the frame cap wait",
+                          "state", {state.name.lower(): h for state, h in self.frame_seconds.items()})
+        _write_histograms(lines, "frame_work_seconds", "Time spent on events, update and render per frame",
+                          "state", {state.name.lower(): h for state, h in self.frame_work_seconds.items()})
+        _write_header(lines, "fps", "gauge", "Average frames per second reported by pygame")
+        lines.append(f"{METRIC_PREFIX}_fps {self.fps}")
+
+        _write_header(lines, "events_received_total", "counter", "Events taken from the SDL queue")
+        for event_type, name in self.event_names.items():
+            lines.append(f'{METRIC_PREFIX}_events_received_total{{type="{name}"}} {self.events_received[event_type]}')
+        lines.append(f'{METRIC_PREFIX}_events_received_total{{type="other"}} {self.events_received_other}')
+        _write_header(lines, "events_dispatched_total", "counter", "Events passed to the current screen")
+        lines.append(f"{METRIC_PREFIX}_events_dispatched_total {self.events_dispatched}")
+        _write_header(lines, "events_coalesced_total", "counter", "MOUSEMOTION events dropped by coalescing")
+        lines.append(f"{METRIC_PREFIX}_events_coalesced_total {self.events_coalesced}")
+
+        _write_cache(lines, "font_cache", "Font objects", config.font_cache_stats)
+        _write_cache(lines, "text_cache", "Glyph atlas composed strings", glyph_atlas.text_cache_stats)
+        _write_cache(lines, "rendered_text_cache", "Rendered labels", text_cache.rendered_text_stats)
+
+        _write_header(lines, "runs_completed_total", "counter", "Games cleared per mode")
+        for mode, count in self.runs_completed.items():
+            lines.append(f'{METRIC_PREFIX}_runs_completed_total{{mode="{mode.name.lower()}"}} {count}')
+        _write_histograms(lines, "clear_time_seconds", "Clear time of finished games",
+                          "mode", {mode.name.lower(): h for mode, h in self.clear_time_seconds.items()})
+
+        if self.memory is not None:
+            _write_header(lines, "surface_bytes", "gauge", "Pixel bytes of live surfaces per owner")
+            for owner, totals in sorted(self.memory.live_surfaces().items()):
+                lines.append(f'{METRIC_PREFIX}_surface_bytes{{owner="{owner}"}} {totals["bytes"]}')
+            _write_header(lines, "transient_surface_bytes", "gauge", "Pixel bytes of surfaces created during the last frame")
+            lines.append(f"{METRIC_PREFIX}_transient_surface_bytes {self.memory.last_transient_bytes}")
+            _write_header(lines, "transient_surface_bytes_peak", "gauge", "Largest per-frame transient surface bytes")
+            lines.append(f"{METRIC_PREFIX}_transient_surface_bytes_peak {self.memory.peak_transient_bytes}")
+        return "\n".join(lines) + "\n"
+
+
+def _write_header(lines: List[str], name: str, metric_type: str, description: str):
+    """HELP行とTYPE行を書き出す"""
+    lines.append(f"# HELP {METRIC_PREFIX}_{name} {description}")
+    lines.append(f"# TYPE {METRIC_PREFIX}_{name} {metric_type}")
+
+
+def _write_histograms(lines: List[str], name: str, description: str, label: str,
+                      histograms: Dict[str, FixedHistogram]):
+    """
+    ラベルごとのヒストグラムを書き出す
+
+    Args:
+        lines: 出力先の行リスト
+        name: 計測値の名前
+        description: 計測値の説明
+        label: ラベル名
+        histograms: ラベルの値ごとのヒストグラム
+    """
+    _write_header(lines, name, "histogram", description)
+    metric = f"{METRIC_PREFIX}_{name}"
+    for value, histogram in histograms.items():
+        counts, total = histogram.snapshot()
+        cumulative = 0
+        for upper, count in zip(histogram.buckets, counts):
+            cumulative += count
+            lines.append(f'{metric}_bucket{{{label}="{value}",le="{upper}"}} {cumulative}')
+        cumulative += counts[-1]
+        lines.append(f'{metric}_bucket{{{label}="{value}",le="+Inf"}} {cumulative}')
+        lines.append(f'{metric}_sum{{{label}="{value}"}} {total}')
+        lines.append(f'{metric}_count{{{label}="{value}"}} {cumulative}')
+
+
+def _write_cache(lines: List[str], name: str, description: str, stats: Dict[str, int]):
+    """
+    キャッシュのヒット数・ミス数・ヒット率を書き出す
+
+    Args:
+        lines: 出力先の行リスト
+        name: 計測値の名前
+        description: キャッシュの説明
+        stats: "hits" と "misses" を持つ辞書
+    """
+    hits = stats["hits"]
+    misses = stats["misses"]
+    _write_header(lines, f"{name}_hits_total", "counter", f"{description} cache hits")
+    lines.append(f"{METRIC_PREFIX}_{name}_hits_total {hits}")
+    _write_header(lines, f"{name}_misses_total", "counter", f"{description} cache misses")
+    lines.append(f"{METRIC_PREFIX}_{name}_misses_total {misses}")
+    _write_header(lines, f"{name}_hit_ratio", "gauge", f"{description} cache hit ratio")
+    lines.append(f"{METRIC_PREFIX}_{name}_hit_ratio {hits / (hits + misses) if hits + misses else 0.0}")
+
+
+class MetricsServer:
+    """
+    計測値を公開するHTTPサーバー
+
+    バックグラウンドのデーモンスレッドで動き、/metrics へのリクエストごとに
+    GameMetrics.render を呼ぶ。ゲームループとはロックを共有しないため、
+    取得中でもゲームループが待たされることはない。
+    """
+
+    def __init__(self, metrics: GameMetrics, port: int, host: str = "127.0.0.1"):
+        """
+        サーバーの初期化
+
+        Args:
+            metrics: 公開する計測値
+            port: 待ち受けるポート番号（0なら空いているポート）
+            host: 待ち受けるアドレス（デフォルトはローカルホストのみ）
+        """
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._server: Optional[HTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """サーバーを起動する"""
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # アクセスログは出さない
+
+        self._server = HTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """サーバーを停止する"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
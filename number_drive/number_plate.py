@@ -1,12 +1,20 @@
 """
 ナンバープレートの生成と描画を行うモジュール
+
+出題と答え合わせは pygame なしで使えるように、pygame は描画するときだけ import する。
 """
+import operator
 import random
-import pygame
+from array import array
 from enum import Enum, auto
-from typing import Tuple
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import pygame
 
-from number_drive.config import EXCLUDED_NUMBERS, PLATE_YELLOW, PLATE_WHITE, PLATE_GREEN, BLACK, WHITE
+from number_drive.config import PLATE_YELLOW, PLATE_WHITE, PLATE_GREEN, PLATE_BLACK, BLACK, WHITE
+from number_drive.game_enums import GameMode
+from number_drive.plate_rules import get_plate_rules
 
 
 class OperationType(Enum):
@@ -14,53 +22,142 @@ class OperationType(Enum):
     ADDITION = auto()      # 足し算
     SUBTRACTION = auto()   # 引き算
     MULTIPLICATION = auto()  # 掛け算
+    DIVISION = auto()      # 割り算
+
+
+class Operation:
+    """
+    演算ごとの計算・表記・プレートの色と、出題できる一連指定番号の索引
+    
+    NumberPlate や難しさの特徴量は演算の種類で分岐せず、OPERATIONS からこの定義を引いて使う。
+    演算を増やすときは OperationType と OPERATIONS に1つずつ追加する。
+    """
+    
+    __slots__ = ("name", "symbol", "apply", "plate_color", "text_color", "accepts", "_serials")
+    
+    def __init__(self, name: str, symbol: str, apply: Callable[[int, int], int],
+                 plate_color: Tuple[int, int, int], text_color: Tuple[int, int, int],
+                 accepts: Optional[Callable[[int, int], bool]] = None):
+        """
+        演算の定義
+        
+        Args:
+            name: プレートに表示する名前（例: "Addition"）
+            symbol: 演算記号（例: "+"）
+            apply: 前半と後半の数字から答えを計算する関数
+            plate_color: プレートの地の色
+            text_color: プレートの文字色
+            accepts: 出題できる (前半, 後半) の条件（Noneなら有効な番号すべて）
+        """
+        self.name = name
+        self.symbol = symbol
+        self.apply = apply
+        self.plate_color = plate_color
+        self.text_color = text_color
+        self.accepts = accepts
+        self._serials: Optional[array] = None
+    
+    def serials(self) -> array:
+        """
+        出題できる一連指定番号を小さい順に取得する
+        
+        条件がある演算では、有効な番号から条件に合うものだけを並べた索引を初回に作っておくので、
+        抽選は選び直しなしの O(1) で済む。
+        
+        Returns:
+            一連指定番号の配列（共有されるため変更してはいけない）
+        """
+        if self._serials is None:
+            serials = get_plate_rules().valid_serials()
+            if self.accepts is not None:
+                accepts = self.accepts
+                serials = array("H", (serial for serial in serials if accepts(*divmod(serial, 100))))
+            self._serials = serials
+        return self._serials
+    
+    def sample(self, rng) -> Tuple[int, int]:
+        """
+        出題できる数字から一様に1つ選ぶ
+        
+        Args:
+            rng: 乱数生成器
+        
+        Returns:
+            前半の数字と後半の数字のタプル
+        """
+        serials = self.serials()
+        return divmod(serials[rng.randrange(len(serials))], 100)
+
+
+def _divides_exactly(front: int, back: int) -> bool:
+    """前半の数字が後半の数字で割り切れるかどうか（後半が0の場合は出題しない）"""
+    return back != 0 and front % back == 0
+
+
+# 演算ごとの定義
+OPERATIONS: Dict[OperationType, Operation] = {
+    # 足し算：黄色地に黒文字
+    OperationType.ADDITION: Operation("Addition", "+", operator.add, PLATE_YELLOW, BLACK),
+    # 引き算：白地に黒文字
+    OperationType.SUBTRACTION: Operation("Subtraction", "-", operator.sub, PLATE_WHITE, BLACK),
+    # 掛け算：緑地に白文字
+    OperationType.MULTIPLICATION: Operation("Multiplication", "×", operator.mul, PLATE_GREEN, WHITE),
+    # 割り算：黒地に黄色文字（答えが整数になる組み合わせのみ）
+    OperationType.DIVISION: Operation("Division", "÷", operator.floordiv, PLATE_BLACK, PLATE_YELLOW,
+                                      accepts=_divides_exactly),
+}
+
+
+# ゲームモードごとの出題数の内訳（合計は TOTAL_QUESTIONS、エンドレスでは TOTAL_QUESTIONS 問ごとにこの内訳を繰り返す）
+MODE_OPERATION_MIX: Dict[GameMode, List[Tuple[OperationType, int]]] = {
+    # イージーモード: 足し算のみ
+    GameMode.EASY: [(OperationType.ADDITION, 10)],
+    # ノーマルモード: 足し算5問、引き算5問
+    GameMode.NORMAL: [(OperationType.ADDITION, 5), (OperationType.SUBTRACTION, 5)],
+    # ハードモード: 足し算4問、引き算4問、掛け算2問
+    GameMode.HARD: [(OperationType.ADDITION, 4), (OperationType.SUBTRACTION, 4), (OperationType.MULTIPLICATION, 2)],
+    # エキスパートモード: 足し算3問、引き算3問、掛け算2問、割り算2問
+    GameMode.EXPERT: [(OperationType.ADDITION, 3), (OperationType.SUBTRACTION, 3),
+                      (OperationType.MULTIPLICATION, 2), (OperationType.DIVISION, 2)]
+}
 
 
 class NumberPlate:
     """ナンバープレートを表すクラス"""
     
-    def __init__(self, operation_type: OperationType):
+    def __init__(self, operation_type: OperationType, rng=None, numbers: Optional[Tuple[int, int]] = None):
         """
         ナンバープレートの初期化
         
         Args:
             operation_type: 演算子の種類
+            rng: 数字の生成に使う乱数生成器（省略時はrandomモジュール）
+            numbers: 前半と後半の数字（省略時はランダムに生成）
         """
         self.operation_type = operation_type
-        self.front_number, self.back_number = self._generate_valid_numbers()
-        
-        # 演算子に応じたプレートの色と文字色を設定
-        if operation_type == OperationType.ADDITION:
-            # 足し算：黄色地に黒文字
-            self.plate_color = PLATE_YELLOW
-            self.text_color = BLACK
-        elif operation_type == OperationType.SUBTRACTION:
-            # 引き算：白地に黒文字
-            self.plate_color = PLATE_WHITE
-            self.text_color = BLACK
-        else:  # MULTIPLICATION
-            # 掛け算：緑地に白文字
-            self.plate_color = PLATE_GREEN
-            self.text_color = WHITE
-    
-    def _generate_valid_numbers(self) -> Tuple[int, int]:
+        self.operation = OPERATIONS[operation_type]
+        if numbers is None:
+            numbers = self._generate_valid_numbers(rng or random)
+        self.front_number, self.back_number = numbers
+        
+        # 演算子に応じたプレートの色と文字色
+        self.plate_color = self.operation.plate_color
+        self.text_color = self.operation.text_color
+    
+    def _generate_valid_numbers(self, rng) -> Tuple[int, int]:
         """
         有効なナンバープレートの数字を生成する
         
+        除外ルールをコンパイルした有効な一連指定番号の表（割り算では割り切れる組み合わせの索引）から
+        一様に選ぶ（選び直しはしない）。
+        
+        Args:
+            rng: 乱数生成器
+        
         Returns:
-            前半の数字と後半の数字のタプル
+            前半の数字（1〜99）と後半の数字（00〜99）のタプル
         """
-        while True:
-            # 前半は1〜99の範囲
-            front = random.randint(1, 99)
-            
-            # 後半は00〜99の範囲
-            back = random.randint(0, 99)
-            
-            # 除外ルールのチェック
-            back_str = f"{back:02d}"
-            if int(back_str) not in EXCLUDED_NUMBERS:
-                return front, back
+        return self.operation.sample(rng)
     
     def get_question(self) -> str:
         """
@@ -69,12 +166,7 @@ class NumberPlate:
         Returns:
             問題文（例: "12+34=?"）
         """
-        if self.operation_type == OperationType.ADDITION:
-            return f"{self.front_number}+{self.back_number:02d}=?"
-        elif self.operation_type == OperationType.SUBTRACTION:
-            return f"{self.front_number}-{self.back_number:02d}=?"
-        else:  # MULTIPLICATION
-            return f"{self.front_number}×{self.back_number:02d}=?"
+        return f"{self.front_number}{self.operation.symbol}{self.back_number:02d}=?"
     
     def get_answer(self) -> int:
         """
@@ -83,12 +175,22 @@ class NumberPlate:
         Returns:
             計算結果
         """
-        if self.operation_type == OperationType.ADDITION:
-            return self.front_number + self.back_number
-        elif self.operation_type == OperationType.SUBTRACTION:
-            return self.front_number - self.back_number
-        else:  # MULTIPLICATION
-            return self.front_number * self.back_number
+        return self.operation.apply(self.front_number, self.back_number)
+    
+    def is_correct(self, answer_text: str) -> bool:
+        """
+        入力された回答が正しいかどうかを判定する
+        
+        Args:
+            answer_text: 入力された回答（例: "-12"）
+        
+        Returns:
+            正解ならTrue（数値として読めない入力は不正解）
+        """
+        try:
+            return int(answer_text) == self.get_answer()
+        except ValueError:
+            return False
     
     def get_operation_name(self) -> str:
         """
@@ -97,28 +199,18 @@ class NumberPlate:
         Returns:
             演算子の名前（例: "Addition"）
         """
-        if self.operation_type == OperationType.ADDITION:
-            return "Addition"
-        elif self.operation_type == OperationType.SUBTRACTION:
-            return "Subtraction"
-        else:  # MULTIPLICATION
-            return "Multiplication"
+        return self.operation.name
     
     def get_operation_symbol(self) -> str:
         """
         演算記号を取得する
         
         Returns:
-            演算記号（+, -, ×）
+            演算記号（+, -, ×, ÷）
         """
-        if self.operation_type == OperationType.ADDITION:
-            return "+"
-        elif self.operation_type == OperationType.SUBTRACTION:
-            return "-"
-        else:  # MULTIPLICATION
-            return "×"
+        return self.operation.symbol
     
-    def render(self, surface: pygame.Surface, x: int, y: int, width: int, height: int):
+    def render(self, surface: "pygame.Surface", x: int, y: int, width: int, height: int):
         """
         ナンバープレートを描画する
         
@@ -129,6 +221,8 @@ class NumberPlate:
             width: 幅
             height: 高さ
         """
+        import pygame
+        
         # 画像のような比率に調整（横長のプレート）
         plate_width = width
         plate_height = int(width * 0.5)  # 縦横比を1:2に調整
@@ -145,7 +239,7 @@ class NumberPlate:
         
         # 演算子名を中央上部に表示
         op_name_font_size = int(plate_height * 0.25)
-        op_name_font = pygame.font.SysFont("Arial", op_name_font_size)
+        op_name_font = _plate_font(op_name_font_size)
         op_name = self.get_operation_name()
         op_name_text = op_name_font.render(op_name, True, self.text_color)
         op_name_rect = op_name_text.get_rect(midtop=(x + plate_width // 2, plate_y + 10))
@@ -153,7 +247,7 @@ class NumberPlate:
         
         # 演算記号を左端に表示
         op_symbol_font_size = int(plate_height * 0.3)
-        op_symbol_font = pygame.font.SysFont("Arial", op_symbol_font_size)
+        op_symbol_font = _plate_font(op_symbol_font_size)
         op_symbol = self.get_operation_symbol()
         op_symbol_text = op_symbol_font.render(op_symbol, True, self.text_color)
         op_symbol_rect = op_symbol_text.get_rect(center=(x + 25, plate_y + plate_height // 2 + 10))
@@ -161,7 +255,7 @@ class NumberPlate:
         
         # 数字を描画
         font_size = int(plate_height * 0.4)
-        font = pygame.font.SysFont("Arial", font_size)
+        font = _plate_font(font_size)
         
         # 前半の数字
         front_text = font.render(f"{self.front_number}", True, self.text_color)
@@ -177,3 +271,119 @@ class NumberPlate:
         back_text = font.render(f"{self.back_number:02d}", True, self.text_color)
         back_rect = back_text.get_rect(center=(x + plate_width * 0.7, plate_y + plate_height // 2 + 10))
         surface.blit(back_text, back_rect)
+    
+    
+    def render_surface(self, width: int, height: int) -> "pygame.Surface":
+        """
+        ナンバープレートを透過サーフェスに描画する（出題前に用意しておき、毎フレームは転送だけにする）
+        
+        Args:
+            width: 幅
+            height: 高さ
+        
+        Returns:
+            render(surface, x, y, width, height) と同じ見た目になる (width, height) のサーフェス
+        """
+        import pygame
+        
+        surface = pygame.Surface((int(width), int(height)), pygame.SRCALPHA)
+        self.render(surface, 0, 0, width, height)
+        return surface
+
+
+# プレート用のフォント（SysFontの検索は遅いのでサイズごとに一度だけ読み込む）
+_plate_fonts = {}
+
+
+def _plate_font(size: int):
+    """
+    ナンバープレートの文字に使うフォントを取得する
+    
+    Args:
+        size: フォントサイズ
+    
+    Returns:
+        Arial（なければ代替フォント）の pygame.font.Font
+    """
+    font = _plate_fonts.get(size)
+    if font is None:
+        import pygame
+        font = _plate_fonts[size] = pygame.font.SysFont("Arial", size)
+    return font
+
+
+def _question_window(mode: GameMode, rng, sampler, recent=None) -> List[NumberPlate]:
+    """
+    MODE_OPERATION_MIX の内訳どおりに TOTAL_QUESTIONS 問を作り、出題順をシャッフルする
+    
+    Args:
+        mode: ゲームモード
+        rng: 乱数生成器
+        sampler: 数字の選び方を変えるサンプラー（Noneなら一様に選ぶ）
+        recent: 直近に出題した問題のフィルタ（RecentQuestionFilter、Noneなら重複を気にしない）
+    
+    Returns:
+        出題順に並べたナンバープレートのリスト
+    """
+    if sampler is None:
+        def sample(operation_type):
+            return NumberPlate(operation_type, rng)
+    else:
+        def sample(operation_type):
+            return sampler.sample_plate(mode, operation_type, rng)
+    if recent is None:
+        questions = [
+            sample(operation_type)
+            for operation_type, count in MODE_OPERATION_MIX[mode]
+            for _ in range(count)
+        ]
+    else:
+        # 直近に出題した問題（このプレイで出題したものを含む）は選び直す
+        questions = [
+            recent.draw(lambda: sample(operation_type))
+            for operation_type, count in MODE_OPERATION_MIX[mode]
+            for _ in range(count)
+        ]
+    # 出題順はランダム
+    rng.shuffle(questions)
+    return questions
+
+
+def generate_questions(mode: GameMode, rng=None, sampler=None, recent=None) -> List[NumberPlate]:
+    """
+    ゲームモードに応じた問題を生成する
+    
+    Args:
+        mode: ゲームモード
+        rng: 乱数生成器（省略時はrandomモジュール）
+        sampler: 数字の選び方を変えるサンプラー（sample_plate(mode, operation_type, rng) を持つもの）
+            省略時は有効な数字から一様に選ぶ
+        recent: 直近に出題した問題のフィルタ（RecentQuestionFilter）
+            指定すると、フィルタにある問題を避けて選び、選んだ問題をフィルタに追加する
+    
+    Returns:
+        出題順に並べたナンバープレートのリスト
+    """
+    return _question_window(mode, rng or random, sampler, recent)
+
+
+def stream_questions(mode: GameMode, rng=None, sampler=None, recent=None) -> Iterator[NumberPlate]:
+    """
+    ゲームモードに応じた問題を終わりなく生成する
+    
+    TOTAL_QUESTIONS 問ずつ generate_questions と同じ手順で作って順に返すので、
+    区切りごとに MODE_OPERATION_MIX の内訳が保たれ、最初の区切りは同じ乱数生成器で
+    generate_questions を呼んだ場合と同じ問題列になる。保持するのは1区切り分だけ。
+    
+    Args:
+        mode: ゲームモード
+        rng: 乱数生成器（省略時はrandomモジュール）
+        sampler: 数字の選び方を変えるサンプラー（generate_questions と同じ）
+        recent: 直近に出題した問題のフィルタ（generate_questions と同じ）
+    
+    Yields:
+        出題順のナンバープレート
+    """
+    rng = rng or random
+    while True:
+        yield from _question_window(mode, rng, sampler, recent)
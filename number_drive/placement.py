@@ -0,0 +1,202 @@
+"""
+装飾用の記号や車を画面上に配置するモジュール
+"""
+import math
+import random
+import pygame
+from typing import Dict, List, Optional, Tuple
+
+# 装飾に使う記号（数字以外）
+DECORATION_SYMBOLS = ["+", "-", "×", "="]
+
+
+class OccupancyGrid:
+    """
+    画面を固定サイズのセルに分割し、使用済みの領域を記録するクラス
+
+    安全領域や配置済みの車をセル単位で塗りつぶしておき、空いているセルだけを
+    候補にして配置する。候補の列挙はセル数に比例する時間で終わるため、
+    乱数による試行の繰り返しで配置に失敗することがない。
+    """
+
+    def __init__(self, width: int, height: int, cell_size: int = 8):
+        """
+        グリッドの初期化
+
+        Args:
+            width: 配置領域の幅
+            height: 配置領域の高さ
+            cell_size: 1セルの大きさ（ピクセル）
+        """
+        self.width = int(width)
+        self.height = int(height)
+        self.cell_size = cell_size
+        self.cols = math.ceil(self.width / cell_size)
+        self.rows = math.ceil(self.height / cell_size)
+        self.cells = bytearray(self.cols * self.rows)  # 0: 空き, 1: 使用済み
+
+    def block_rect(self, rect, margin: int = 0):
+        """
+        矩形に重なるセルを使用済みにする
+
+        Args:
+            rect: 使用済みにする領域
+            margin: 矩形の周囲に追加する余白
+        """
+        rect = pygame.Rect(rect).inflate(margin * 2, margin * 2)
+        cs = self.cell_size
+        col_start = max(0, rect.left // cs)
+        col_end = min(self.cols - 1, (rect.right - 1) // cs)
+        row_start = max(0, rect.top // cs)
+        row_end = min(self.rows - 1, (rect.bottom - 1) // cs)
+        if col_start > col_end or row_start > row_end:
+            return
+        filled = b"\x01" * (col_end - col_start + 1)
+        for row in range(row_start, row_end + 1):
+            offset = row * self.cols
+            self.cells[offset + col_start:offset + col_end + 1] = filled
+
+    def block_border(self, margin: int):
+        """
+        配置領域の外周を使用済みにする
+
+        Args:
+            margin: 外周の幅
+        """
+        self.block_rect((0, 0, self.width, margin))
+        self.block_rect((0, self.height - margin, self.width, margin))
+        self.block_rect((0, 0, margin, self.height))
+        self.block_rect((self.width - margin, 0, margin, self.height))
+
+    def free_cells(self) -> List[int]:
+        """
+        空いているセルの一覧を取得する
+
+        Returns:
+            空いているセルのインデックス（row * cols + col）のリスト
+        """
+        return [index for index, used in enumerate(self.cells) if not used]
+
+    def sample_points(self, rng: random.Random, count: int, min_distance: float = 0) -> List[Tuple[int, int]]:
+        """
+        空いているセルから互いに離れた点を選ぶ（ポアソンディスクサンプリング）
+
+        空きセルを一度だけシャッフルして順に調べ、既に選んだ点から min_distance 以上
+        離れていれば採用する。近傍判定は min_distance 四方のバケットで行うため、
+        点の数が数百になっても1点あたりの判定は一定時間で済む。
+
+        Args:
+            rng: 乱数生成器
+            count: 選ぶ点の数
+            min_distance: 点同士の最小距離
+
+        Returns:
+            選んだ点の座標のリスト（空きが足りない場合は count 未満になる）
+        """
+        candidates = self.free_cells()
+        rng.shuffle(candidates)
+
+        cs = self.cell_size
+        bucket_size = max(min_distance, 1)
+        min_distance_sq = min_distance * min_distance
+        buckets: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        points = []
+        for index in candidates:
+            if len(points) >= count:
+                break
+            row, col = divmod(index, self.cols)
+            x = min(col * cs + rng.randrange(cs), self.width - 1)
+            y = min(row * cs + rng.randrange(cs), self.height - 1)
+
+            bucket_x = int(x // bucket_size)
+            bucket_y = int(y // bucket_size)
+            if min_distance > 0 and any(
+                (x - px) ** 2 + (y - py) ** 2 < min_distance_sq
+                for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                for px, py in buckets.get((bucket_x + dx, bucket_y + dy), ())
+            ):
+                continue
+
+            points.append((x, y))
+            buckets.setdefault((bucket_x, bucket_y), []).append((x, y))
+        return points
+
+    def place_rect(self, rng: random.Random, size: Tuple[int, int],
+                   center_area: Optional[pygame.Rect] = None) -> Optional[pygame.Rect]:
+        """
+        空いているセルだけに収まる位置に矩形を配置する
+
+        累積和テーブルで全候補位置の重なりを一度に調べ、その中から一様に選ぶ。
+
+        Args:
+            rng: 乱数生成器
+            size: 矩形のサイズ（幅, 高さ）
+            center_area: 矩形の中心が入るべき領域（省略時は制限なし）
+
+        Returns:
+            配置した矩形（どこにも収まらない場合はNone）
+        """
+        cs = self.cell_size
+        cols, rows = self.cols, self.rows
+        span_cols = math.ceil(size[0] / cs)
+        span_rows = math.ceil(size[1] / cs)
+        if span_cols > cols or span_rows > rows:
+            return None
+
+        # 使用済みセル数の累積和テーブル
+        stride = cols + 1
+        table = [0] * (stride * (rows + 1))
+        for row in range(rows):
+            running = 0
+            offset = row * cols
+            above = row * stride
+            current = (row + 1) * stride
+            for col in range(cols):
+                running += self.cells[offset + col]
+                table[current + col + 1] = table[above + col + 1] + running
+
+        candidates = []
+        for row in range(rows - span_rows + 1):
+            top = row * stride
+            bottom = (row + span_rows) * stride
+            for col in range(cols - span_cols + 1):
+                used = (table[bottom + col + span_cols] - table[top + col + span_cols]
+                        - table[bottom + col] + table[top + col])
+                if used:
+                    continue
+                if center_area is not None and not center_area.collidepoint(
+                        col * cs + size[0] // 2, row * cs + size[1] // 2):
+                    continue
+                candidates.append((col, row))
+
+        if not candidates:
+            return None
+        col, row = rng.choice(candidates)
+        return pygame.Rect(col * cs, row * cs, int(size[0]), int(size[1]))
+
+
+def generate_decorations(rng: random.Random, grid: OccupancyGrid, count: int,
+                         size_range: Tuple[int, int], border: int = 50,
+                         min_distance: float = 40) -> List[Tuple[str, int, int, int, int]]:
+    """
+    背景に散らす装飾用の数字と記号を生成する
+
+    Args:
+        rng: 乱数生成器
+        grid: 安全領域を使用済みにしたグリッド（外周も使用済みになる）
+        count: 装飾の数
+        size_range: フォントサイズの範囲（最小, 最大）
+        border: 画面端から空ける幅
+        min_distance: 装飾同士の最小距離
+
+    Returns:
+        (記号, X座標, Y座標, サイズ, 透明度) のリスト
+    """
+    grid.block_border(border)
+    decorations = []
+    for x, y in grid.sample_points(rng, count, min_distance):
+        symbol = rng.choice(DECORATION_SYMBOLS) if rng.random() > 0.7 else str(rng.randint(0, 9))
+        size = rng.randint(*size_range)
+        alpha = rng.randint(5, 15)  # 透明度をさらに高く（色をかなり薄く）
+        decorations.append((symbol, x, y, size, alpha))
+    return decorations
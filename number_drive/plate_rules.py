@@ -0,0 +1,225 @@
+"""
+ナンバープレートの一連指定番号（4桁までの番号）の形式と除外ルールを定義するモジュール
+
+ルールは config.py の宣言（形式ごとの番号の範囲と、除外する番号のパターン）から
+起動後に一度だけコンパイルし、形式ごとに 0〜9999 の1万ビットの有効フラグと、
+有効な番号を並べた配列にしておく。番号が有効かどうかの判定はビットを1つ読むだけ、
+有効な番号からの一様な抽選は配列の添字を1つ選ぶだけで済む（どちらも O(1)）。
+
+出題では前半の数字（上2桁、1〜99）と後半の数字（下2桁、00〜99）を使うので、
+前半が1以上になる「・1-23」と「12-34」の形式（QUESTION_PLATE_FORMATS）から選ぶ。
+"""
+from array import array
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from number_drive.config import EXCLUDED_SERIAL_PATTERNS, QUESTION_PLATE_FORMATS
+
+# 一連指定番号の数（0000〜9999）
+SERIAL_COUNT = 10000
+
+# パターンの任意の数字
+WILDCARD = "?"
+
+# 上位の桁が空いている場合に表示する記号
+SERIAL_DOT = "・"
+
+# 一連指定番号の形式ごとの番号の範囲（両端を含む）
+PLATE_FORMATS: Dict[str, Tuple[int, int]] = {
+    "one_digit": (1, 9),         # ・・・1
+    "two_digit": (10, 99),       # ・・12
+    "three_digit": (100, 999),   # ・1-23
+    "four_digit": (1000, 9999),  # 12-34
+}
+
+
+def format_serial(serial: int) -> str:
+    """
+    一連指定番号をプレートの表記にする
+
+    Args:
+        serial: 一連指定番号（1〜9999）
+
+    Returns:
+        空いている上位の桁を「・」にした表記（3桁以上は上2桁の後にハイフンを入れる。例: "・1-23"）
+    """
+    digits = f"{serial:04d}"
+    width = len(str(serial))
+    text = SERIAL_DOT * (4 - width) + digits[4 - width:]
+    if width >= 3:
+        return f"{text[:2]}-{text[2:]}"
+    return text
+
+
+def expand_pattern(pattern: str) -> Iterator[int]:
+    """
+    4桁のパターンに一致する一連指定番号を列挙する
+
+    Args:
+        pattern: 数字と "?"（任意の数字）からなる4文字（例: "??42" は下2桁が42、"13??" は上2桁が13）
+
+    Yields:
+        一致する番号
+
+    Raises:
+        ValueError: パターンの形式が正しくない場合
+    """
+    if len(pattern) != 4 or any(ch != WILDCARD and not ch.isdigit() for ch in pattern):
+        raise ValueError(f"Serial pattern must be 4 characters of digits or '{WILDCARD}', got {pattern!r}")
+    serials = [0]
+    for ch in pattern:
+        choices = range(10) if ch == WILDCARD else (int(ch),)
+        serials = [serial * 10 + digit for serial in serials for digit in choices]
+    yield from serials
+
+
+class SerialBitset:
+    """一連指定番号ごとの有効フラグ（1万ビット）"""
+
+    __slots__ = ("bits",)
+
+    def __init__(self, bits: Optional[bytearray] = None):
+        """
+        フラグの初期化
+
+        Args:
+            bits: 元にするビット列（省略時はすべて無効）
+        """
+        self.bits = bits if bits is not None else bytearray((SERIAL_COUNT + 7) // 8)
+
+    def set(self, serial: int):
+        """番号を有効にする"""
+        self.bits[serial >> 3] |= 1 << (serial & 7)
+
+    def __contains__(self, serial: int) -> bool:
+        """番号が有効かどうか"""
+        return 0 <= serial < SERIAL_COUNT and bool(self.bits[serial >> 3] >> (serial & 7) & 1)
+
+    def __or__(self, other: "SerialBitset") -> "SerialBitset":
+        """どちらかで有効な番号のフラグ"""
+        return SerialBitset(bytearray(a | b for a, b in zip(self.bits, other.bits)))
+
+    def without(self, other: "SerialBitset") -> "SerialBitset":
+        """other で有効な番号を除いたフラグ"""
+        return SerialBitset(bytearray(a & ~b & 0xFF for a, b in zip(self.bits, other.bits)))
+
+    def serials(self) -> array:
+        """有効な番号を小さい順に並べた配列"""
+        return array("H", (serial for serial in range(SERIAL_COUNT) if serial in self))
+
+
+class PlateRuleSet:
+    """
+    形式と除外ルールをコンパイルした一連指定番号の判定・抽選
+
+    形式を組み合わせた判定・抽選の表は、初めて使う組み合わせのときに一度だけ作る。
+    """
+
+    def __init__(self, excluded_patterns: Sequence[str] = EXCLUDED_SERIAL_PATTERNS,
+                 formats: Optional[Dict[str, Tuple[int, int]]] = None):
+        """
+        ルールのコンパイル
+
+        Args:
+            excluded_patterns: 除外する番号のパターン（expand_pattern の形式）
+            formats: 形式ごとの番号の範囲（省略時は PLATE_FORMATS）
+        """
+        self.excluded_patterns = tuple(excluded_patterns)
+        self.formats = dict(formats or PLATE_FORMATS)
+
+        excluded = SerialBitset()
+        for pattern in self.excluded_patterns:
+            for serial in expand_pattern(pattern):
+                excluded.set(serial)
+        self.excluded = excluded
+
+        # 形式ごとの有効フラグ（範囲内で除外されていない番号）
+        self.bitsets: Dict[str, SerialBitset] = {}
+        for name, (low, high) in self.formats.items():
+            bitset = SerialBitset()
+            for serial in range(low, high + 1):
+                bitset.set(serial)
+            self.bitsets[name] = bitset.without(excluded)
+
+        self._tables: Dict[Tuple[str, ...], Tuple[SerialBitset, array]] = {}
+
+    def _table(self, format_names: Iterable[str]) -> Tuple[SerialBitset, array]:
+        """
+        形式の組み合わせの有効フラグと有効な番号の配列を取得する（初回のみ作成）
+
+        Args:
+            format_names: 形式の名前
+
+        Returns:
+            (有効フラグ, 有効な番号の配列)
+        """
+        key = tuple(format_names)
+        table = self._tables.get(key)
+        if table is None:
+            bitset = SerialBitset()
+            for name in key:
+                bitset = bitset | self.bitsets[name]
+            table = self._tables[key] = (bitset, bitset.serials())
+        return table
+
+    def is_valid(self, serial: int, format_names: Iterable[str] = QUESTION_PLATE_FORMATS) -> bool:
+        """
+        一連指定番号が有効かどうかを判定する
+
+        Args:
+            serial: 一連指定番号
+            format_names: 対象の形式の名前
+
+        Returns:
+            いずれかの形式で有効ならTrue
+        """
+        return serial in self._table(format_names)[0]
+
+    def valid_serials(self, format_names: Iterable[str] = QUESTION_PLATE_FORMATS) -> array:
+        """
+        有効な一連指定番号を小さい順に取得する
+
+        Args:
+            format_names: 対象の形式の名前
+
+        Returns:
+            有効な番号の配列（共有されるため変更してはいけない）
+        """
+        return self._table(format_names)[1]
+
+    def sample(self, rng, format_names: Iterable[str] = QUESTION_PLATE_FORMATS) -> int:
+        """
+        有効な一連指定番号から一様に1つ選ぶ
+
+        Args:
+            rng: 乱数生成器
+            format_names: 対象の形式の名前
+
+        Returns:
+            一連指定番号
+        """
+        serials = self._table(format_names)[1]
+        return serials[rng.randrange(len(serials))]
+
+    def key(self) -> dict:
+        """ルールの内容を表す辞書（ルールから作ったキャッシュの確認に使う）"""
+        return {
+            "excluded": sorted(self.excluded_patterns),
+            "formats": {name: list(bounds) for name, bounds in sorted(self.formats.items())}
+        }
+
+
+# 設定どおりのルール（初めて使うときにコンパイルする）
+_rules: Optional[PlateRuleSet] = None
+
+
+def get_plate_rules() -> PlateRuleSet:
+    """
+    設定どおりにコンパイルしたルールを取得する
+
+    Returns:
+        全体で共有するルール
+    """
+    global _rules
+    if _rules is None:
+        _rules = PlateRuleSet()
+    return _rules
@@ -0,0 +1,210 @@
+"""
+難しさの分布を指定してナンバープレートの数字を選ぶサンプラーを定義するモジュール
+"""
+import json
+import random
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from number_drive.config import CACHE_DIR
+from number_drive.difficulty import (
+    DIFFICULTY_LEVELS, QuestionFeatures, difficulty_level, difficulty_score
+)
+from number_drive.game_enums import GameMode
+from number_drive.number_plate import OPERATIONS, NumberPlate, OperationType
+from number_drive.plate_rules import get_plate_rules
+
+# スコア計算や有効な数字の条件を変えたら上げる（古いキャッシュを使わないため）
+SCORE_TABLE_VERSION = 3
+
+# ゲームモードごとの難しさの段階の目標分布（簡単 → 難しい）
+MODE_DIFFICULTY_TARGETS: Dict[GameMode, Tuple[float, ...]] = {
+    GameMode.EASY: (0.45, 0.35, 0.15, 0.05),
+    GameMode.NORMAL: (0.25, 0.35, 0.25, 0.15),
+    GameMode.HARD: (0.15, 0.25, 0.35, 0.25),
+    GameMode.EXPERT: (0.10, 0.20, 0.35, 0.35)
+}
+
+
+class AliasSampler:
+    """
+    ウォーカーのエイリアス法（Voseの方法）で重み付きの抽選を行うクラス
+
+    テーブルの作成は要素数に比例する時間がかかるが、1回の抽選は
+    乱数2つだけで済む（O(1)）。
+    """
+
+    def __init__(self, weights: Sequence[float]):
+        """
+        エイリアステーブルを作成する
+
+        Args:
+            weights: 各要素の重み（合計が正であること）
+        """
+        count = len(weights)
+        total = float(sum(weights))
+        if count == 0 or total <= 0:
+            raise ValueError("AliasSampler needs at least one positive weight")
+
+        scaled = [weight * count / total for weight in weights]
+        self.probabilities = [1.0] * count
+        self.aliases = list(range(count))
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self.probabilities[less] = scaled[less]
+            self.aliases[less] = more
+            scaled[more] = (scaled[more] + scaled[less]) - 1.0
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+        # 残りは丸め誤差で1からずれただけなので確率1のままにする
+        self.count = count
+
+    def sample(self, rng) -> int:
+        """
+        要素を1つ抽選する
+
+        Args:
+            rng: 乱数生成器
+
+        Returns:
+            選ばれた要素のインデックス
+        """
+        index = int(rng.random() * self.count)
+        if rng.random() < self.probabilities[index]:
+            return index
+        return self.aliases[index]
+
+
+def build_score_table() -> Dict[str, Dict[str, List[int]]]:
+    """
+    出題できるすべての（前半, 後半, 演算子）の難しさの段階を計算する
+
+    Returns:
+        演算子名ごとの {"pairs": 前半*100+後半 のリスト, "levels": 段階のリスト}
+    """
+    table = {}
+    for operation_type in OperationType:
+        serials = OPERATIONS[operation_type].serials()
+        pairs = []
+        levels = []
+        for serial in serials:
+            front, back = divmod(serial, 100)
+            features = QuestionFeatures(operation_type, front, back)
+            pairs.append(serial)
+            levels.append(difficulty_level(difficulty_score(features)))
+        table[operation_type.name] = {"pairs": pairs, "levels": levels}
+    return table
+
+
+def _table_key() -> dict:
+    """キャッシュが現在の設定で作られたものかを確認するためのキー"""
+    return {"version": SCORE_TABLE_VERSION, "rules": get_plate_rules().key()}
+
+
+def load_score_table(cache_dir: Optional[Path] = None) -> Dict[str, Dict[str, List[int]]]:
+    """
+    難しさのテーブルをディスクのキャッシュから読み込む（なければ作成して保存する）
+
+    Args:
+        cache_dir: キャッシュを保存するディレクトリ（省略時は CACHE_DIR）
+
+    Returns:
+        build_score_table と同じ形式のテーブル
+    """
+    path = Path(cache_dir or CACHE_DIR) / "plate_scores.json"
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("key") == _table_key():
+            return cached["table"]
+    except (OSError, ValueError):
+        pass
+
+    table = build_score_table()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"key": _table_key(), "table": table}, f)
+    except OSError as e:
+        print(f"Warning: Could not write plate score cache to {path}: {e}")
+    return table
+
+
+class DifficultyWeightedSampler:
+    """
+    ゲームモードごとの目標分布に従って難しさの段階が出るように数字を選ぶサンプラー
+
+    各要素の重みを「目標の割合 / その段階の要素数」にすることで、
+    段階ごとの出題割合が目標分布に一致し、同じ段階の中では一様になる。
+    （演算子に存在しない段階の割合は、存在する段階に按分される）
+    """
+
+    def __init__(self, table: Optional[Dict[str, Dict[str, List[int]]]] = None,
+                 targets: Optional[Dict[GameMode, Sequence[float]]] = None):
+        """
+        サンプラーの初期化
+
+        Args:
+            table: 難しさのテーブル（省略時はキャッシュから読み込む）
+            targets: ゲームモードごとの目標分布（省略時は MODE_DIFFICULTY_TARGETS）
+        """
+        self.table = table if table is not None else load_score_table()
+        self.targets = targets or MODE_DIFFICULTY_TARGETS
+        self._samplers: Dict[Tuple[GameMode, OperationType], AliasSampler] = {}
+
+    def _get_sampler(self, mode: GameMode, operation_type: OperationType) -> AliasSampler:
+        """
+        ゲームモードと演算子の組み合わせのエイリアステーブルを取得する（初回のみ作成）
+
+        Args:
+            mode: ゲームモード
+            operation_type: 演算子の種類
+
+        Returns:
+            エイリアステーブル
+        """
+        key = (mode, operation_type)
+        sampler = self._samplers.get(key)
+        if sampler is None:
+            levels = self.table[operation_type.name]["levels"]
+            level_counts = [0] * DIFFICULTY_LEVELS
+            for level in levels:
+                level_counts[level] += 1
+            target = self.targets[mode]
+            weights = [target[level] / level_counts[level] for level in levels]
+            sampler = self._samplers[key] = AliasSampler(weights)
+        return sampler
+
+    def sample_numbers(self, mode: GameMode, operation_type: OperationType, rng) -> Tuple[int, int]:
+        """
+        前半と後半の数字を選ぶ
+
+        Args:
+            mode: ゲームモード
+            operation_type: 演算子の種類
+            rng: 乱数生成器
+
+        Returns:
+            前半の数字と後半の数字のタプル
+        """
+        index = self._get_sampler(mode, operation_type).sample(rng)
+        return divmod(self.table[operation_type.name]["pairs"][index], 100)
+
+    def sample_plate(self, mode: GameMode, operation_type: OperationType, rng) -> NumberPlate:
+        """
+        ナンバープレートを1枚作成する
+
+        Args:
+            mode: ゲームモード
+            operation_type: 演算子の種類
+            rng: 乱数生成器
+
+        Returns:
+            ナンバープレート
+        """
+        return NumberPlate(operation_type, numbers=self.sample_numbers(mode, operation_type, rng))
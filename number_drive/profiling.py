@@ -0,0 +1,169 @@
+"""
+実行中のゲームのプロファイルを取得するモジュール
+"""
+import cProfile
+import pstats
+import signal
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Optional
+
+from number_drive.game_enums import GameMode, GameState
+
+# tracemallocが記録するスタックの深さ
+TRACEMALLOC_FRAMES = 25
+
+# レポートに載せる件数
+TOP_ALLOCATIONS = 25
+TOP_FUNCTIONS = 30
+
+
+class ProfileCapture:
+    """
+    時間を区切ってメインループのプロファイルを取得するクラス
+
+    request が呼ばれると（ホットキーやシグナル）、次のフレームの先頭から
+    cProfile とtracemallocを有効にし、指定時間が経ったら止めて
+    .pstats と確保量の上位を並べたレポートを書き出す。
+    シグナルハンドラからはフラグを立てるだけなので、処理中のフレームは中断されない。
+    """
+
+    def __init__(self, dump_dir: Path, duration: float = 10.0):
+        """
+        プロファイル取得の初期化
+
+        Args:
+            dump_dir: 結果を書き出すディレクトリ
+            duration: 1回の取得時間（秒）
+        """
+        self.dump_dir = Path(dump_dir)
+        self.duration = duration
+        self.requested = False
+        self.profiler: Optional[cProfile.Profile] = None
+        self.started_at = 0.0
+        self.frames = 0
+        self.start_tags = ("", "")
+        self._start_snapshot = None
+        self._started_tracemalloc = False
+
+    @property
+    def active(self) -> bool:
+        """取得中かどうか"""
+        return self.profiler is not None
+
+    def request(self):
+        """取得の開始を要求する（取得中なら早めに終了する）"""
+        self.requested = True
+
+    def install_signal_handler(self, signum: Optional[int] = None):
+        """
+        シグナルで取得を開始できるようにする（SIGUSR1のないOSでは何もしない）
+
+        Args:
+            signum: 使用するシグナル（省略時はSIGUSR1）
+        """
+        if signum is None:
+            signum = getattr(signal, "SIGUSR1", None)
+        if signum is None:
+            return
+        try:
+            signal.signal(signum, lambda received, frame: self.request())
+        except ValueError:
+            pass  # メインスレッド以外からは登録できない
+
+    def poll(self, state: GameState, mode: GameMode):
+        """
+        フレームの先頭で呼び出し、要求に応じて取得を開始・終了する
+
+        Args:
+            state: 現在のゲーム状態
+            mode: 現在のゲームモード
+        """
+        if self.requested:
+            self.requested = False
+            if self.active:
+                self.stop(state, mode)
+            else:
+                self.start(state, mode)
+            return
+
+        if self.active:
+            self.frames += 1
+            if time.perf_counter() - self.started_at >= self.duration:
+                self.stop(state, mode)
+
+    def start(self, state: GameState, mode: GameMode):
+        """
+        取得を開始する
+
+        Args:
+            state: 現在のゲーム状態
+            mode: 現在のゲームモード
+        """
+        self._started_tracemalloc = not tracemalloc.is_tracing()
+        if self._started_tracemalloc:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        self._start_snapshot = tracemalloc.take_snapshot()
+
+        self.start_tags = (state.name, mode.name)
+        self.frames = 0
+        self.started_at = time.perf_counter()
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+        print(f"Profiling started ({state.name}/{mode.name}, {self.duration:g} s)")
+
+    def stop(self, state: GameState, mode: GameMode) -> Optional[Path]:
+        """
+        取得を終了して結果を書き出す
+
+        Args:
+            state: 現在のゲーム状態
+            mode: 現在のゲームモード
+
+        Returns:
+            書き出した .pstats のパス（書き出せなかった場合はNone）
+        """
+        profiler = self.profiler
+        if profiler is None:
+            return None
+        profiler.disable()
+        self.profiler = None
+        elapsed = time.perf_counter() - self.started_at
+        end_snapshot = tracemalloc.take_snapshot()
+        # 計測自体による確保は除く
+        ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+        end_snapshot = end_snapshot.filter_traces(ignore)
+        start_snapshot = self._start_snapshot.filter_traces(ignore)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+        start_state, start_mode = self.start_tags
+        stem = f"profile_{time.strftime('%Y%m%d-%H%M%S')}_{start_state.lower()}_{start_mode.lower()}"
+        stats_path = self.dump_dir / f"{stem}.pstats"
+        report_path = self.dump_dir / f"{stem}.txt"
+        try:
+            self.dump_dir.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(str(stats_path))
+            with open(report_path, "w", encoding="utf-8") as f:
+                f.write(f"state: {start_state} -> {state.name}\n")
+                f.write(f"mode: {start_mode} -> {mode.name}\n")
+                f.write(f"duration: {elapsed:.2f} s, frames: {self.frames}\n\n")
+
+                f.write(f"Top {TOP_ALLOCATIONS} allocation growth (by line)\n")
+                for stat in end_snapshot.compare_to(start_snapshot, "lineno")[:TOP_ALLOCATIONS]:
+                    f.write(f"  {stat}\n")
+                f.write(f"\nTop {TOP_ALLOCATIONS} live allocations at end (by line)\n")
+                for stat in end_snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+                    f.write(f"  {stat}\n")
+
+                f.write(f"\nTop {TOP_FUNCTIONS} functions (cumulative)\n")
+                pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+        except OSError as e:
+            print(f"Warning: Could not write profile to {self.dump_dir}: {e}")
+            return None
+        finally:
+            self._start_snapshot = None
+
+        print(f"Profiling finished: {stats_path}")
+        return stats_path
@@ -0,0 +1,188 @@
+"""
+問題を必要な分だけ取り出して出題するモジュール
+"""
+import pygame
+from collections import OrderedDict, deque
+from typing import Deque, Iterable, Iterator, List, Optional, Tuple
+
+from number_drive.config import QUESTION_PREFETCH
+from number_drive.memory import MemoryAccounting
+from number_drive.number_plate import NumberPlate
+
+
+class PlateSurfaceCache:
+    """
+    事前描画したプレートを (演算, 数字, サイズ) ごとに共有するクラス
+
+    対戦モードのように同じ問題列を複数の出題キューで出す場合に、
+    同じプレートを1回だけ描画する。保持する数を超えたら使われていないものから捨てる
+    （出題キューが参照しているサーフェスはキューの側で保持され続ける）。
+    """
+
+    def __init__(self, max_entries: int = 16, memory: Optional[MemoryAccounting] = None):
+        """
+        キャッシュの初期化
+
+        Args:
+            max_entries: 保持するプレートの数
+            memory: 新しく描画したサーフェスを数える集計先
+        """
+        self.max_entries = max_entries
+        self.memory = memory
+        self._surfaces: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+
+    def get(self, plate: NumberPlate, size: Tuple[int, int]) -> pygame.Surface:
+        """
+        プレートを描画したサーフェスを取得する（初回のみ描画する）
+
+        Args:
+            plate: ナンバープレート
+            size: 描画する (幅, 高さ)
+
+        Returns:
+            描画済みのサーフェス（共有されるため描き換えてはいけない）
+        """
+        key = (plate.operation_type, plate.front_number, plate.back_number, size)
+        surfaces = self._surfaces
+        surface = surfaces.get(key)
+        if surface is not None:
+            surfaces.move_to_end(key)
+            return surface
+        surface = surfaces[key] = plate.render_surface(*size)
+        if self.memory is not None:
+            self.memory.transient(surface)
+        if len(surfaces) > self.max_entries:
+            surfaces.popitem(last=False)
+        return surface
+
+    def surfaces(self) -> List[Tuple[str, pygame.Surface]]:
+        """
+        保持しているサーフェスを列挙する（メモリ集計用）
+
+        Returns:
+            (名前, サーフェス) のリスト
+        """
+        return [(f"plate:{front}-{back:02d}@{size[0]}x{size[1]}", surface)
+                for (_, front, back, size), surface in list(self._surfaces.items())]
+
+
+class QuestionQueue:
+    """
+    問題の生成器から先読みしながら出題するクラス
+
+    生成器からは現在の問題と先読み分（prefetch 問）だけを取り出して保持し、
+    先読みした問題のプレートは描画のたびに1枚ずつ事前描画しておく。
+    答えた問題は捨てるので、何問続けても保持する問題とサーフェスの数は変わらない。
+    """
+
+    def __init__(self, questions: Iterable[NumberPlate], limit: Optional[int] = None,
+                 prefetch: int = QUESTION_PREFETCH, plate_cache: Optional[PlateSurfaceCache] = None):
+        """
+        出題キューの初期化
+
+        Args:
+            questions: 出題順の問題（終わりのない生成器でもよい）
+            limit: 出題数の上限（Noneなら生成器が尽きるまで）
+            prefetch: 現在の問題の後に先読みしておく問題数
+            plate_cache: プレートの描画を共有するキャッシュ（省略時はキューごとに描画する）
+        """
+        self._questions: Iterator[NumberPlate] = iter(questions)
+        self.limit = limit
+        self.prefetch = prefetch
+        self.plate_cache = plate_cache
+        self.answered = 0  # 正解して先に進んだ問題数
+        self._issued = 0   # 生成器から取り出した問題数
+        self._exhausted = False
+        # (問題, 事前描画したプレート) の列（先頭が現在の問題）
+        self._buffer: Deque[List] = deque()
+        self._plate_size: Optional[Tuple[int, int]] = None
+        self._fill()
+
+    def _fill(self):
+        """現在の問題と先読み分を生成器から補充する"""
+        while not self._exhausted and len(self._buffer) <= self.prefetch:
+            if self.limit is not None and self._issued >= self.limit:
+                self._exhausted = True
+                break
+            try:
+                question = next(self._questions)
+            except StopIteration:
+                self._exhausted = True
+                break
+            self._issued += 1
+            self._buffer.append([question, None])
+
+    @property
+    def current(self) -> Optional[NumberPlate]:
+        """現在の問題（出題し終わった場合はNone）"""
+        return self._buffer[0][0] if self._buffer else None
+
+    @property
+    def finished(self) -> bool:
+        """すべて出題し終わったかどうか"""
+        return not self._buffer
+
+    def advance(self) -> bool:
+        """
+        現在の問題を答えたことにして次の問題に進む
+
+        Returns:
+            次の問題があればTrue（出題し終わった場合はFalse）
+        """
+        if self._buffer:
+            self._buffer.popleft()
+            self.answered += 1
+        self._fill()
+        return bool(self._buffer)
+
+    def prepare(self, size: Tuple[int, int]):
+        """
+        描画の前に呼び出し、プレートを事前描画する
+
+        現在の問題のプレートがなければ描画し、加えて先読みした問題のプレートを
+        1枚だけ描画する（1フレームあたりの描画量を一定に保つ）。
+        描画サイズが変わった場合は描画済みのプレートを捨てて描き直す。
+
+        Args:
+            size: プレートを描画する (幅, 高さ)
+        """
+        size = (int(size[0]), int(size[1]))
+        if size != self._plate_size:
+            self._plate_size = size
+            for entry in self._buffer:
+                entry[1] = None
+
+        if not self._buffer:
+            return
+        if self._buffer[0][1] is None:
+            self._buffer[0][1] = self._render_plate(self._buffer[0][0], size)
+        for entry in self._buffer:
+            if entry[1] is None:
+                entry[1] = self._render_plate(entry[0], size)
+                break
+
+    def _render_plate(self, plate: NumberPlate, size: Tuple[int, int]) -> pygame.Surface:
+        """プレートを描画する（共有のキャッシュがあればそこから取得する）"""
+        if self.plate_cache is not None:
+            return self.plate_cache.get(plate, size)
+        return plate.render_surface(*size)
+
+    def current_surface(self) -> Optional[pygame.Surface]:
+        """
+        現在の問題の事前描画したプレートを取得する
+
+        Returns:
+            prepare で描画したサーフェス（まだ描画していない場合はNone）
+        """
+        return self._buffer[0][1] if self._buffer else None
+
+    def surfaces(self) -> List[Tuple[str, pygame.Surface]]:
+        """
+        事前描画したプレートを列挙する（メモリ集計用）
+
+        メトリクスのスレッドから呼ばれるので、ゲームのループが変更する前にバッファを複製してから列挙する。
+
+        Returns:
+            (名前, サーフェス) のリスト
+        """
+        return [(f"plate+{i}", surface) for i, (_, surface) in enumerate(list(self._buffer)) if surface is not None]
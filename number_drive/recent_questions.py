@@ -0,0 +1,227 @@
+"""
+直近のプレイで出題した問題を覚えておき、同じ問題を続けて出さないようにするモジュール
+
+問題は (演算, 一連指定番号) を1つの整数のキーにして、出題順に固定長のリングバッファへ入れる。
+キーの種類は 演算の数 × 1万 しかないので、ハッシュ集合やブルームフィルタの代わりに
+キーごとの出現回数の配列を持つ（誤判定がなく、判定は配列を1つ読むだけの O(1)）。
+リングバッファがいっぱいになったら古いキーから回数を減らして捨てるので、
+何回プレイしてもメモリ使用量は変わらない。
+"""
+import json
+from array import array
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from number_drive.config import CACHE_DIR, TOTAL_QUESTIONS
+from number_drive.number_plate import NumberPlate, OperationType
+from number_drive.plate_rules import SERIAL_COUNT
+
+# 保存形式のバージョン
+RECENT_FILE_VERSION = 1
+
+# 出題済みの問題に当たったときに選び直す回数の上限（超えたら重複を許して出題する）
+RECENT_RETRY_LIMIT = 16
+
+
+def question_key(plate: NumberPlate) -> int:
+    """
+    問題を (演算, 一連指定番号) を表す整数にする
+
+    Args:
+        plate: ナンバープレート
+
+    Returns:
+        0 以上 演算の数 × SERIAL_COUNT 未満の整数
+    """
+    return (plate.operation_type.value - 1) * SERIAL_COUNT + plate.front_number * 100 + plate.back_number
+
+
+class RecentQuestionFilter:
+    """
+    直近に出題した問題の集合（固定長）
+
+    capacity 問を超えて追加すると最も古い問題から忘れる。
+    1回のプレイで TOTAL_QUESTIONS 問出題するなら、capacity = 回数 × TOTAL_QUESTIONS で
+    直近の回数分のプレイと重ならない（エンドレスなどで多く出題した回は、その分だけ古い回を早く忘れる）。
+    """
+
+    def __init__(self, capacity: int):
+        """
+        フィルタの初期化
+
+        Args:
+            capacity: 覚えておく問題数（1以上）
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1, got {capacity}")
+        self.capacity = capacity
+        self.counts = array("H", bytes(2 * len(OperationType) * SERIAL_COUNT))  # キーごとの出現回数
+        self.ring = array("l", [-1]) * capacity  # 出題順のキー（-1 は空き）
+        self.head = 0  # 次に書き込む位置
+        self.size = 0
+        self.rejected = 0  # 出題済みで選び直した回数
+        self.repeated = 0  # 選び直しきれずに重複を許した回数
+
+    def __len__(self) -> int:
+        """覚えている問題数"""
+        return self.size
+
+    def __contains__(self, plate: NumberPlate) -> bool:
+        """問題を直近に出題したかどうか"""
+        return self.counts[question_key(plate)] > 0
+
+    def add(self, plate: NumberPlate):
+        """
+        出題した問題を追加する（いっぱいなら最も古い問題を忘れる）
+
+        Args:
+            plate: 出題したナンバープレート
+        """
+        self._push(question_key(plate))
+
+    def _push(self, key: int):
+        """キーをリングバッファに入れて出現回数を数える"""
+        old = self.ring[self.head]
+        if old >= 0:
+            self.counts[old] -= 1
+        else:
+            self.size += 1
+        self.ring[self.head] = key
+        self.counts[key] += 1
+        self.head = (self.head + 1) % self.capacity
+
+    def keys(self):
+        """
+        覚えているキーを古い順に列挙する
+
+        Yields:
+            question_key の値
+        """
+        for i in range(self.capacity):
+            key = self.ring[(self.head + i) % self.capacity]
+            if key >= 0:
+                yield key
+
+    def draw(self, sample) -> NumberPlate:
+        """
+        直近に出題していない問題を選んで追加する
+
+        Args:
+            sample: 問題を1つ選ぶ関数（引数なし）
+
+        Returns:
+            選んだナンバープレート（RECENT_RETRY_LIMIT 回選び直しても見つからなければ最後に選んだもの）
+        """
+        for _ in range(RECENT_RETRY_LIMIT):
+            plate = sample()
+            if plate not in self:
+                break
+            self.rejected += 1
+        else:
+            self.repeated += 1
+        self.add(plate)
+        return plate
+
+    def entries(self) -> List[list]:
+        """
+        覚えている問題を古い順に (演算の名前, 一連指定番号) のリストにする
+
+        演算は名前で表すので、演算の種類が増えても from_entries で読み込める。
+
+        Returns:
+            [演算の名前, 一連指定番号] のリスト
+        """
+        operations = list(OperationType)
+        return [[operations[key // SERIAL_COUNT].name, key % SERIAL_COUNT] for key in self.keys()]
+
+    @classmethod
+    def from_entries(cls, entries: Iterable, capacity: int) -> "RecentQuestionFilter":
+        """
+        entries で取得した問題を覚えたフィルタを作る
+
+        Args:
+            entries: [演算の名前, 一連指定番号] の並び（古い順、知らない演算や整数でない・範囲外の番号は無視する）
+            capacity: 覚えておく問題数（entries より少なければ新しい方から残す）
+
+        Returns:
+            フィルタ
+
+        Raises:
+            ValueError: entries の形式が正しくない場合
+        """
+        keys = []
+        try:
+            for name, serial in entries:
+                operation = OperationType.__members__.get(name)
+                if (operation is not None and isinstance(serial, int) and not isinstance(serial, bool)
+                        and 0 <= serial < SERIAL_COUNT):
+                    keys.append((operation.value - 1) * SERIAL_COUNT + serial)
+        except TypeError as e:
+            raise ValueError(f"Invalid recent question entries: {e}") from e
+        recent = cls(capacity)
+        for key in keys[-capacity:]:
+            recent._push(key)
+        return recent
+
+    def save(self, path: Path):
+        """
+        覚えている問題をファイルに保存する
+
+        Args:
+            path: 保存先のパス
+        """
+        data = {"version": RECENT_FILE_VERSION, "questions": self.entries()}
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+        except OSError as e:
+            print(f"Warning: Could not write recent questions to {path}: {e}")
+
+    @classmethod
+    def load(cls, path: Path, capacity: int) -> "RecentQuestionFilter":
+        """
+        保存した問題を読み込んだフィルタを作る（ファイルがない・壊れている場合は空）
+
+        Args:
+            path: 保存先のパス
+            capacity: 覚えておく問題数（保存時より少なければ新しい方から残す）
+
+        Returns:
+            フィルタ
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == RECENT_FILE_VERSION:
+                return cls.from_entries(data["questions"], capacity)
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+        return cls(capacity)
+
+
+def recent_questions_path(cache_dir: Optional[Path] = None) -> Path:
+    """
+    直近の問題の保存先を取得する
+
+    Args:
+        cache_dir: 保存するディレクトリ（省略時は CACHE_DIR）
+
+    Returns:
+        保存先のパス
+    """
+    return Path(cache_dir or CACHE_DIR) / "recent_questions.json"
+
+
+def filter_for_sessions(sessions: int, cache_dir: Optional[Path] = None) -> RecentQuestionFilter:
+    """
+    直近 sessions 回のプレイ分の問題を覚えるフィルタを保存先から読み込む
+
+    Args:
+        sessions: 重ならないようにするプレイの回数
+        cache_dir: 保存するディレクトリ（省略時は CACHE_DIR）
+
+    Returns:
+        フィルタ
+    """
+    return RecentQuestionFilter.load(recent_questions_path(cache_dir), sessions * TOTAL_QUESTIONS)
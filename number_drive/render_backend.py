@@ -0,0 +1,376 @@
+"""
+描画先（ソフトウェアのサーフェスとSDLのテクスチャ）を切り替えるモジュール
+
+画面のコードは描画先として pygame.Surface と TextureCanvas のどちらを受け取っても
+同じように描画できるよう、blit / blits / fill / get_size は描画先のメソッドを、
+図形の描画と車の回転はこのモジュールの draw_rect / draw_line / blit_rotated を使う。
+"""
+import copy
+import pygame
+import weakref
+from collections import OrderedDict
+from typing import Callable, Optional, Sequence, Tuple
+
+try:
+    from pygame._sdl2.video import Renderer, Texture, Window
+except ImportError:  # pygame._sdl2 のないビルドではテクスチャ描画は使えない
+    Renderer = Texture = Window = None
+
+TEXTURE_BACKEND_AVAILABLE = Renderer is not None
+
+
+def draw_rect(target, color, rect, width: int = 0, border_radius: int = 0) -> pygame.Rect:
+    """
+    長方形を描画する（pygame.draw.rect と同じ引数）
+
+    Args:
+        target: 描画先（pygame.Surface または TextureCanvas）
+        color: 色
+        rect: 長方形
+        width: 枠線の太さ（0なら塗りつぶし）
+        border_radius: 角丸の半径
+
+    Returns:
+        描画した領域の矩形
+    """
+    if isinstance(target, pygame.Surface):
+        return pygame.draw.rect(target, color, rect, width=width, border_radius=border_radius)
+    return target.draw_rect(color, rect, width, border_radius)
+
+
+def draw_line(target, color, start, end, width: int = 1) -> pygame.Rect:
+    """
+    線分を描画する（pygame.draw.line と同じ引数）
+
+    Args:
+        target: 描画先（pygame.Surface または TextureCanvas）
+        color: 色
+        start: 始点
+        end: 終点
+        width: 線の太さ
+
+    Returns:
+        描画した領域の矩形
+    """
+    if isinstance(target, pygame.Surface):
+        return pygame.draw.line(target, color, start, end, width)
+    return target.draw_line(color, start, end, width)
+
+
+def blit_rotated(target, surface: pygame.Surface, center, angle: float, flip_x: bool = False,
+                 transient: Optional[Callable[[pygame.Surface], pygame.Surface]] = None) -> pygame.Rect:
+    """
+    画像を左右反転・回転して、中心を指定して描画する
+
+    サーフェスが描画先の場合は pygame.transform で変換した一時サーフェスを転送し、
+    テクスチャが描画先の場合は元の画像のテクスチャを回転して描画する（一時サーフェスは作らない）。
+
+    Args:
+        target: 描画先（pygame.Surface または TextureCanvas）
+        surface: 画像
+        center: 描画する中心の座標
+        angle: 反時計回りの回転角度（度、pygame.transform.rotate と同じ向き）
+        flip_x: 左右反転するかどうか
+        transient: 一時サーフェスを数える関数（MemoryAccounting.transient）
+
+    Returns:
+        描画した領域の矩形
+    """
+    if not isinstance(target, pygame.Surface):
+        return target.blit_rotated(surface, center, angle, flip_x)
+
+    if flip_x:
+        surface = pygame.transform.flip(surface, True, False)
+        if transient:
+            transient(surface)
+    rotated = pygame.transform.rotate(surface, angle)
+    if transient:
+        transient(rotated)
+    rect = rotated.get_rect(center=center)
+    target.blit(rotated, rect)
+    return rect
+
+
+class TextureCanvas:
+    """
+    SDLのレンダラーに描画する描画先（pygame.Surface と同じ使い方ができる）
+
+    転送されたサーフェスは初回にテクスチャへ変換し、サーフェスが生きている間は
+    同じテクスチャを使い回す（弱参照で対応づけるので、サーフェスが破棄されれば
+    テクスチャも破棄される）。ロゴや車、事前描画したプレート、グリフアトラスの文字列など
+    共有されるサーフェスは一度だけ転送され、以降のフレームはテクスチャのコピーだけになる。
+    毎フレーム作られる文字は毎回変換される。
+    角丸の長方形や太さのある線は一度だけサーフェスに描いてテクスチャにし、
+    形と色ごとに使い回す。論理サイズはレンダラーが窓の大きさに合わせて拡大する。
+    subsurface で取得した描画先は座標をずらして同じレンダラーに描画する。
+    """
+
+    def __init__(self, renderer: "Renderer", size: Tuple[int, int], window: Optional["Window"] = None,
+                 max_shapes: int = 256):
+        """
+        描画先の初期化
+
+        Args:
+            renderer: 描画に使うレンダラー
+            size: 論理サイズ（幅, 高さ）
+            window: レンダラーの描画先のウィンドウ
+            max_shapes: 形と色ごとに保持する図形のテクスチャの数
+        """
+        self.renderer = renderer
+        self.window = window
+        self.size = (int(size[0]), int(size[1]))
+        self.offset = (0, 0)  # subsurface で取得した場合のレンダラー上の左上の座標
+        renderer.logical_size = self.size
+        self.max_shapes = max_shapes
+        self._textures: "weakref.WeakKeyDictionary[pygame.Surface, Texture]" = weakref.WeakKeyDictionary()
+        self._shapes: "OrderedDict[tuple, Texture]" = OrderedDict()
+        # 累計の転送数（ベンチマーク用）
+        self.stats = {"uploads": 0, "shape_uploads": 0, "copies": 0}
+
+    @classmethod
+    def create_window(cls, size: Tuple[int, int], title: str, fullscreen: bool = False,
+                      vsync: bool = False) -> "TextureCanvas":
+        """
+        ウィンドウとレンダラーを作成する
+
+        Args:
+            size: 論理サイズ（ウィンドウの初期サイズ）
+            title: ウィンドウのタイトル
+            fullscreen: フルスクリーン（デスクトップの解像度）で表示するかどうか
+            vsync: 垂直同期を待つかどうか
+
+        Returns:
+            作成したウィンドウに描画する描画先
+        """
+        window = Window(title, size=size, resizable=True, fullscreen_desktop=fullscreen)
+        renderer = Renderer(window, vsync=vsync)
+        return cls(renderer, size, window)
+
+    def get_size(self) -> Tuple[int, int]:
+        """論理サイズを取得する"""
+        return self.size
+
+    def get_width(self) -> int:
+        """論理サイズの幅を取得する"""
+        return self.size[0]
+
+    def get_height(self) -> int:
+        """論理サイズの高さを取得する"""
+        return self.size[1]
+
+    def get_rect(self, **kwargs) -> pygame.Rect:
+        """描画先全体の矩形を取得する（Surface.get_rect と同じ指定方法）"""
+        rect = pygame.Rect((0, 0), self.size)
+        for name, value in kwargs.items():
+            setattr(rect, name, value)
+        return rect
+
+    def subsurface(self, rect) -> "TextureCanvas":
+        """
+        描画先の一部を、その左上を原点とする描画先として取得する（Surface.subsurface と同じ使い方）
+
+        テクスチャと図形のキャッシュ、転送数は元の描画先と共有する。
+        サーフェスと違い、範囲からはみ出した描画は切り取られない。
+
+        Args:
+            rect: 描画先の中の範囲
+
+        Returns:
+            座標をずらして描画する描画先
+        """
+        rect = pygame.Rect(rect)
+        view = copy.copy(self)
+        view.size = rect.size
+        view.offset = (self.offset[0] + rect.x, self.offset[1] + rect.y)
+        return view
+
+    def texture(self, surface: pygame.Surface) -> "Texture":
+        """
+        サーフェスに対応するテクスチャを取得する（初回のみ変換する）
+
+        Args:
+            surface: サーフェス（共有されるサーフェスは変換後に描き換えてはいけない）
+
+        Returns:
+            テクスチャ
+        """
+        texture = self._textures.get(surface)
+        if texture is None:
+            texture = self._textures[surface] = Texture.from_surface(self.renderer, surface)
+            self.stats["uploads"] += 1
+        return texture
+
+    def fill(self, color, rect=None) -> pygame.Rect:
+        """
+        塗りつぶす
+
+        Args:
+            color: 色
+            rect: 塗りつぶす範囲（省略時は全体）
+
+        Returns:
+            塗りつぶした範囲
+        """
+        renderer = self.renderer
+        renderer.draw_color = (*color[:3], 255)
+        if rect is None and self.offset == (0, 0):
+            renderer.clear()
+            return self.get_rect()
+        rect = self.get_rect() if rect is None else pygame.Rect(rect)
+        renderer.fill_rect(rect.move(self.offset))
+        return rect
+
+    def blit(self, source: pygame.Surface, dest, area=None, special_flags: int = 0) -> pygame.Rect:
+        """
+        サーフェスを描画する（Surface.blit と同じ引数、special_flags には対応しない）
+
+        Args:
+            source: 描画するサーフェス
+            dest: 描画位置（左上の座標または矩形）
+            area: 描画するサーフェスの範囲
+            special_flags: 無視される
+
+        Returns:
+            描画した領域の矩形
+        """
+        x, y = dest[0] + self.offset[0], dest[1] + self.offset[1]
+        if area is None:
+            rect = pygame.Rect(int(x), int(y), source.get_width(), source.get_height())
+            self.texture(source).draw(dstrect=rect)
+        else:
+            area = pygame.Rect(area)
+            rect = pygame.Rect(int(x), int(y), area.width, area.height)
+            self.texture(source).draw(srcrect=area, dstrect=rect)
+        self.stats["copies"] += 1
+        return rect.move(-self.offset[0], -self.offset[1])
+
+    def blits(self, blit_sequence: Sequence, doreturn: bool = True):
+        """
+        複数のサーフェスを描画する（Surface.blits と同じ引数）
+
+        Args:
+            blit_sequence: (サーフェス, 位置[, 範囲[, フラグ]]) の並び
+            doreturn: 描画した領域のリストを返すかどうか
+
+        Returns:
+            描画した領域の矩形のリスト（doreturn が偽ならNone）
+        """
+        rects = [self.blit(*item) for item in blit_sequence]
+        return rects if doreturn else None
+
+    def draw_rect(self, color, rect, width: int = 0, border_radius: int = 0) -> pygame.Rect:
+        """
+        長方形を描画する（draw_rect から呼ばれる）
+
+        Args:
+            color: 色（透明度は無視する、画面のサーフェスに描いた場合と同じ）
+            rect: 長方形
+            width: 枠線の太さ（0なら塗りつぶし）
+            border_radius: 角丸の半径
+
+        Returns:
+            描画した領域の矩形
+        """
+        rect = pygame.Rect(rect)
+        if width == 0 and border_radius <= 0:
+            return self.fill(color, rect)
+
+        key = ("rect", rect.size, tuple(color[:3]), width, border_radius)
+        texture = self._shape(key, rect.size, lambda surface: pygame.draw.rect(
+            surface, color[:3], surface.get_rect(), width=width, border_radius=border_radius))
+        texture.draw(dstrect=rect.move(self.offset))
+        self.stats["copies"] += 1
+        return rect
+
+    def draw_line(self, color, start, end, width: int = 1) -> pygame.Rect:
+        """
+        線分を描画する（draw_line から呼ばれる）
+
+        Args:
+            color: 色
+            start: 始点
+            end: 終点
+            width: 線の太さ
+
+        Returns:
+            描画した領域の矩形
+        """
+        x1, y1 = int(start[0]), int(start[1])
+        x2, y2 = int(end[0]), int(end[1])
+        if width <= 1:
+            renderer = self.renderer
+            renderer.draw_color = (*color[:3], 255)
+            ox, oy = self.offset
+            renderer.draw_line((x1 + ox, y1 + oy), (x2 + ox, y2 + oy))
+            return pygame.Rect(min(x1, x2), min(y1, y2), abs(x2 - x1) + 1, abs(y2 - y1) + 1)
+
+        # 太さのある線は線を囲む範囲のサーフェスに描いて使い回す（位置が違っても形が同じなら共有する）
+        left = min(x1, x2) - width
+        top = min(y1, y2) - width
+        size = (abs(x2 - x1) + width * 2 + 1, abs(y2 - y1) + width * 2 + 1)
+        local_start = (x1 - left, y1 - top)
+        local_end = (x2 - left, y2 - top)
+        key = ("line", size, local_start, local_end, tuple(color[:3]), width)
+        texture = self._shape(key, size, lambda surface: pygame.draw.line(
+            surface, color[:3], local_start, local_end, width))
+        rect = pygame.Rect((left, top), size)
+        texture.draw(dstrect=rect.move(self.offset))
+        self.stats["copies"] += 1
+        return rect
+
+    def blit_rotated(self, surface: pygame.Surface, center, angle: float, flip_x: bool = False) -> pygame.Rect:
+        """
+        画像のテクスチャを左右反転・回転して描画する（blit_rotated から呼ばれる）
+
+        Args:
+            surface: 画像
+            center: 描画する中心の座標
+            angle: 反時計回りの回転角度（度）
+            flip_x: 左右反転するかどうか
+
+        Returns:
+            回転前の画像を置いた矩形
+        """
+        rect = surface.get_rect(center=(int(center[0]), int(center[1])))
+        # SDLの回転は時計回り
+        self.texture(surface).draw(dstrect=rect.move(self.offset), angle=-angle, flip_x=flip_x)
+        self.stats["copies"] += 1
+        return rect
+
+    def _shape(self, key: tuple, size: Tuple[int, int], draw: Callable[[pygame.Surface], object]) -> "Texture":
+        """
+        図形のテクスチャを取得する（初回のみ描画する）
+
+        Args:
+            key: 形と色を表すキー
+            size: 図形を描くサーフェスのサイズ
+            draw: サーフェスに図形を描く関数
+
+        Returns:
+            図形のテクスチャ
+        """
+        shapes = self._shapes
+        texture = shapes.get(key)
+        if texture is not None:
+            shapes.move_to_end(key)
+            return texture
+        surface = pygame.Surface((max(size[0], 1), max(size[1], 1)), pygame.SRCALPHA)
+        draw(surface)
+        texture = shapes[key] = Texture.from_surface(self.renderer, surface)
+        self.stats["shape_uploads"] += 1
+        if len(shapes) > self.max_shapes:
+            shapes.popitem(last=False)
+        return texture
+
+    def present(self):
+        """描画した内容を画面に表示する"""
+        self.renderer.present()
+
+    def to_surface(self) -> pygame.Surface:
+        """
+        描画した内容をサーフェスに読み出す（比較や保存用、遅い）
+
+        Returns:
+            描画内容のサーフェス
+        """
+        return self.renderer.to_surface()
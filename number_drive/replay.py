@@ -0,0 +1,244 @@
+"""
+プレイを記録して、あとから同じ画面を描き直すためのモジュール
+
+ゲームのロジックは固定ステップ（LOGIC_HZ）で進み、乱数はシードから用途ごとに作るので、
+シードと「何ティック目に画面へどのイベントを渡したか」があれば同じ状態を作り直せる。
+記録はJSON Linesで、1行目が設定、2行目以降がイベント、最後の行が記録の終わり。
+
+    {"t": "replay", "version": 1, "seed": 123, "settings": {...}}
+    {"t": "e", "k": 512, "e": "KEYDOWN", "a": {"key": 49, "mod": 0, "unicode": "1", "scancode": 30}}
+    {"t": "end", "k": 9600}
+
+再生（SessionReplay）は実際の画面クラスをヘッドレスのゲームで動かし、任意のティックまで
+ロジックだけを進めてから描画する。描画はロジックの状態を変えないので、どこから描き始めても
+最初から通して描いた場合と同じ絵になる。
+"""
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, TextIO, Tuple, Union
+
+import pygame
+
+# 記録の形式のバージョン
+REPLAY_VERSION = 1
+
+# 記録の種類
+HEADER_RECORD = "replay"
+EVENT_RECORD = "e"
+END_RECORD = "end"
+
+# 記録するイベントの種類と属性（画面に渡すイベントだけを記録すれば状態を作り直せる）
+RECORDED_EVENTS: Dict[str, Tuple[str, ...]] = {
+    "KEYDOWN": ("key", "mod", "unicode", "scancode"),
+    "MOUSEMOTION": ("pos", "rel", "buttons"),
+    "MOUSEBUTTONDOWN": ("pos", "button"),
+    "MOUSEBUTTONUP": ("pos", "button"),
+}
+_EVENT_NAMES = {getattr(pygame, name): name for name in RECORDED_EVENTS}
+
+
+class SessionRecorder:
+    """
+    画面に渡したイベントをロジックのティックと一緒にファイルへ書き出すクラス
+
+    イベントは書き込みバッファに溜めるだけなので、1件あたりの処理は文字列の組み立てだけで済む。
+    """
+
+    def __init__(self, path: Union[str, Path], seed: int, settings: dict):
+        """
+        記録の開始（ファイルを作り直して設定を書き込む）
+
+        Args:
+            path: 記録の出力先
+            seed: ゲームの乱数のシード
+            settings: ゲームの作成時の設定（SessionReplay が Game に渡す）
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: Optional[TextIO] = open(self.path, "w", encoding="utf-8")
+        self.events = 0
+        self._write({"t": HEADER_RECORD, "version": REPLAY_VERSION, "seed": seed, "settings": settings})
+
+    def _write(self, record: dict):
+        """1件の記録を書き込む"""
+        self._file.write(json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n")
+
+    def record_event(self, tick: int, event):
+        """
+        画面に渡したイベントを記録する
+
+        Args:
+            tick: イベントを渡した時点のロジックのティック数
+            event: Pygameのイベント（記録しない種類なら何もしない）
+        """
+        name = _EVENT_NAMES.get(event.type)
+        if name is None or self._file is None:
+            return
+        attributes = {attribute: getattr(event, attribute, None) for attribute in RECORDED_EVENTS[name]}
+        self._write({"t": EVENT_RECORD, "k": tick, "e": name, "a": attributes})
+        self.events += 1
+
+    def flush(self):
+        """書き込みバッファをファイルに書き出す（プレイの区切りで呼び出し、強制終了されても記録を残す）"""
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self, tick: int):
+        """
+        記録の終わりを書き込んでファイルを閉じる
+
+        Args:
+            tick: 終了時のロジックのティック数
+        """
+        if self._file is not None:
+            self._write({"t": END_RECORD, "k": tick})
+            self._file.close()
+            self._file = None
+
+
+class Recording:
+    """読み込んだ記録（設定とイベントの列）"""
+
+    def __init__(self, seed: int, settings: dict, events: List[Tuple[int, str, dict]], end_tick: int):
+        """
+        記録の初期化
+
+        Args:
+            seed: ゲームの乱数のシード
+            settings: ゲームの作成時の設定
+            events: (ティック数, イベントの種類の名前, 属性) のリスト（ティック順）
+            end_tick: 記録の終わりのティック数
+        """
+        self.seed = seed
+        self.settings = settings
+        self.events = events
+        self.end_tick = end_tick
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "Recording":
+        """
+        記録をファイルから読み込む
+
+        終わりの行がない記録（ゲームが異常終了した場合など）は、最後のイベントまでを使う。
+
+        Args:
+            path: 記録のパス
+
+        Returns:
+            記録
+
+        Raises:
+            ValueError: 記録の形式やバージョンが正しくない場合
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            header = json.loads(f.readline() or "{}")
+            if header.get("t") != HEADER_RECORD or header.get("version") != REPLAY_VERSION:
+                raise ValueError(f"{path} is not a version {REPLAY_VERSION} replay recording")
+            events = []
+            end_tick = None
+            for line in f:
+                record = json.loads(line)
+                if record["t"] == EVENT_RECORD:
+                    events.append((record["k"], record["e"], record["a"]))
+                elif record["t"] == END_RECORD:
+                    end_tick = record["k"]
+        if end_tick is None:
+            end_tick = events[-1][0] if events else 0
+        return cls(header["seed"], header["settings"], events, end_tick)
+
+
+def _to_event(name: str, attributes: dict):
+    """記録したイベントを Pygame のイベントに戻す（JSONで配列になった座標はタプルに戻す）"""
+    attributes = {key: tuple(value) if isinstance(value, list) else value for key, value in attributes.items()}
+    return pygame.event.Event(getattr(pygame, name), attributes)
+
+
+class SessionReplay:
+    """
+    記録をヘッドレスのゲームで再生するクラス
+
+    ロジックは前にしか進められないので、巻き戻す場合はゲームを作り直して最初から進める。
+    """
+
+    def __init__(self, recording: Recording):
+        """
+        再生の初期化（記録の設定でゲームを作成する）
+
+        SDLのビデオドライバーは呼び出し側で設定しておく（ヘッドレスなら "dummy"）。
+
+        Args:
+            recording: 再生する記録
+        """
+        self.recording = recording
+        self.game = None
+        self._next_event = 0
+        self._create_game()
+
+    def _create_game(self):
+        """記録の設定でゲームを作り直す"""
+        from number_drive.game import Game  # game.py がこのモジュールを読み込むので、使うときに読み込む
+        from number_drive.game_enums import RunType
+        from number_drive.recent_questions import RecentQuestionFilter
+
+        settings = self.recording.settings
+        game = Game(
+            seed=self.recording.seed,
+            weighted_plates=settings.get("weighted_plates", False),
+            low_memory=settings.get("low_memory", False),
+            run_type=RunType[settings.get("run_type", RunType.STANDARD.name)],
+            type_ahead=settings.get("type_ahead", True),
+            auto_submit=settings.get("auto_submit", False),
+            sound=False
+        )
+        recent = settings.get("recent_questions")
+        if recent is not None:
+            # 記録の開始時点の出題履歴を使い、ディスクの履歴は読み書きしない
+            game.recent_questions = RecentQuestionFilter.from_entries(recent["entries"], recent["capacity"])
+            game.recent_questions_file = None
+        self.game = game
+        self._next_event = 0
+
+    @property
+    def tick(self) -> int:
+        """ゲームのロジックのティック数"""
+        return self.game.logic_ticks
+
+    def seek(self, tick: int):
+        """
+        指定したティックまでロジックを進め、そのティックまでのイベントを画面に渡す
+
+        実際のゲームと同じく、ティックを進めてからそのティックで受け取ったイベントを処理する。
+
+        Args:
+            tick: 進める先のティック数（現在より前なら最初からやり直す）
+        """
+        if tick < self.game.logic_ticks:
+            self._create_game()
+        game = self.game
+        events = self.recording.events
+        while True:
+            # 次のイベントのティック（なければ目標のティック）まで進める
+            target = tick
+            if self._next_event < len(events):
+                target = min(target, events[self._next_event][0])
+            while game.logic_ticks < target:
+                game.update()
+            if self._next_event >= len(events) or events[self._next_event][0] > tick:
+                return
+            _, name, attributes = events[self._next_event]
+            self._next_event += 1
+            game.dispatch_event(_to_event(name, attributes))
+
+    def render(self, tick: int) -> pygame.Surface:
+        """
+        指定したティックの画面を描画する
+
+        Args:
+            tick: 描画するティック数
+
+        Returns:
+            論理サイズの描画結果（次の描画で上書きされる）
+        """
+        self.seek(tick)
+        self.game.render()
+        return self.game.screen
@@ -0,0 +1,108 @@
+"""
+プレイの記録をJSON Lines形式で追記するモジュール
+
+1行が1件の記録で、次の2種類がある（集計は number_drive.tools.run_report で行う）。
+
+    {"t": "q", "run": "...", "p": 0, "op": "ADDITION", "a": 43, "b": 31, "sec": 2.133, "wrong": 1}
+    {"t": "run", "run": "...", "ts": 1760000000, "day": "2025-10-09", "mode": "EASY",
+     "type": "STANDARD", "time": 35.2, "answered": 10, "questions": 10, "wrong": 3, "winner": null}
+
+"q" は正解した問題ごとの記録（sec は出題されてから正解するまでの秒数、wrong はそれまでの誤答数）、
+"run" はリザルト画面に進んだプレイごとの記録。途中でやめたプレイは "q" の記録だけが残る。
+"""
+import json
+import time
+import uuid
+from pathlib import Path
+from typing import Optional, TextIO, Union
+
+from number_drive.game_enums import GameMode, RunType
+from number_drive.number_plate import NumberPlate
+
+# 記録の種類
+QUESTION_RECORD = "q"
+RUN_RECORD = "run"
+
+
+class RunLog:
+    """
+    プレイの記録をファイルに追記するクラス
+
+    問題ごとの記録は書き込みバッファに溜めるだけで、プレイの終わりにまとめて書き出す。
+    プレイ中に保持するのは件数と誤答数の合計だけなので、エンドレスで何問続けても
+    メモリは増えない。
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        記録の初期化
+
+        Args:
+            path: 追記するファイルのパス（なければ作成する）
+        """
+        self.path = Path(path)
+        self._file: Optional[TextIO] = None
+        self.run_id: Optional[str] = None
+        self._questions = 0
+        self._wrong = 0
+
+    def _write(self, record: dict):
+        """1件の記録を書き込む（初回にファイルを開く）"""
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def begin_run(self):
+        """新しいプレイの記録を始める"""
+        self.run_id = uuid.uuid4().hex
+        self._questions = 0
+        self._wrong = 0
+
+    def record_answer(self, player: int, plate: NumberPlate, seconds: float, wrong: int):
+        """
+        正解した問題を記録する
+
+        Args:
+            player: プレイヤーの番号（1人プレイは0、対戦は0か1）
+            plate: 正解した問題
+            seconds: 出題されてから正解するまでの秒数
+            wrong: 正解するまでの誤答数
+        """
+        if self.run_id is None:
+            return
+        self._questions += 1
+        self._wrong += wrong
+        self._write({
+            "t": QUESTION_RECORD, "run": self.run_id, "p": player, "op": plate.operation_type.name,
+            "a": plate.front_number, "b": plate.back_number, "sec": round(seconds, 3), "wrong": wrong
+        })
+
+    def end_run(self, mode: GameMode, run_type: RunType, clear_time: float, answered: int,
+                winner: Optional[int] = None):
+        """
+        リザルト画面に進んだプレイを記録して書き出す
+
+        Args:
+            mode: 難易度
+            run_type: プレイの種類
+            clear_time: クリアタイム（エンドレス・タイムアタックは経過時間）
+            answered: 正解した問題数（対戦は勝った方の数）
+            winner: 対戦で勝ったプレイヤーの番号
+        """
+        if self.run_id is None:
+            return
+        now = time.time()
+        self._write({
+            "t": RUN_RECORD, "run": self.run_id, "ts": int(now), "day": time.strftime("%Y-%m-%d", time.localtime(now)),
+            "mode": mode.name, "type": run_type.name, "time": round(clear_time, 3), "answered": answered,
+            "questions": self._questions, "wrong": self._wrong, "winner": winner
+        })
+        self._file.flush()
+        self.run_id = None
+
+    def close(self):
+        """ファイルを閉じる"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -2,23 +2,31 @@
 ゲーム画面を定義するモジュール
 """
 import pygame
-import time
-import random
 import os
-from typing import List, Optional
+from typing import Optional
 
 from number_drive.config import (
     SCREEN_WIDTH, SCREEN_HEIGHT, MEDIUM_FONT_SIZE, SMALL_FONT_SIZE, LARGE_FONT_SIZE,
     WHITE, ACCENT_COLOR, MAIN_COLOR_PINK, POINT_COLOR, BUTTON_INACTIVE, BUTTON_BORDER, 
-    TOTAL_QUESTIONS, get_font, FOOTER_GRAY, IMAGES_DIR, BACKGROUND_COLOR, DECORATION_COLOR
+    TOTAL_QUESTIONS, TIME_ATTACK_SECONDS, get_font, FOOTER_GRAY, IMAGES_DIR, BACKGROUND_COLOR, DECORATION_COLOR,
+    CAR_DRIVE_SECONDS
 )
-from number_drive.number_plate import NumberPlate, OperationType
-from number_drive.game_enums import GameState, GameMode
+from number_drive.car_animation import drive_direction, drive_pose
+from number_drive.number_plate import stream_questions
+from number_drive.game_enums import GameState, RunType
+from number_drive.question_stream import QuestionQueue
+from number_drive.render_backend import draw_line, draw_rect
+from number_drive.layout import GameLayout
+from number_drive.placement import OccupancyGrid, generate_decorations
+from number_drive.screens.player_session import PlayerSession
 
 
 class GameScreen:
     """ゲーム画面を表すクラス"""
     
+    # この画面が処理するイベントの種類
+    EVENT_TYPES = (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN)
+    
     def __init__(self, game):
         """
         ゲーム画面の初期化
@@ -29,37 +37,39 @@ class GameScreen:
         self.game = game
         self.start_time = None
         self.current_time = 0.0
-        self.current_question = 0
-        self.number_plates = []
-        self.current_input = ""
-        self.feedback = None  # None: なし, True: 正解, False: 不正解
-        self.feedback_time = None
+        
+        # 出題キュー・入力・フィードバック（対戦画面と同じ描画を使う）
+        self.session = PlayerSession(game)
+        
+        # 出題用の乱数生成器（シード指定時は毎回同じ問題列になる）
+        self.question_rng = game.create_rng("questions")
+        # 事前描画したプレートもメモリ集計に含める
+        game.memory.add_source("questions", self._plate_surfaces)
         
         # モーダル関連
         self.show_modal = False
         self.modal_buttons = []
         self.selected_button_index = 0  # 選択中のボタンインデックス
         
-        # 装飾用の車の画像を読み込む（1台だけ）
-        self.car = None
-        try:
-            car_path = os.path.join(IMAGES_DIR, "cars", "add_car.png")
-            car_img = pygame.image.load(car_path)
-            # 車の画像サイズを調整（画面幅の10%程度 - ゲーム画面では小さめに）
-            car_width = int(SCREEN_WIDTH * 0.1)
-            car_height = car_width * car_img.get_height() / car_img.get_width()
-            self.car = pygame.transform.scale(car_img, (car_width, car_height))
-        except Exception as e:
-            print(f"Warning: Could not load car image: {e}")
+        # 直近の描画で使ったレイアウト
+        self.layout = self.game.layout_cache.get(GameLayout, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        
+        # 装飾用の車の画像を読み込む（1台だけ、画面幅の10%程度 - ゲーム画面では小さめに）
+        car_path = os.path.join(IMAGES_DIR, "cars", "add_car.png")
+        self.car = game.sprites.load_scaled(car_path, int(SCREEN_WIDTH * 0.1), "game")
         
         # 車の位置、回転、反転をランダムに設定
+        rng = game.create_rng("game")
         self.car_position = (SCREEN_WIDTH * 0.85, SCREEN_HEIGHT * 0.85)  # 右下に配置
-        self.car_rotation = random.randint(-15, 15)
-        self.car_flip = random.choice([True, False])
+        self.car_rotation = rng.randint(-15, 15)
+        self.car_flip = rng.choice([True, False])
         
-        # 装飾用の数字と記号
-        self.decorations = []
-        symbols = ["+", "-", "×", "="]
+        # 車の回転した絵は起動時に用意しておき、正解するたびに画面を走り抜ける
+        self.car_frames = None
+        if self.car:
+            self.car_frames = game.sprites.rotation_frames(
+                self.car, "add_car", self.car_rotation, self.car_flip, "game")
+        self.car_drive_start = None  # 走り始めた時刻（走っていない間はNone）
         
         # 安全領域（重要な要素と重ならないエリア）
         safe_areas = [
@@ -90,72 +100,54 @@ class GameScreen:
             ))
         
         # 装飾を配置（安全領域を避ける）
-        for _ in range(8):  # ゲーム画面では装飾を少なめに
-            attempts = 0
-            while attempts < 10:  # 最大10回試行
-                x = random.randint(50, SCREEN_WIDTH - 50)
-                y = random.randint(50, SCREEN_HEIGHT - 50)
-                
-                # 安全領域との衝突チェック
-                if not any(area.collidepoint(x, y) for area in safe_areas):
-                    symbol = random.choice(symbols) if random.random() > 0.7 else str(random.randint(0, 9))
-                    size = random.randint(12, 20)  # サイズ範囲を調整
-                    alpha = random.randint(5, 15)  # 透明度をさらに高く（色をかなり薄く）
-                    self.decorations.append((symbol, x, y, size, alpha))
-                    break
-                
-                attempts += 1
+        grid = OccupancyGrid(SCREEN_WIDTH, SCREEN_HEIGHT)
+        for area in safe_areas:
+            grid.block_rect(area)
+        self.decorations = generate_decorations(rng, grid, 8, size_range=(12, 20))  # ゲーム画面では装飾を少なめに
+        self.decoration_sprites = game.sprites.prerender_decorations(self.decorations, ACCENT_COLOR, "game")
     
     def reset(self):
         """画面の状態をリセットする"""
-        self.start_time = time.time()
+        self.start_time = self.game.logic_time
         self.current_time = 0.0
-        self.current_question = 0
-        self.current_input = ""
-        self.feedback = None
-        self.feedback_time = None
         self.show_modal = False
+        self.car_drive_start = None
         
         # 問題を生成
         self.generate_questions()
     
     def generate_questions(self):
-        """ゲームモードに応じた問題を生成する"""
-        self.number_plates = []
-        
-        if self.game.game_mode == GameMode.EASY:
-            # イージーモード: 足し算のみ
-            for _ in range(TOTAL_QUESTIONS):
-                self.number_plates.append(NumberPlate(OperationType.ADDITION))
-        
-        elif self.game.game_mode == GameMode.NORMAL:
-            # ノーマルモード: 足し算5問、引き算5問を出題（出題順はランダム）
-            questions = []
-            # 足し算5問を追加
-            for _ in range(5):
-                questions.append(NumberPlate(OperationType.ADDITION))
-            # 引き算5問を追加
-            for _ in range(5):
-                questions.append(NumberPlate(OperationType.SUBTRACTION))
-            # 問題をシャッフル
-            random.shuffle(questions)
-            self.number_plates = questions
-        
-        else:  # HARD
-            # ハードモード: 足し算4問、引き算4問、掛け算2問を出題（出題順はランダム）
-            questions = []
-            # 足し算4問を追加
-            for _ in range(4):
-                questions.append(NumberPlate(OperationType.ADDITION))
-            # 引き算4問を追加
-            for _ in range(4):
-                questions.append(NumberPlate(OperationType.SUBTRACTION))
-            # 掛け算2問を追加
-            for _ in range(2):
-                questions.append(NumberPlate(OperationType.MULTIPLICATION))
-            # 問題をシャッフル
-            random.shuffle(questions)
-            self.number_plates = questions
+        """
+        ゲームモードに応じた出題キューを作る
+        
+        問題は生成器から先読みする分だけ取り出すので、エンドレスやタイムアタックで
+        何問続けても保持する問題の数は変わらない。通常のプレイは TOTAL_QUESTIONS 問で終わる。
+        Game.recent_questions が有効なら、直近のプレイで出題した問題は出さない。
+        """
+        questions = stream_questions(self.game.game_mode, self.question_rng, self.game.plate_sampler,
+                                     self.game.recent_questions)
+        limit = TOTAL_QUESTIONS if self.game.run_type == RunType.STANDARD else None
+        self.session.reset(QuestionQueue(questions, limit, plate_cache=self.game.plate_cache))
+    
+    @property
+    def questions(self) -> Optional[QuestionQueue]:
+        """出題キュー"""
+        return self.session.questions
+    
+    @property
+    def current_question(self) -> int:
+        """正解した問題数（現在の問題の番号 - 1）"""
+        return self.session.answered
+    
+    def _plate_surfaces(self):
+        """事前描画したプレートを列挙する（メモリ集計用）"""
+        return self.questions.surfaces() if self.questions else ()
+    
+    def finish_run(self):
+        """プレイを終えてリザルト画面へ進む"""
+        self.game.set_clear_time(self.current_time)
+        self.game.answered_count = self.current_question
+        self.game.change_state(GameState.RESULT)
     
     def handle_event(self, event):
         """
@@ -181,6 +173,9 @@ class GameScreen:
                     if selected_button["action"] == "quit":
                         # タイトル画面に戻る
                         self.game.change_state(GameState.TITLE)
+                    elif selected_button["action"] == "finish":
+                        # エンドレスはここで終了してリザルト画面へ
+                        self.finish_run()
                     elif selected_button["action"] == "close":
                         # モーダルを閉じる
                         self.show_modal = False
@@ -194,6 +189,9 @@ class GameScreen:
                         if button["action"] == "quit":
                             # タイトル画面に戻る
                             self.game.change_state(GameState.TITLE)
+                        elif button["action"] == "finish":
+                            # エンドレスはここで終了してリザルト画面へ
+                            self.finish_run()
                         elif button["action"] == "close":
                             # モーダルを閉じる
                             self.show_modal = False
@@ -208,96 +206,57 @@ class GameScreen:
                 self._setup_modal_buttons()
                 self.selected_button_index = 1  # デフォルトで「Cancel」を選択
                 return
-                
-            if self.feedback is not None:
-                # フィードバック表示中は何もしない
-                return
-                
-            if event.key == pygame.K_BACKSPACE:
-                # バックスペースで1文字削除
-                self.current_input = self.current_input[:-1]
             
-            elif event.key == pygame.K_RETURN:
-                # エンターキーで回答を確定
-                self.check_answer()
-            
-            elif event.unicode.isdigit() or (event.unicode == '-' and not self.current_input):
-                # 数字または先頭のマイナス記号を入力
-                self.current_input += event.unicode
+            # 数字の入力・削除・確定（フィードバック表示中は何もしない）
+            if self.session.handle_key(event):
+                # 全問題終了したらリザルト画面へ
+                self.finish_run()
     
     def _setup_modal_buttons(self):
         """モーダルのボタンを設定する"""
-        button_width = 250  # さらに幅を広げる
-        button_height = 60  # 高さはそのまま
-        button_spacing = 60  # ボタン間隔をさらに広げる
-        
-        # ボタンの位置を計算（モーダルの中央に配置）
-        modal_center_x = SCREEN_WIDTH // 2
-        modal_center_y = SCREEN_HEIGHT // 2
-        
-        # 中断ボタン
-        quit_button_rect = pygame.Rect(
-            modal_center_x - button_width - button_spacing // 2,
-            modal_center_y + 40,  # 少し下に移動
-            button_width,
-            button_height
-        )
-        
-        # 閉じるボタン
-        close_button_rect = pygame.Rect(
-            modal_center_x + button_spacing // 2,
-            modal_center_y + 40,  # 少し下に移動
-            button_width,
-            button_height
-        )
+        # ボタンの位置はモーダルの中央に配置済み（レイアウトで計算）
+        quit_button_rect = self.layout.quit_button
+        close_button_rect = self.layout.close_button
+        
+        if self.game.run_type == RunType.ENDLESS:
+            # エンドレスには終わりがないので、ここで終えて結果を表示する
+            quit_button = {"rect": quit_button_rect, "text": "Finish", "action": "finish"}
+        else:
+            quit_button = {"rect": quit_button_rect, "text": "Quit Game", "action": "quit"}
         
         self.modal_buttons = [
-            {"rect": quit_button_rect, "text": "Quit Game", "action": "quit"},
+            quit_button,
             {"rect": close_button_rect, "text": "Cancel", "action": "close"}
         ]
     
     def check_answer(self):
         """回答をチェックする"""
-        if not self.current_input:
-            return
-        
-        try:
-            user_answer = int(self.current_input)
-            correct_answer = self.number_plates[self.current_question].get_answer()
-            
-            if user_answer == correct_answer:
-                # 正解
-                self.feedback = True
-                self.feedback_time = time.time()
-                
-                # 次の問題へ進む準備
-                self.current_question += 1
-                self.current_input = ""
-                
-                # 全問題終了したらリザルト画面へ
-                if self.current_question >= TOTAL_QUESTIONS:
-                    self.game.set_clear_time(self.current_time)
-                    self.game.change_state(GameState.RESULT)
-            else:
-                # 不正解
-                self.feedback = False
-                self.feedback_time = time.time()
-        except ValueError:
-            # 入力が数値でない場合
-            self.feedback = False
-            self.feedback_time = time.time()
+        if self.session.check_answer():
+            # 全問題終了したらリザルト画面へ
+            self.finish_run()
     
     def update(self):
         """画面の状態を更新する"""
-        # 経過時間を更新
-        if self.start_time:
-            self.current_time = time.time() - self.start_time
-        
-        # フィードバック表示の更新
-        if self.feedback is not None and self.feedback_time:
-            if time.time() - self.feedback_time > 0.5:  # 0.5秒間表示
-                self.feedback = None
-                self.feedback_time = None
+        # 経過時間を更新（ロジック時計で計るので描画のフレームレートに左右されない）
+        now = self.game.logic_time
+        if self.start_time is not None:
+            self.current_time = now - self.start_time
+        
+        # タイムアタックは制限時間で終了
+        if self.game.run_type == RunType.TIME_ATTACK and self.current_time >= TIME_ATTACK_SECONDS:
+            self.current_time = TIME_ATTACK_SECONDS
+            self.finish_run()
+            return
+        
+        # 正解したら車を走らせる（正解の表示中は正解した時刻を走り始めの時刻にする）
+        if self.session.feedback and self.session.feedback_time is not None:
+            self.car_drive_start = self.session.feedback_time
+        elif self.car_drive_start is not None and now - self.car_drive_start >= CAR_DRIVE_SECONDS:
+            self.car_drive_start = None
+        
+        # フィードバック表示の更新（先行入力で最後の問題に正解したら終了、モーダル表示中は先行入力を適用しない）
+        if not self.show_modal and self.session.update(now):
+            self.finish_run()
     
     def render(self, screen):
         """
@@ -306,173 +265,89 @@ class GameScreen:
         Args:
             screen: 描画対象のサーフェス
         """
-        if self.current_question >= TOTAL_QUESTIONS:
-            return
+        render_text = self.game.text_cache.render  # 毎フレーム同じ文字列は描画済みのものを使い回す
         
-        # 装飾的な数字と記号を描画（背景）
-        for symbol, x, y, size, alpha in self.decorations:
-            symbol_font = get_font(size)
-            symbol_surface = symbol_font.render(symbol, True, (*ACCENT_COLOR[:3], alpha))
-            screen.blit(symbol_surface, (x, y))
+        if self.questions is None or self.questions.finished:
+            return
         
-        # 車の画像を描画（背景として）
-        if self.car:
-            # 車を反転させる（必要な場合）
-            if self.car_flip:
-                car = pygame.transform.flip(self.car, True, False)
-            else:
-                car = self.car
-            
-            # 車を回転させる
-            rotated_car = pygame.transform.rotate(car, self.car_rotation)
-            
-            # 回転後の画像の中心位置を調整
-            car_rect = rotated_car.get_rect(center=self.car_position)
-            
-            # 車を描画
-            screen.blit(rotated_car, car_rect)
+        # 描画先のサイズに対応したレイアウト（サイズごとに一度だけ計算される）
+        layout = self.layout = self.game.layout_cache.get(GameLayout, screen.get_size())
+        
+        # 装飾的な数字と記号を描画（背景、省メモリモードでは事前描画したものを使う）
+        if self.decoration_sprites is not None:
+            screen.blits(self.decoration_sprites, doreturn=False)
+        else:
+            for symbol, x, y, size, alpha in self.decorations:
+                symbol_font = get_font(size)
+                symbol_surface = render_text(symbol_font, symbol, (*ACCENT_COLOR[:3], alpha))
+                screen.blit(symbol_surface, (x, y))
+        
+        # 車の画像を描画（背景として、事前に回転しておいた絵を転送するだけ）
+        if self.car_frames is not None:
+            pose = (self.car_position, self.car_rotation)
+            if self.car_drive_start is not None:
+                progress = (self.game.logic_time - self.car_drive_start) / CAR_DRIVE_SECONDS
+                pose = drive_pose(self.car_position, self.car_rotation, progress, drive_direction(self.car_flip),
+                                  self.car_frames.frame(self.car_rotation).get_width(), layout.size[0])
+            self.car_frames.blit(screen, *pose)
         
         # 上部の装飾ライン
-        pygame.draw.line(screen, ACCENT_COLOR, 
-                        (SCREEN_WIDTH * 0.1, 60),
-                        (SCREEN_WIDTH * 0.9, 60), 2)
-        
-        # タイマー表示
-        timer_font = get_font(MEDIUM_FONT_SIZE)
-        timer_text = timer_font.render(f"Time: {self.current_time:.1f}", True, WHITE)
-        timer_rect = timer_text.get_rect(topleft=(30, 20))
-        screen.blit(timer_text, timer_rect)
-        
-        # 問題数表示
-        question_font = get_font(MEDIUM_FONT_SIZE)
-        question_text = question_font.render(f"Q: {self.current_question + 1}/{TOTAL_QUESTIONS}", True, WHITE)
-        question_rect = question_text.get_rect(topright=(SCREEN_WIDTH - 30, 20))
-        screen.blit(question_text, question_rect)
-        
-        # ナンバープレート表示
-        plate_width = SCREEN_WIDTH * 0.45  # 幅を少し大きく
-        plate_x = (SCREEN_WIDTH - plate_width) // 2
-        plate_y = SCREEN_HEIGHT // 3 - 20  # 少し上に移動
-        
-        # 演算子の種類表示（ナンバープレートの直上に配置）- 記号を追加
-        current_plate = self.number_plates[self.current_question]
-        op_name = current_plate.get_operation_name()
-        op_symbol = ""
-        
-        # 演算子に対応する記号を追加
-        if current_plate.operation_type == OperationType.ADDITION:
-            op_symbol = "+"
-        elif current_plate.operation_type == OperationType.SUBTRACTION:
-            op_symbol = "-"
-        elif current_plate.operation_type == OperationType.MULTIPLICATION:
-            op_symbol = "×"
-        
-        # 演算子の種類表示は不要（ナンバープレート自体に表示するため）
-        
-        # ナンバープレートの上に計算式を表示
-        equation_font = get_font(LARGE_FONT_SIZE)
-        current_plate = self.number_plates[self.current_question]
-        equation_text = current_plate.get_question()
-        equation_text = equation_font.render(equation_text, True, WHITE)
-        equation_rect = equation_text.get_rect(center=(SCREEN_WIDTH // 2, plate_y - 40))
-        screen.blit(equation_text, equation_rect)
-        
-        # ナンバープレートの背景に光彩効果
-        # プレートの高さは number_plate.py で計算されるので、ここでは計算しない
-        plate_height = int(plate_width * 0.5)  # 縦横比を1:2に調整
-        glow_surface = pygame.Surface((plate_width + 6, plate_height + 6), pygame.SRCALPHA)
-        pygame.draw.rect(glow_surface, (*ACCENT_COLOR[:3], 60), 
-                        (0, 0, plate_width + 6, plate_height + 6), border_radius=12)
-        screen.blit(glow_surface, (plate_x - 3, plate_y - 3))
-        
-        current_plate.render(screen, plate_x, plate_y, plate_width, plate_height)
-        
-        # 入力エリア
-        input_font = get_font(LARGE_FONT_SIZE)
-        input_text = input_font.render(self.current_input or "_", True, MAIN_COLOR_PINK)
-        input_rect = input_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT * 2 // 3 + 50))  # さらに下に移動
-        
-        # 入力エリアの背景
-        input_bg_rect = pygame.Rect(0, 0, max(input_rect.width + 40, 80), input_rect.height + 20)
-        input_bg_rect.center = input_rect.center
-        pygame.draw.rect(screen, BUTTON_INACTIVE, input_bg_rect, border_radius=10)
-        pygame.draw.rect(screen, BUTTON_BORDER, input_bg_rect, width=2, border_radius=10)
-        
-        screen.blit(input_text, input_rect)
-        
-        # 入力ラベル表示（入力エリアの上に配置、被らないように）
-        input_label_font = get_font(SMALL_FONT_SIZE)
-        input_label_text = input_label_font.render("Input", True, MAIN_COLOR_PINK)
-        input_label_rect = input_label_text.get_rect(center=(SCREEN_WIDTH // 2, input_bg_rect.top - 25))  # 入力エリアからさらに離す
-        screen.blit(input_label_text, input_label_rect)
-        
-        # フィードバック表示
-        if self.feedback is not None:
-            # 半透明のオーバーレイを表示
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 100))  # 黒色の半透明オーバーレイ
-            screen.blit(overlay, (0, 0))
-            
-            # 画面の60%サイズの大きなマルバツ
-            feedback_size = int(min(SCREEN_WIDTH, SCREEN_HEIGHT) * 0.6)
-            
-            # ピクセル風フォントを使用
-            feedback_font = get_font(feedback_size // 3)  # ピクセルフォントは大きく見えるので調整
-            
-            if self.feedback:
-                # 正解の場合は緑色の○
-                feedback_text = feedback_font.render("O", True, (0, 255, 0))
-            else:
-                # 不正解の場合は赤色の×
-                feedback_text = feedback_font.render("X", True, (255, 0, 0))
-            
-            # マルバツを画面中央に表示
-            feedback_rect = feedback_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
-            screen.blit(feedback_text, feedback_rect)
+        draw_line(screen, ACCENT_COLOR, *layout.top_line, 2)
+        
+        # タイマーと問題数（タイムアタックは残り時間と正解数）、計算式・プレート・入力・フィードバック
+        run_type = self.game.run_type
+        if run_type == RunType.TIME_ATTACK:
+            remaining = max(0.0, TIME_ATTACK_SECONDS - self.current_time)
+            status = (f"Time: {remaining:.1f}", f"Score: {self.current_question}")
+        elif run_type == RunType.ENDLESS:
+            status = (f"Time: {self.current_time:.1f}", f"Q: {self.current_question + 1}")
+        else:
+            status = (f"Time: {self.current_time:.1f}", f"Q: {self.current_question + 1}/{TOTAL_QUESTIONS}")
+        self.session.render(screen, layout, *status)
         
         # 下部の装飾ライン
-        pygame.draw.line(screen, ACCENT_COLOR, 
-                        (SCREEN_WIDTH * 0.1, SCREEN_HEIGHT - 60),
-                        (SCREEN_WIDTH * 0.9, SCREEN_HEIGHT - 60), 2)
+        draw_line(screen, ACCENT_COLOR, *layout.bottom_line, 2)
         
         # 操作ヘルプ（スタート画面と同じスタイル）
         help_font = get_font(SMALL_FONT_SIZE - 4)
-        help_text = help_font.render("Number Keys: Input  Backspace: Delete  Enter: Confirm  Esc: Pause", True, FOOTER_GRAY)
-        help_rect = help_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 30))
+        help_text = render_text(help_font, "Number Keys: Input  Backspace: Delete  Enter: Confirm  Esc: Pause", FOOTER_GRAY)
+        help_rect = help_text.get_rect(center=layout.help_center)
         screen.blit(help_text, help_rect)
         
         # モーダル表示
         if self.show_modal:
-            self._render_modal(screen)
+            self._render_modal(screen, layout)
     
-    def _render_modal(self, screen):
-        """モーダルを描画する"""
+    def _render_modal(self, screen, layout):
+        """
+        モーダルを描画する
+        
+        Args:
+            screen: 描画対象のサーフェス
+            layout: 描画先のサイズに対応したレイアウト
+        """
+        render_text = self.game.text_cache.render  # 毎フレーム同じ文字列は描画済みのものを使い回す
+        
         # 半透明の背景オーバーレイ
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))  # 黒色の半透明オーバーレイ
+        overlay = self.game.surface_pool.get_overlay(layout.size, (0, 0, 0, 180))  # 黒色の半透明オーバーレイ
         screen.blit(overlay, (0, 0))
         
-        # モーダルウィンドウ
-        modal_width = 650  # さらに幅を広げる
-        modal_height = 300  # 高さはそのまま
-        modal_x = (SCREEN_WIDTH - modal_width) // 2
-        modal_y = (SCREEN_HEIGHT - modal_height) // 2
-        
         # モーダルの背景
-        modal_rect = pygame.Rect(modal_x, modal_y, modal_width, modal_height)
-        pygame.draw.rect(screen, BACKGROUND_COLOR, modal_rect, border_radius=15)
-        pygame.draw.rect(screen, ACCENT_COLOR, modal_rect, width=2, border_radius=15)
+        modal_rect = layout.modal_rect
+        draw_rect(screen, BACKGROUND_COLOR, modal_rect, border_radius=15)
+        draw_rect(screen, ACCENT_COLOR, modal_rect, width=2, border_radius=15)
         
         # モーダルのタイトル
         title_font = get_font(LARGE_FONT_SIZE)
-        title_text = title_font.render("Game Paused", True, MAIN_COLOR_PINK)
-        title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, modal_y + 50))
+        title_text = render_text(title_font, "Game Paused", MAIN_COLOR_PINK)
+        title_rect = title_text.get_rect(center=layout.modal_title_center)
         screen.blit(title_text, title_rect)
         
         # モーダルのメッセージ
         message_font = get_font(MEDIUM_FONT_SIZE)
-        message_text = message_font.render("Quit the game?", True, WHITE)
-        message_rect = message_text.get_rect(center=(SCREEN_WIDTH // 2, modal_y + 100))
+        message = "Finish the run?" if self.game.run_type == RunType.ENDLESS else "Quit the game?"
+        message_text = render_text(message_font, message, WHITE)
+        message_rect = message_text.get_rect(center=layout.modal_message_center)
         screen.blit(message_text, message_rect)
         
         # ボタンの描画
@@ -486,7 +361,7 @@ class GameScreen:
                 bg_color = (50, 50, 50)  # 選択中は少し明るい色
             
             # ボタンの背景
-            pygame.draw.rect(screen, bg_color, button["rect"], border_radius=10)
+            draw_rect(screen, bg_color, button["rect"], border_radius=10)
             
             # ボタンの枠線（選択中は強調）
             border_color = BUTTON_BORDER
@@ -494,16 +369,16 @@ class GameScreen:
             if is_selected:
                 border_color = ACCENT_COLOR
                 border_width = 3
-            pygame.draw.rect(screen, border_color, button["rect"], width=border_width, border_radius=10)
+            draw_rect(screen, border_color, button["rect"], width=border_width, border_radius=10)
             
             # ボタンのテキスト（フォントサイズを少し小さく）
             button_font = get_font(MEDIUM_FONT_SIZE - 2)  # フォントサイズを少し小さく
-            button_text = button_font.render(button["text"], True, WHITE if not is_selected else ACCENT_COLOR)
+            button_text = render_text(button_font, button["text"], WHITE if not is_selected else ACCENT_COLOR)
             button_text_rect = button_text.get_rect(center=button["rect"].center)
             screen.blit(button_text, button_text_rect)
         
         # 操作ヘルプ（モーダル下部に配置）
         help_font = get_font(SMALL_FONT_SIZE - 4)
-        help_text = help_font.render("← → : Select   Enter: Confirm   Esc: Close", True, FOOTER_GRAY)
-        help_rect = help_text.get_rect(center=(SCREEN_WIDTH // 2, modal_y + modal_height - 30))
+        help_text = render_text(help_font, "← → : Select   Enter: Confirm   Esc: Close", FOOTER_GRAY)
+        help_rect = help_text.get_rect(center=layout.modal_help_center)
         screen.blit(help_text, help_rect)
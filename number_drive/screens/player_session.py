@@ -0,0 +1,327 @@
+"""
+1人分の回答の状態（出題・入力・フィードバック）と描画を定義するモジュール
+
+通常のゲーム画面は1つ、対戦画面は2つの PlayerSession を持ち、
+どちらも同じ render でレイアウトに従って描画する（対戦では画面の左右半分のサブサーフェスに描く）。
+"""
+import pygame
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from number_drive import audio
+from number_drive.config import (
+    MEDIUM_FONT_SIZE, SMALL_FONT_SIZE, LARGE_FONT_SIZE, WHITE, ACCENT_COLOR, MAIN_COLOR_PINK,
+    BUTTON_INACTIVE, BUTTON_BORDER, FEEDBACK_DURATION, TYPE_AHEAD_LIMIT, get_font
+)
+from number_drive.glyph_atlas import get_glyph_atlas
+from number_drive.layout import GameLayout
+from number_drive.question_stream import QuestionQueue
+from number_drive.render_backend import draw_rect
+
+# キー割り当ての操作（数字と "-" 以外）
+DELETE = "delete"
+SUBMIT = "submit"
+
+# 対戦で左のプレイヤーが使うキー（メインキーボードの数字の列）
+TOP_ROW_KEYS: Dict[int, str] = {
+    **{getattr(pygame, f"K_{digit}"): str(digit) for digit in range(10)},
+    pygame.K_MINUS: "-",
+    pygame.K_BACKSPACE: DELETE,
+    pygame.K_RETURN: SUBMIT,
+    pygame.K_SPACE: SUBMIT,
+}
+
+# 対戦で右のプレイヤーが使うキー（テンキー）
+KEYPAD_KEYS: Dict[int, str] = {
+    **{getattr(pygame, f"K_KP{digit}"): str(digit) for digit in range(10)},
+    pygame.K_KP_MINUS: "-",
+    pygame.K_KP_PERIOD: DELETE,
+    pygame.K_KP_ENTER: SUBMIT,
+}
+
+
+class PlayerSession:
+    """
+    1人分の出題キュー・入力中の答え・正誤のフィードバック
+
+    マルバツの表示中に打ったキーは先行入力として TYPE_AHEAD_LIMIT 個まで溜めておき、
+    表示が消えた時点で打った順に適用する（Game.type_ahead が有効な場合）。
+    不正解だった入力はバツの表示が消えたときに消すので、表示中に打ち直した答えは空の入力欄から始まる。
+    Game.auto_submit が有効なら、答えと同じ文字数を入力した時点で回答を確定する。
+    """
+
+    def __init__(self, game, key_map: Optional[Dict[int, str]] = None, player: int = 0,
+                 pan: Optional[float] = None):
+        """
+        セッションの初期化
+
+        Args:
+            game: ゲームのインスタンス
+            key_map: キーと操作の対応（Noneならキーが表す文字で入力する）
+            player: プレイヤーの番号（プレイの記録に使う）
+            pan: 効果音の左右の位置（-1: 左, 1: 右、Noneなら中央）
+        """
+        self.game = game
+        self.key_map = key_map
+        self.player = player
+        self.pan = pan
+        self.questions: Optional[QuestionQueue] = None
+        self.current_input = ""
+        self.feedback = None  # None: なし, True: 正解, False: 不正解
+        self.feedback_time = None
+        self.question_start = 0.0  # 現在の問題に答えられるようになった時刻
+        self.wrong_attempts = 0  # 現在の問題の誤答数
+        self.pending: Deque[Tuple[str, Optional[int]]] = deque()  # 先行入力の (操作, 遅延計測の番号)
+
+        # 毎フレーム変わる数字（問題数・入力）用のグリフアトラス（同じ設定なら画面間で共有される）
+        self.status_atlas = get_glyph_atlas(MEDIUM_FONT_SIZE, WHITE, preload=not game.low_memory)
+        self.input_atlas = get_glyph_atlas(LARGE_FONT_SIZE, MAIN_COLOR_PINK, preload=not game.low_memory)
+
+    def reset(self, questions: QuestionQueue):
+        """
+        新しい出題キューで最初からやり直す
+
+        Args:
+            questions: 出題キュー
+        """
+        self.questions = questions
+        self.current_input = ""
+        self.feedback = None
+        self.feedback_time = None
+        self.question_start = self.game.logic_time
+        self.wrong_attempts = 0
+        self.clear_pending()
+
+    @property
+    def answered(self) -> int:
+        """正解した問題数"""
+        return self.questions.answered if self.questions else 0
+
+    @property
+    def finished(self) -> bool:
+        """すべての問題に答えたかどうか"""
+        return self.questions is not None and self.questions.finished
+
+    def key_action(self, event) -> Optional[str]:
+        """
+        キー入力をこのプレイヤーの操作に変換する
+
+        Args:
+            event: KEYDOWN イベント
+
+        Returns:
+            入力する文字（数字か "-"）、DELETE、SUBMIT のいずれか（このプレイヤーのキーでなければNone）
+        """
+        if self.key_map is not None:
+            return self.key_map.get(event.key)
+        if event.key == pygame.K_BACKSPACE:
+            return DELETE
+        if event.key == pygame.K_RETURN:
+            return SUBMIT
+        if event.unicode.isdigit() or event.unicode == "-":
+            return event.unicode
+        return None
+
+    def handle_key(self, event) -> Optional[bool]:
+        """
+        キー入力を処理する
+
+        Args:
+            event: KEYDOWN イベント
+
+        Returns:
+            回答を確定した場合は最後の問題まで答え終えたかどうか、それ以外はNone
+        """
+        action = self.key_action(event)
+        if action is None:
+            # このプレイヤーのキーではない
+            return None
+
+        if self.feedback is not None:
+            # フィードバック表示中は先行入力として溜めておく（無効なら捨てる）
+            if self.game.type_ahead and len(self.pending) < TYPE_AHEAD_LIMIT:
+                # 画面に反映されるのは適用したときなので、遅延の計測もそれまで保留する
+                tracker = self.game.latency_tracker
+                self.pending.append((action, tracker.defer_key() if tracker else None))
+                self.game.audio.play(audio.KEY, self.pan, from_key=True)
+            return None
+        return self._apply(action)
+
+    def _apply(self, action: str, sound: bool = True) -> Optional[bool]:
+        """
+        操作を入力に適用する
+
+        Args:
+            action: 入力する文字（数字か "-"）、DELETE、SUBMIT のいずれか
+            sound: キーの音を鳴らすかどうか（先行入力は打ったときに鳴らしている）
+
+        Returns:
+            回答を確定した場合は最後の問題まで答え終えたかどうか、それ以外はNone
+        """
+        if action == DELETE:
+            # 1文字削除
+            self.current_input = self.current_input[:-1]
+        elif action == SUBMIT:
+            # 回答を確定
+            return self.check_answer()
+        elif action != "-" or not self.current_input:
+            # 数字または先頭のマイナス記号を入力
+            self.current_input += action
+            if (self.game.auto_submit and self.current_input.lstrip("-")
+                    and len(self.current_input) == len(str(self.questions.current.get_answer()))):
+                # 数字を含めて答えと同じ文字数になったら確定する（Enterキーを押さなくてよい）
+                return self.check_answer()
+        else:
+            return None
+        if sound:
+            self.game.audio.play(audio.KEY, self.pan, from_key=True)
+        return None
+
+    def check_answer(self) -> bool:
+        """
+        回答をチェックする
+
+        Returns:
+            正解して最後の問題まで答え終えた場合はTrue
+        """
+        if not self.current_input:
+            return False
+
+        now = self.feedback_time = self.game.logic_time
+        plate = self.questions.current
+        if plate.is_correct(self.current_input):
+            # 正解なら記録して次の問題へ進む
+            if self.game.run_log is not None:
+                self.game.run_log.record_answer(self.player, plate, now - self.question_start, self.wrong_attempts)
+            self.feedback = True
+            self.game.audio.play(audio.CORRECT, self.pan, from_key=True)
+            self.current_input = ""
+            # 次の問題はフィードバックが消えてから答えられる
+            self.question_start = now + FEEDBACK_DURATION
+            self.wrong_attempts = 0
+            return not self.questions.advance()
+
+        # 不正解（入力が数値でない場合も含む）
+        self.feedback = False
+        self.game.audio.play(audio.WRONG, self.pan, from_key=True)
+        self.wrong_attempts += 1
+        return False
+
+    def update(self, now: float) -> bool:
+        """
+        フィードバック表示を更新し、表示が消えたら先行入力を適用する
+
+        Args:
+            now: ロジック時計の現在時刻
+
+        Returns:
+            先行入力で最後の問題まで答え終えた場合はTrue
+        """
+        if self.feedback is not None and self.feedback_time is not None:
+            if now - self.feedback_time > FEEDBACK_DURATION:  # 0.5秒間表示
+                if self.feedback is False:
+                    # 不正解の入力は先行入力を適用する前に消す（打ち直した答えが後ろに付かないように）
+                    self.current_input = ""
+                self.feedback = None
+                self.feedback_time = None
+                # 回答を確定してまたフィードバックになったら、残りは次の表示が消えるまで待つ
+                tracker = self.game.latency_tracker
+                while self.pending and self.feedback is None:
+                    action, token = self.pending.popleft()
+                    finished = self._apply(action, sound=False)
+                    if tracker:
+                        tracker.key_applied(token)
+                    if finished:
+                        return True
+        return False
+
+    def shift_times(self, seconds: float):
+        """
+        フィードバックと回答時間の基準の時刻をずらす（一時停止していた時間を除くため）
+
+        Args:
+            seconds: ずらす秒数
+        """
+        if self.feedback_time is not None:
+            self.feedback_time += seconds
+        self.question_start += seconds
+
+    def clear_pending(self):
+        """先行入力を適用せずに捨てる"""
+        tracker = self.game.latency_tracker
+        if tracker:
+            for _, token in self.pending:
+                tracker.discard_key(token)
+        self.pending.clear()
+
+    def render(self, surface, layout: GameLayout, status_left: str, status_right: str):
+        """
+        問題数・計算式・プレート・入力・フィードバックを描画する
+
+        Args:
+            surface: 描画先（画面全体またはプレイヤーごとのサブサーフェス）
+            layout: 描画先のサイズに対応したレイアウト
+            status_left: 左上に表示する文字列
+            status_right: 右上に表示する文字列
+        """
+        render_text = self.game.text_cache.render  # 毎フレーム同じ文字列は描画済みのものを使い回す
+
+        # 現在と次の問題のプレートを事前描画する（1フレームで描くのは高々2枚）
+        self.questions.prepare(layout.plate[2:])
+
+        # タイマーと問題数の表示
+        self.status_atlas.blit(surface, status_left, topleft=layout.timer_topleft)
+        self.status_atlas.blit(surface, status_right, topright=layout.question_topright)
+
+        # ナンバープレートの上に計算式を表示
+        current_plate = self.questions.current
+        equation_font = get_font(LARGE_FONT_SIZE)
+        equation_text = render_text(equation_font, current_plate.get_question(), WHITE)
+        equation_rect = equation_text.get_rect(center=layout.equation_center)
+        surface.blit(equation_text, equation_rect)
+
+        # ナンバープレートの背景に光彩効果
+        glow_surface = self.game.surface_pool.get_rounded_rect(
+            layout.plate_glow_size, (*ACCENT_COLOR[:3], 60), border_radius=12)
+        surface.blit(glow_surface, layout.plate_glow_topleft)
+
+        # 事前描画したプレートを転送する
+        surface.blit(self.questions.current_surface(), layout.plate[:2])
+
+        # 入力エリア
+        input_string = self.current_input or "_"
+        input_rect = self.input_atlas.get_rect(input_string, center=layout.input_center)
+
+        # 入力エリアの背景
+        input_bg_rect = pygame.Rect(0, 0, max(input_rect.width + 40, 80), input_rect.height + 20)
+        input_bg_rect.center = input_rect.center
+        draw_rect(surface, BUTTON_INACTIVE, input_bg_rect, border_radius=10)
+        draw_rect(surface, BUTTON_BORDER, input_bg_rect, width=2, border_radius=10)
+
+        self.input_atlas.blit(surface, input_string, topleft=input_rect.topleft)
+
+        # 入力ラベル表示（入力エリアの上に配置、被らないように）
+        input_label_font = get_font(SMALL_FONT_SIZE)
+        input_label_text = render_text(input_label_font, "Input", MAIN_COLOR_PINK)
+        input_label_rect = input_label_text.get_rect(center=(layout.center_x, input_bg_rect.top - layout.input_label_gap))
+        surface.blit(input_label_text, input_label_rect)
+
+        # フィードバック表示
+        if self.feedback is not None:
+            # 半透明のオーバーレイを表示
+            overlay = self.game.surface_pool.get_overlay(layout.size, (0, 0, 0, 100))  # 黒色の半透明オーバーレイ
+            surface.blit(overlay, (0, 0))
+
+            # ピクセル風フォントを使用
+            feedback_font = get_font(layout.feedback_size // 3)  # ピクセルフォントは大きく見えるので調整
+
+            if self.feedback:
+                # 正解の場合は緑色の○
+                feedback_text = render_text(feedback_font, "O", (0, 255, 0))
+            else:
+                # 不正解の場合は赤色の×
+                feedback_text = render_text(feedback_font, "X", (255, 0, 0))
+
+            # マルバツを中央に表示
+            feedback_rect = feedback_text.get_rect(center=layout.feedback_center)
+            surface.blit(feedback_text, feedback_rect)
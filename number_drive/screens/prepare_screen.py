@@ -2,20 +2,25 @@
 ゲーム準備画面を定義するモジュール
 """
 import pygame
-import time
-import random
 from typing import Optional
 
+from number_drive import audio
 from number_drive.config import (
     SCREEN_WIDTH, SCREEN_HEIGHT, LARGE_FONT_SIZE, MEDIUM_FONT_SIZE, SMALL_FONT_SIZE,
-    WHITE, ACCENT_COLOR, MAIN_COLOR_PINK, BUTTON_INACTIVE, BUTTON_BORDER, TEXT_GRAY, FOOTER_GRAY, DECORATION_COLOR, get_font
+    WHITE, ACCENT_COLOR, MAIN_COLOR_PINK, BUTTON_INACTIVE, BUTTON_BORDER, TEXT_GRAY, FOOTER_GRAY, DECORATION_COLOR, get_font,
+    TIME_ATTACK_SECONDS
 )
-from number_drive.game_enums import GameState, GameMode
+from number_drive.game_enums import GameState, GameMode, RunType
+from number_drive.placement import OccupancyGrid, generate_decorations
+from number_drive.glyph_atlas import get_glyph_atlas
 
 
 class PrepareScreen:
     """ゲーム準備画面を表すクラス"""
     
+    # この画面が処理するイベントの種類
+    EVENT_TYPES = (pygame.KEYDOWN,)
+    
     def __init__(self, game):
         """
         ゲーム準備画面の初期化
@@ -28,39 +33,27 @@ class PrepareScreen:
         self.start_time = None
         self.waiting_for_start = True
         
+        # カウントダウン数字用のグリフアトラス
+        self.countdown_atlas = get_glyph_atlas(LARGE_FONT_SIZE * 2, ACCENT_COLOR, preload=not game.low_memory)
+        
         # 装飾用の数字と記号（ランダムに配置）
-        self.decorations = []
-        symbols = ["+", "-", "×", "="]
+        rng = game.create_rng("prepare")
         
         # 画面の安全領域を定義（重要な要素と重ならないエリア）
         mode_y = SCREEN_HEIGHT * 0.22  # モード名の位置
         prompt_y = SCREEN_HEIGHT * 0.45  # プロンプトの位置
         
-        safe_areas = [
-            # モード名周辺
-            pygame.Rect(SCREEN_WIDTH // 2 - 300, mode_y - 50, 600, 100),
-            # プロンプト周辺
-            pygame.Rect(SCREEN_WIDTH // 2 - 200, prompt_y - 50, 400, 200),
-            # フッター周辺
-            pygame.Rect(0, SCREEN_HEIGHT - 60, SCREEN_WIDTH, 60)
-        ]
+        grid = OccupancyGrid(SCREEN_WIDTH, SCREEN_HEIGHT)
+        # モード名周辺
+        grid.block_rect(pygame.Rect(SCREEN_WIDTH // 2 - 300, mode_y - 50, 600, 100))
+        # プロンプト周辺
+        grid.block_rect(pygame.Rect(SCREEN_WIDTH // 2 - 200, prompt_y - 50, 400, 200))
+        # フッター周辺
+        grid.block_rect(pygame.Rect(0, SCREEN_HEIGHT - 60, SCREEN_WIDTH, 60))
         
         # 装飾を配置（安全領域を避ける）
-        for _ in range(15):
-            attempts = 0
-            while attempts < 10:  # 最大10回試行
-                x = random.randint(50, SCREEN_WIDTH - 50)
-                y = random.randint(50, SCREEN_HEIGHT - 50)
-                
-                # 安全領域との衝突チェック
-                if not any(area.collidepoint(x, y) for area in safe_areas):
-                    symbol = random.choice(symbols) if random.random() > 0.7 else str(random.randint(0, 9))
-                    size = random.randint(12, 24)  # サイズ範囲を調整
-                    alpha = random.randint(5, 15)  # 透明度をさらに高く（色をかなり薄く）
-                    self.decorations.append((symbol, x, y, size, alpha))
-                    break
-                
-                attempts += 1
+        self.decorations = generate_decorations(rng, grid, 15, size_range=(12, 24))
+        self.decoration_sprites = game.sprites.prerender_decorations(self.decorations, ACCENT_COLOR, "prepare")
     
     def reset(self):
         """画面の状態をリセットする"""
@@ -78,20 +71,28 @@ class PrepareScreen:
         if self.waiting_for_start and event.type == pygame.KEYDOWN:
             if event.key == pygame.K_SPACE or event.key == pygame.K_RETURN:
                 self.waiting_for_start = False
-                self.start_time = time.time()
+                self.start_time = self.game.logic_time
+                self.game.audio.play(audio.TICK, from_key=True)
             elif event.key == pygame.K_ESCAPE:
                 # Escキーでタイトル画面に戻る
                 self.game.change_state(GameState.TITLE)
     
     def update(self):
         """画面の状態を更新する"""
-        if not self.waiting_for_start and self.start_time:
-            elapsed = time.time() - self.start_time
-            self.countdown = 3 - int(elapsed)
+        if not self.waiting_for_start and self.start_time is not None:
+            elapsed = self.game.logic_time - self.start_time
+            countdown = 3 - int(elapsed)
+            if countdown != self.countdown:
+                # 数字が変わったら音を鳴らす（最後はスタートの音）
+                self.game.audio.play(audio.TICK if countdown > 0 else audio.GO)
+            self.countdown = countdown
             
             if self.countdown <= 0:
-                # カウントダウン終了、ゲーム画面へ
-                self.game.change_state(GameState.PLAYING)
+                # カウントダウン終了、ゲーム画面（対戦は対戦画面）へ
+                if self.game.run_type == RunType.VERSUS:
+                    self.game.change_state(GameState.VERSUS)
+                else:
+                    self.game.change_state(GameState.PLAYING)
     
     def render(self, screen):
         """
@@ -100,42 +101,56 @@ class PrepareScreen:
         Args:
             screen: 描画対象のサーフェス
         """
-        # 装飾的な数字と記号を描画（背景）
-        for symbol, x, y, size, alpha in self.decorations:
-            symbol_font = get_font(size)
-            symbol_surface = symbol_font.render(symbol, True, (*ACCENT_COLOR[:3], alpha))
-            screen.blit(symbol_surface, (x, y))
+        render_text = self.game.text_cache.render  # 毎フレーム同じ文字列は描画済みのものを使い回す
+        
+        # 装飾的な数字と記号を描画（背景、省メモリモードでは事前描画したものを使う）
+        if self.decoration_sprites is not None:
+            screen.blits(self.decoration_sprites, doreturn=False)
+        else:
+            for symbol, x, y, size, alpha in self.decorations:
+                symbol_font = get_font(size)
+                symbol_surface = render_text(symbol_font, symbol, (*ACCENT_COLOR[:3], alpha))
+                screen.blit(symbol_surface, (x, y))
         
         # 選択した難易度の表示
-        mode_names = ["Easy Mode", "Normal Mode", "Hard Mode"]
+        mode_names = ["Easy Mode", "Normal Mode", "Hard Mode", "Expert Mode"]
         mode_index = list(GameMode).index(self.game.game_mode)
         
         mode_font = get_font(LARGE_FONT_SIZE)
-        mode_text = mode_font.render(mode_names[mode_index], True, MAIN_COLOR_PINK)
+        mode_text = render_text(mode_font, mode_names[mode_index], MAIN_COLOR_PINK)
         mode_rect = mode_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT * 0.22))
         screen.blit(mode_text, mode_rect)
         
+        # エンドレス・タイムアタック・対戦の場合はプレイの種類も表示
+        run_type_names = {
+            RunType.ENDLESS: "Endless",
+            RunType.TIME_ATTACK: f"Time Attack {TIME_ATTACK_SECONDS}s",
+            RunType.VERSUS: "Versus  P1: 0-9 / P2: Keypad"
+        }
+        if self.game.run_type in run_type_names:
+            run_type_font = get_font(SMALL_FONT_SIZE)
+            run_type_text = render_text(run_type_font, run_type_names[self.game.run_type], ACCENT_COLOR)
+            run_type_rect = run_type_text.get_rect(center=(SCREEN_WIDTH // 2, mode_rect.bottom + 20))
+            screen.blit(run_type_text, run_type_rect)
+        
         if self.waiting_for_start:
             # スタート待ち
             prompt_font = get_font(MEDIUM_FONT_SIZE)
-            prompt_text = prompt_font.render("Press Space to Start", True, ACCENT_COLOR)
+            prompt_text = render_text(prompt_font, "Press Space to Start", ACCENT_COLOR)
             prompt_rect = prompt_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT * 0.45))
             
             # 点滅効果
-            if int(time.time() * 2) % 2 == 0:
+            if int(self.game.logic_time * 2) % 2 == 0:
                 screen.blit(prompt_text, prompt_rect)
         else:
             # カウントダウン（丸枠なし）
-            count_font = get_font(LARGE_FONT_SIZE * 2)
-            count_text = count_font.render(str(max(1, self.countdown)), True, ACCENT_COLOR)
-            count_rect = count_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT * 0.45))
-            
             # カウントダウン数字を描画（丸枠なし）
-            screen.blit(count_text, count_rect)
+            self.countdown_atlas.blit(screen, str(max(1, self.countdown)),
+                                      center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT * 0.45))
         
         # 操作方法（画面下部中央に配置）
         if self.waiting_for_start:
             help_font = get_font(SMALL_FONT_SIZE - 4)
-            help_text = help_font.render("Space/Enter: Start   Esc: Back to Title", True, FOOTER_GRAY)
+            help_text = render_text(help_font, "Space/Enter: Start   Esc: Back to Title", FOOTER_GRAY)
             help_rect = help_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 30))
             screen.blit(help_text, help_rect)
@@ -3,7 +3,6 @@
 """
 import pygame
 import time
-import random
 import os
 from typing import List, Tuple
 
@@ -12,12 +11,19 @@ from number_drive.config import (
     WHITE, ACCENT_COLOR, MAIN_COLOR_PINK, POINT_COLOR, BUTTON_INACTIVE, BUTTON_BORDER, 
     FOOTER_GRAY, IMAGES_DIR, DECORATION_COLOR, get_font
 )
-from number_drive.game_enums import GameState, GameMode
+from number_drive.game_enums import GameState, GameMode, RunType
+from number_drive.placement import OccupancyGrid, generate_decorations
+from number_drive.glyph_atlas import get_glyph_atlas
+from number_drive.car_animation import wobble_pose
+from number_drive.render_backend import draw_line, draw_rect
 
 
 class ResultScreen:
     """結果画面を表すクラス"""
     
+    # この画面が処理するイベントの種類
+    EVENT_TYPES = (pygame.KEYDOWN, pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN)
+    
     def __init__(self, game):
         """
         結果画面の初期化
@@ -27,34 +33,36 @@ class ResultScreen:
         """
         self.game = game
         
+        # クリアタイム用のグリフアトラス
+        self.time_atlas = get_glyph_atlas(LARGE_FONT_SIZE, WHITE, preload=not game.low_memory)
+        
         # 装飾用の車の画像を読み込む（2台）
         self.cars = []
-        try:
-            car_paths = [
-                os.path.join(IMAGES_DIR, "cars", "add_car.png"),
-                os.path.join(IMAGES_DIR, "cars", "subtruct_car.png")
-            ]
-            
-            for car_path in car_paths:
-                car_img = pygame.image.load(car_path)
-                # 車の画像サイズを調整（画面幅の15%程度）
-                car_width = int(SCREEN_WIDTH * 0.15)
-                car_height = car_width * car_img.get_height() / car_img.get_width()
-                self.cars.append(pygame.transform.scale(car_img, (car_width, car_height)))
-        except Exception as e:
-            print(f"Warning: Could not load car image: {e}")
+        car_paths = [
+            os.path.join(IMAGES_DIR, "cars", "add_car.png"),
+            os.path.join(IMAGES_DIR, "cars", "subtruct_car.png")
+        ]
+        
+        for car_path in car_paths:
+            # 車の画像サイズを調整（画面幅の15%程度、省メモリモードではタイトル画面と共有）
+            car_img = game.sprites.load_scaled(car_path, int(SCREEN_WIDTH * 0.15), "result")
+            if car_img is not None:
+                self.cars.append(car_img)
         
         # 車の位置、回転、反転をランダムに設定
         self.car_positions = [
             (SCREEN_WIDTH * 0.2, SCREEN_HEIGHT * 0.7),  # 左下
             (SCREEN_WIDTH * 0.8, SCREEN_HEIGHT * 0.7)   # 右下
         ]
-        self.car_rotations = [random.randint(-20, 20) for _ in range(2)]
-        self.car_flips = [random.choice([True, False]) for _ in range(2)]
-        
-        # 装飾用の数字と記号
-        self.decorations = []
-        symbols = ["+", "-", "×", "="]
+        rng = game.create_rng("result")
+        self.car_rotations = [rng.randint(-20, 20) for _ in range(2)]
+        self.car_flips = [rng.choice([True, False]) for _ in range(2)]
+        
+        # 揺れる車の回転した絵を用意しておく
+        self.car_frames = [
+            game.sprites.rotation_frames(car_img, f"car{i}", self.car_rotations[i], self.car_flips[i], "result")
+            for i, car_img in enumerate(self.cars[:len(self.car_positions)])
+        ]
         
         # 要素間の間隔を設定
         self.element_spacing = SCREEN_HEIGHT * 0.03
@@ -111,21 +119,11 @@ class ResultScreen:
                 ))
         
         # 装飾を配置（安全領域を避ける）
-        for _ in range(12):
-            attempts = 0
-            while attempts < 10:  # 最大10回試行
-                x = random.randint(50, SCREEN_WIDTH - 50)
-                y = random.randint(50, SCREEN_HEIGHT - 50)
-                
-                # 安全領域との衝突チェック
-                if not any(area.collidepoint(x, y) for area in safe_areas):
-                    symbol = random.choice(symbols) if random.random() > 0.7 else str(random.randint(0, 9))
-                    size = random.randint(12, 24)
-                    alpha = random.randint(5, 15)  # 透明度をさらに高く（色をかなり薄く）
-                    self.decorations.append((symbol, x, y, size, alpha))
-                    break
-                
-                attempts += 1
+        grid = OccupancyGrid(SCREEN_WIDTH, SCREEN_HEIGHT)
+        for area in safe_areas:
+            grid.block_rect(area)
+        self.decorations = generate_decorations(rng, grid, 12, size_range=(12, 24))
+        self.decoration_sprites = game.sprites.prerender_decorations(self.decorations, DECORATION_COLOR, "result")
     
     def handle_event(self, event):
         """
@@ -176,45 +174,43 @@ class ResultScreen:
         Args:
             screen: 描画対象のサーフェス
         """
-        # 装飾的な数字と記号を描画（背景）
-        for symbol, x, y, size, alpha in self.decorations:
-            symbol_font = get_font(size)
-            symbol_surface = symbol_font.render(symbol, True, DECORATION_COLOR)
-            screen.blit(symbol_surface, (x, y))
-        
-        # 車の画像を描画（背景として）
-        for i, car in enumerate(self.cars):
-            if car and i < len(self.car_positions):
-                # 車を反転させる（必要な場合）
-                if self.car_flips[i]:
-                    car = pygame.transform.flip(car, True, False)
-                
-                # 車を回転させる
-                rotated_car = pygame.transform.rotate(car, self.car_rotations[i])
-                
-                # 回転後の画像の中心位置を調整
-                car_rect = rotated_car.get_rect(center=self.car_positions[i])
-                
-                # 車を描画
-                screen.blit(rotated_car, car_rect)
+        render_text = self.game.text_cache.render  # 毎フレーム同じ文字列は描画済みのものを使い回す
+        
+        # 装飾的な数字と記号を描画（背景、省メモリモードでは事前描画したものを使う）
+        if self.decoration_sprites is not None:
+            screen.blits(self.decoration_sprites, doreturn=False)
+        else:
+            for symbol, x, y, size, alpha in self.decorations:
+                symbol_font = get_font(size)
+                symbol_surface = render_text(symbol_font, symbol, DECORATION_COLOR)
+                screen.blit(symbol_surface, (x, y))
+        
+        # 車の画像を描画（背景として、その場で揺れる）
+        for i, frames in enumerate(self.car_frames):
+            frames.blit(screen, *wobble_pose(self.car_positions[i], frames.base_angle, self.game.logic_time, i))
         
         # 上部の装飾ライン
-        pygame.draw.line(screen, ACCENT_COLOR, 
+        draw_line(screen, ACCENT_COLOR, 
                         (SCREEN_WIDTH * 0.1, 60),
                         (SCREEN_WIDTH * 0.9, 60), 2)
         
         # 結果タイトル
         title_font = get_font(LARGE_FONT_SIZE)
-        title_text = title_font.render("Game Clear!", True, MAIN_COLOR_PINK)
+        titles = {
+            RunType.STANDARD: "Game Clear!",
+            RunType.ENDLESS: "Run Finished!",
+            RunType.TIME_ATTACK: "Time Up!",
+            RunType.VERSUS: f"Player {self.game.versus_winner + 1} Wins!"
+        }
+        title_text = render_text(title_font, titles[self.game.run_type], MAIN_COLOR_PINK)
         title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT * 0.25))
         
         # タイトルの背景に光彩効果
         for j in range(3):
             offset = (j + 1) * 5
             alpha = 40 - j * 10
-            glow_surface = pygame.Surface((title_rect.width + offset*2, title_rect.height + offset*2), pygame.SRCALPHA)
-            pygame.draw.rect(glow_surface, (*MAIN_COLOR_PINK[:3], alpha), 
-                            (0, 0, title_rect.width + offset*2, title_rect.height + offset*2), border_radius=10)
+            glow_surface = self.game.surface_pool.get_rounded_rect(
+                (title_rect.width + offset*2, title_rect.height + offset*2), (*MAIN_COLOR_PINK[:3], alpha), border_radius=10)
             screen.blit(glow_surface, (title_rect.x - offset, title_rect.y - offset))
         
         screen.blit(title_text, title_rect)
@@ -223,18 +219,31 @@ class ResultScreen:
         mode_names = {
             GameMode.EASY: "Easy Mode",
             GameMode.NORMAL: "Normal Mode",
-            GameMode.HARD: "Hard Mode"
+            GameMode.HARD: "Hard Mode",
+            GameMode.EXPERT: "Expert Mode"
         }
         mode_font = get_font(MEDIUM_FONT_SIZE)
-        mode_text = mode_font.render(f"Cleared: {mode_names[self.game.game_mode]}", True, ACCENT_COLOR)
+        if self.game.run_type == RunType.STANDARD:
+            mode_label = f"Cleared: {mode_names[self.game.game_mode]}"
+        elif self.game.run_type == RunType.ENDLESS:
+            mode_label = f"Endless: {mode_names[self.game.game_mode]}"
+        elif self.game.run_type == RunType.VERSUS:
+            mode_label = f"Versus: {mode_names[self.game.game_mode]}"
+        else:
+            mode_label = f"Time Attack: {mode_names[self.game.game_mode]}"
+        mode_text = render_text(mode_font, mode_label, ACCENT_COLOR)
         mode_rect = mode_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT * 0.38))
         screen.blit(mode_text, mode_rect)
         
-        # クリアタイム
-        time_font = get_font(LARGE_FONT_SIZE)
-        time_text = time_font.render(f"Clear Time: {self.game.clear_time:.1f} sec", True, WHITE)
-        time_rect = time_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT * 0.48))
-        screen.blit(time_text, time_rect)
+        # クリアタイム（エンドレス・タイムアタックは正解数、対戦は2人の正解数）
+        if self.game.run_type == RunType.STANDARD:
+            result_label = f"Clear Time: {self.game.clear_time:.1f} sec"
+        elif self.game.run_type == RunType.VERSUS:
+            p1_score, p2_score = self.game.versus_scores
+            result_label = f"P1 {p1_score} - {p2_score} P2"
+        else:
+            result_label = f"Answered: {self.game.answered_count}"
+        self.time_atlas.blit(screen, result_label, center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT * 0.48))
         
         # ボタン描画
         button_font = get_font(MEDIUM_FONT_SIZE - 4)
@@ -247,11 +256,11 @@ class ResultScreen:
         else:
             border_color = BUTTON_BORDER
         
-        pygame.draw.rect(screen, retry_color, self.retry_button, border_radius=10)
-        pygame.draw.rect(screen, border_color, self.retry_button, width=2, border_radius=10)
+        draw_rect(screen, retry_color, self.retry_button, border_radius=10)
+        draw_rect(screen, border_color, self.retry_button, width=2, border_radius=10)
         
         # ボタンテキストに余白を追加（テキストを小さくする）
-        retry_text = button_font.render("Play Again", True, WHITE)
+        retry_text = render_text(button_font, "Play Again", WHITE)
         retry_text_rect = retry_text.get_rect(center=self.retry_button.center)
         screen.blit(retry_text, retry_text_rect)
         
@@ -263,21 +272,21 @@ class ResultScreen:
         else:
             border_color = BUTTON_BORDER
         
-        pygame.draw.rect(screen, change_color, self.change_mode_button, border_radius=10)
-        pygame.draw.rect(screen, border_color, self.change_mode_button, width=2, border_radius=10)
+        draw_rect(screen, change_color, self.change_mode_button, border_radius=10)
+        draw_rect(screen, border_color, self.change_mode_button, width=2, border_radius=10)
         
         # ボタンテキストに余白を追加（テキストを小さくする）
-        change_text = button_font.render("Change Difficulty", True, WHITE)
+        change_text = render_text(button_font, "Change Difficulty", WHITE)
         change_text_rect = change_text.get_rect(center=self.change_mode_button.center)
         screen.blit(change_text, change_text_rect)
         
         # 下部の装飾ライン
-        pygame.draw.line(screen, ACCENT_COLOR, 
+        draw_line(screen, ACCENT_COLOR, 
                         (SCREEN_WIDTH * 0.1, SCREEN_HEIGHT - 60),
                         (SCREEN_WIDTH * 0.9, SCREEN_HEIGHT - 60), 2)
         
         # 操作ヘルプ（上下キーに変更）
         help_font = get_font(SMALL_FONT_SIZE - 4)
-        help_text = help_font.render("↑↓: Select   Space/Enter: Confirm", True, FOOTER_GRAY)
+        help_text = render_text(help_font, "↑↓: Select   Space/Enter: Confirm", FOOTER_GRAY)
         help_rect = help_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 30))
         screen.blit(help_text, help_rect)
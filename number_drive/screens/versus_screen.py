@@ -0,0 +1,260 @@
+"""
+2人対戦の画面を定義するモジュール
+"""
+import pygame
+import random
+from typing import List, Optional, Tuple
+
+from number_drive.config import (
+    MEDIUM_FONT_SIZE, SMALL_FONT_SIZE, LARGE_FONT_SIZE, WHITE, ACCENT_COLOR, MAIN_COLOR_PINK,
+    BACKGROUND_COLOR, FOOTER_GRAY, TOTAL_QUESTIONS, SCREEN_WIDTH, SCREEN_HEIGHT, get_font
+)
+from number_drive.game_enums import GameState
+from number_drive.glyph_atlas import get_glyph_atlas
+from number_drive.layout import GameLayout
+from number_drive.number_plate import stream_questions
+from number_drive.placement import OccupancyGrid, generate_decorations
+from number_drive.question_stream import QuestionQueue
+from number_drive.render_backend import draw_line
+from number_drive.screens.player_session import KEYPAD_KEYS, TOP_ROW_KEYS, PlayerSession
+
+# プレイヤーごとの表示名と操作ヘルプ（左: メインキーボード、右: テンキー）
+PLAYER_NAMES = ("P1", "P2")
+PLAYER_HELP = ("0-9  BkSp  Enter", "KP 0-9  KP.  KP Enter")
+PLAYER_PAN = 0.6  # 効果音を左右に振る量
+
+
+class VersusScreen:
+    """
+    2人対戦の画面を表すクラス
+
+    画面を左右に分け、それぞれのサブサーフェスに PlayerSession を描画する。
+    2人には同じシードの問題列を出題し、先に TOTAL_QUESTIONS 問解いた方の勝ち。
+    フォント・文字列・グリフアトラス・プレートのキャッシュは2人で共有し、
+    装飾や区切り線などの変わらない部分は1枚の背景レイヤーに描いておく。
+    """
+
+    # この画面が処理するイベントの種類
+    EVENT_TYPES = (pygame.KEYDOWN,)
+
+    def __init__(self, game):
+        """
+        対戦画面の初期化
+
+        Args:
+            game: ゲームのインスタンス
+        """
+        self.game = game
+        self.start_time = None
+        self.current_time = 0.0
+        self.show_confirm = False  # 中断の確認を表示中かどうか
+        self.paused_at = 0.0  # 中断の確認を表示した時刻
+
+        # 左のプレイヤーはメインキーボード、右のプレイヤーはテンキーで入力する（効果音もそれぞれの側で鳴らす）
+        self.sessions = [PlayerSession(game, TOP_ROW_KEYS, player=0, pan=-PLAYER_PAN),
+                         PlayerSession(game, KEYPAD_KEYS, player=1, pan=PLAYER_PAN)]
+
+        # 出題用の乱数生成器（対戦ごとに状態を2人に複製する）
+        self.question_rng = game.create_rng("versus_questions")
+
+        # 2人の間に表示する経過時間用のグリフアトラス
+        self.timer_atlas = get_glyph_atlas(SMALL_FONT_SIZE, WHITE, preload=not game.low_memory)
+
+        # 背景レイヤー（描画先のサイズごとに一度だけ描く、省メモリモードでは毎フレーム描く）
+        self.background: Optional[pygame.Surface] = None
+        self._panels: Optional[Tuple[object, Tuple[int, int], List]] = None
+        game.memory.add_source("versus", self._background_surfaces)
+
+        # 装飾を配置（2人の問題・入力と中央の区切りを避ける）
+        rng = game.create_rng("versus")
+        half = SCREEN_WIDTH // 2
+        grid = OccupancyGrid(SCREEN_WIDTH, SCREEN_HEIGHT)
+        grid.block_rect(pygame.Rect(0, 0, SCREEN_WIDTH, 100))
+        for x in (0, half):
+            grid.block_rect(pygame.Rect(x + half * 0.05, 80, half * 0.9, SCREEN_HEIGHT * 0.85 - 80))
+        grid.block_rect(pygame.Rect(half - 30, 0, 60, SCREEN_HEIGHT))
+        grid.block_rect(pygame.Rect(0, SCREEN_HEIGHT - 80, SCREEN_WIDTH, 80))
+        self.decorations = generate_decorations(rng, grid, 6, size_range=(12, 20))
+
+    def reset(self):
+        """対戦を最初からやり直す（2人に同じ問題列を出題する）"""
+        self.start_time = self.game.logic_time
+        self.current_time = 0.0
+        self.show_confirm = False
+
+        # 同じ状態の乱数生成器を2つ作り、同じ問題列を別々に取り出す
+        state = self.question_rng.getstate()
+        for session in self.sessions:
+            rng = random.Random()
+            rng.setstate(state)
+            questions = stream_questions(self.game.game_mode, rng, self.game.plate_sampler)
+            # プレートの描画は共有のキャッシュで1回にまとめる
+            session.reset(QuestionQueue(questions, TOTAL_QUESTIONS, plate_cache=self.game.plate_cache))
+        # 次の対戦は別の問題列にする
+        self.question_rng.random()
+
+    def finish(self, winner: int):
+        """
+        対戦を終えてリザルト画面へ進む
+
+        Args:
+            winner: 先に全問解いたプレイヤーの番号（0 または 1）
+        """
+        self.game.set_clear_time(self.current_time)
+        self.game.answered_count = self.sessions[winner].answered
+        self.game.versus_winner = winner
+        self.game.versus_scores = tuple(session.answered for session in self.sessions)
+        self.game.change_state(GameState.RESULT)
+
+    def handle_event(self, event):
+        """
+        イベント処理
+
+        Args:
+            event: Pygameのイベント
+        """
+        if event.type != pygame.KEYDOWN:
+            return
+
+        if self.show_confirm:
+            # 確認中はEscで中断、Spaceで再開（他の入力は無視）
+            if event.key == pygame.K_ESCAPE:
+                self.game.change_state(GameState.TITLE)
+            elif event.key == pygame.K_SPACE:
+                self.resume()
+            return
+
+        if event.key == pygame.K_ESCAPE:
+            self.show_confirm = True
+            self.paused_at = self.game.logic_time
+            return
+
+        # キーの割り当てが重ならないので、どちらか1人だけが処理する
+        for i, session in enumerate(self.sessions):
+            if session.handle_key(event):
+                self.finish(i)
+                return
+
+    def resume(self):
+        """中断の確認を閉じて再開する（確認を表示していた間は経過時間に含めない）"""
+        paused = self.game.logic_time - self.paused_at
+        if self.start_time is not None:
+            self.start_time += paused
+        for session in self.sessions:
+            session.shift_times(paused)
+        self.show_confirm = False
+
+    def update(self):
+        """画面の状態を更新する（中断の確認を表示中はタイマーも先行入力も止める）"""
+        if self.show_confirm:
+            return
+        now = self.game.logic_time
+        if self.start_time is not None:
+            self.current_time = now - self.start_time
+        for i, session in enumerate(self.sessions):
+            # 先行入力で全問解いたらその時点で勝ち
+            if session.update(now):
+                self.finish(i)
+                return
+
+    def _background_surfaces(self):
+        """背景レイヤーを列挙する（メモリ集計用）"""
+        return [("background", self.background)] if self.background is not None else []
+
+    def _draw_background(self, target, size: Tuple[int, int]):
+        """
+        装飾・区切り線・操作ヘルプを描画する
+
+        Args:
+            target: 描画先
+            size: 描画先のサイズ
+        """
+        render_text = self.game.text_cache.render  # 毎フレーム同じ文字列は描画済みのものを使い回す
+
+        target.fill(BACKGROUND_COLOR)
+        for symbol, x, y, symbol_size, alpha in self.decorations:
+            symbol_surface = render_text(get_font(symbol_size), symbol, (*ACCENT_COLOR[:3], alpha))
+            target.blit(symbol_surface, (x, y))
+
+        # プレイヤーごとの上下の装飾ラインと操作ヘルプ
+        half = size[0] // 2
+        layout = self.game.layout_cache.get(GameLayout, (half, size[1]))
+        help_font = get_font(SMALL_FONT_SIZE - 4)
+        for i, help_label in enumerate(PLAYER_HELP):
+            x = i * half
+            for start, end in (layout.top_line, layout.bottom_line):
+                draw_line(target, ACCENT_COLOR, (start[0] + x, start[1]), (end[0] + x, end[1]), 2)
+            help_text = render_text(help_font, help_label, FOOTER_GRAY)
+            target.blit(help_text, help_text.get_rect(center=(layout.help_center[0] + x, layout.help_center[1])))
+
+        # 中央の区切り線と中断のヘルプ
+        draw_line(target, ACCENT_COLOR, (half, 80), (half, size[1] - 80), 2)
+        esc_text = render_text(help_font, "Esc", FOOTER_GRAY)
+        target.blit(esc_text, esc_text.get_rect(center=(half, layout.help_center[1])))
+
+    def _panels_for(self, screen) -> List:
+        """
+        2人分の描画先（画面の左右半分のサブサーフェス）を取得する
+
+        Args:
+            screen: 描画対象のサーフェス
+
+        Returns:
+            左右の描画先のリスト（描画先とサイズが変わらない間は使い回す）
+        """
+        size = screen.get_size()
+        if self._panels is None or self._panels[0] is not screen or self._panels[1] != size:
+            half = size[0] // 2
+            panels = [screen.subsurface((i * half, 0, half, size[1])) for i in range(len(self.sessions))]
+            self._panels = (screen, size, panels)
+        return self._panels[2]
+
+    def render(self, screen):
+        """
+        画面を描画する
+
+        Args:
+            screen: 描画対象のサーフェス
+        """
+        if any(session.questions is None or session.finished for session in self.sessions):
+            return
+
+        # 変わらない部分は背景レイヤーを1回転送するだけ
+        size = screen.get_size()
+        if self.game.low_memory:
+            self._draw_background(screen, size)
+        else:
+            if self.background is None or self.background.get_size() != size:
+                self.background = pygame.Surface(size)
+                self._draw_background(self.background, size)
+            screen.blit(self.background, (0, 0))
+
+        # 2人分を同じ描画処理で左右に描く（レイアウトは半分のサイズで一度だけ計算される）
+        for i, panel in enumerate(self._panels_for(screen)):
+            session = self.sessions[i]
+            layout = self.game.layout_cache.get(GameLayout, panel.get_size())
+            session.render(panel, layout, PLAYER_NAMES[i], f"{session.answered + 1}/{TOTAL_QUESTIONS}")
+
+        # 経過時間は2人の間に表示
+        self.timer_atlas.blit(screen, f"{self.current_time:.1f}", center=(size[0] // 2, 60))
+
+        if self.show_confirm:
+            self._render_confirm(screen, size)
+
+    def _render_confirm(self, screen, size: Tuple[int, int]):
+        """
+        中断の確認を描画する
+
+        Args:
+            screen: 描画対象のサーフェス
+            size: 描画先のサイズ
+        """
+        render_text = self.game.text_cache.render  # 毎フレーム同じ文字列は描画済みのものを使い回す
+
+        overlay = self.game.surface_pool.get_overlay(size, (0, 0, 0, 180))  # 黒色の半透明オーバーレイ
+        screen.blit(overlay, (0, 0))
+
+        title_text = render_text(get_font(LARGE_FONT_SIZE), "Quit the race?", MAIN_COLOR_PINK)
+        screen.blit(title_text, title_text.get_rect(center=(size[0] // 2, size[1] // 2 - 30)))
+        help_text = render_text(get_font(MEDIUM_FONT_SIZE), "Esc: Quit   Space: Resume", WHITE)
+        screen.blit(help_text, help_text.get_rect(center=(size[0] // 2, size[1] // 2 + 30)))
@@ -0,0 +1,245 @@
+"""
+画像の読み込み、回転した画像と装飾の事前描画を行うモジュール
+"""
+import pygame
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from number_drive.config import (
+    BACKGROUND_COLOR, CAR_FRAME_STEP, CAR_FRAME_STEP_LOW_MEMORY, CAR_WOBBLE_DEGREES, get_font
+)
+from number_drive.memory import MemoryAccounting
+from number_drive.render_backend import blit_rotated
+
+
+class SpriteCache:
+    """
+    拡大縮小済みの画像を読み込むクラス
+
+    省メモリモードでは、同じ画像・同じ幅の要求に対して画面をまたいで同じサーフェスを
+    返し、装飾も8ビットのサーフェスに事前描画する。通常モードでは画面ごとに別の
+    サーフェスを作る。どちらの場合も、画面が作られていれば表示用のピクセル形式に変換しておく。
+    """
+
+    def __init__(self, memory: MemoryAccounting, low_memory: bool = False):
+        """
+        画像キャッシュの初期化
+
+        Args:
+            memory: サーフェスの集計先
+            low_memory: 省メモリモードかどうか
+        """
+        self.memory = memory
+        self.low_memory = low_memory
+        self._sprites: Dict[Tuple[str, int], pygame.Surface] = {}
+
+    def load_scaled(self, path, width: int, owner: str) -> Optional[pygame.Surface]:
+        """
+        画像を読み込み、縦横比を保って指定の幅に拡大縮小する
+
+        Args:
+            path: 画像のパス
+            width: 拡大縮小後の幅
+            owner: 画像を使う画面の名前（集計用）
+
+        Returns:
+            拡大縮小した画像（読み込めなかった場合はNone）
+        """
+        key = (str(path), int(width))
+        if self.low_memory and key in self._sprites:
+            return self._sprites[key]
+
+        try:
+            image = pygame.image.load(str(path))
+        except Exception as e:
+            print(f"Warning: Could not load image from {path}: {e}")
+            return None
+        height = width * image.get_height() / image.get_width()
+        sprite = pygame.transform.scale(image, (width, height))
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert_alpha()
+
+        name = f"{Path(path).stem}@{int(width)}"
+        if self.low_memory:
+            self._sprites[key] = sprite
+            self.memory.track("sprites", name, sprite)
+        else:
+            self.memory.track(owner, name, sprite)
+        return sprite
+
+    def rotation_frames(self, sprite: pygame.Surface, name: str, base_angle: float, flip_x: bool,
+                        owner: str, spread: float = CAR_WOBBLE_DEGREES) -> "RotationFrames":
+        """
+        画像を回転した絵を角度の刻みごとに用意する（省メモリモードでは刻みを粗くする）
+
+        画面が作られていれば（サーフェスに描画する場合）ここですべての角度を描画しておく。
+        テクスチャに描画する場合はレンダラーが回転するので、絵は作らない。
+
+        Args:
+            sprite: 画像
+            name: 画像の名前（集計用）
+            base_angle: 中心にする角度（度）
+            flip_x: 左右反転するかどうか
+            owner: 画像を使う画面の名前（集計用）
+            spread: 用意する角度の幅（中心からの片側、度）
+
+        Returns:
+            回転した絵のキャッシュ
+        """
+        step = CAR_FRAME_STEP_LOW_MEMORY if self.low_memory else CAR_FRAME_STEP
+        return RotationFrames(sprite, base_angle, spread, step, flip_x, name=name,
+                              track=partial(self.memory.track, owner), transient=self.memory.transient,
+                              prerender=pygame.display.get_surface() is not None)
+
+    def prerender_decorations(self, decorations: List[Tuple[str, int, int, int, int]], color: Tuple[int, ...],
+                              owner: str) -> Optional[List[Tuple[pygame.Surface, Tuple[int, int]]]]:
+        """
+        省メモリモードの場合のみ、装飾を事前描画する
+
+        Args:
+            decorations: generate_decorations が返す装飾のリスト
+            color: 装飾の色
+            owner: 装飾を使う画面の名前（集計用）
+
+        Returns:
+            事前描画した装飾（通常モードではNone）
+        """
+        if not self.low_memory:
+            return None
+        sprites = prerender_decorations(decorations, color, BACKGROUND_COLOR)
+        for i, (sprite, _) in enumerate(sprites):
+            self.memory.track(owner, f"decoration{i}", sprite)
+        return sprites
+
+
+def prerender_decorations(decorations: List[Tuple[str, int, int, int, int]], color: Tuple[int, ...],
+                          background: Tuple[int, int, int]) -> List[Tuple[pygame.Surface, Tuple[int, int]]]:
+    """
+    装飾の記号を8ビットのサーフェスに一度だけ描画しておく（省メモリモード用）
+
+    装飾は背景色で塗りつぶした直後に描画されるため、背景色を指定して描画すれば
+    背景色から装飾の色までの256段階のパレットを持つ8ビットのサーフェスになる。
+    1ピクセル1バイトで保持でき、毎フレームの文字の描画（一時サーフェスの作成）も不要になる。
+
+    Args:
+        decorations: generate_decorations が返す (記号, X座標, Y座標, サイズ, 透明度) のリスト
+        color: 装飾の色
+        background: 背景色
+
+    Returns:
+        Surface.blits にそのまま渡せる (サーフェス, 位置) のリスト
+    """
+    sprites = []
+    for symbol, x, y, size, _ in decorations:
+        sprite = get_font(size).render(symbol, True, color[:3], background)
+        sprite.set_colorkey(background)  # 背景色のままの部分は描画しない
+        sprites.append((sprite, (x, y)))
+    return sprites
+
+
+class RotationFrames:
+    """
+    画像を一定の角度刻みで回転（と左右反転）した絵を保持するクラス
+
+    中心の角度から片側 spread 度までを step 度刻みで回転しておき、描画のたびに
+    pygame.transform で変換する代わりに最も近い角度の絵を転送するだけにする。
+    角度の刻みは中心の角度を基準にするので、中心の角度では従来どおりの絵になる。
+    """
+
+    def __init__(self, surface: pygame.Surface, base_angle: float, spread: float, step: float,
+                 flip_x: bool = False, name: str = "sprite",
+                 track: Optional[Callable[[str, pygame.Surface], pygame.Surface]] = None,
+                 transient: Optional[Callable[[pygame.Surface], pygame.Surface]] = None,
+                 prerender: bool = True):
+        """
+        回転した絵のキャッシュの初期化
+
+        Args:
+            surface: 回転する前の画像
+            base_angle: 中心にする角度（度、pygame.transform.rotate と同じ向き）
+            spread: 用意する角度の幅（中心からの片側、度）
+            step: 角度の刻み（度）
+            flip_x: 左右反転するかどうか
+            name: 画像の名前（集計用）
+            track: 作った絵を登録する関数（MemoryAccounting.track の所有者を指定したもの）
+            transient: 描画中に作った絵を数える関数（MemoryAccounting.transient）
+            prerender: ここですべての角度を描画しておくかどうか（Falseなら初めて使うときに描画する）
+        """
+        self.surface = surface
+        self.base_angle = base_angle
+        self.step = step
+        self.flip_x = flip_x
+        self.name = name
+        self.track = track
+        self.transient = transient
+        self.side = int(spread // step)  # 中心の片側に用意する絵の数
+        self._frames: List[Optional[pygame.Surface]] = [None] * (self.side * 2 + 1)
+        self._flipped: Optional[pygame.Surface] = None
+        if prerender:
+            for index in range(len(self._frames)):
+                self._frame(index)
+
+    def _index(self, angle: float) -> int:
+        """角度に最も近い絵の番号（用意した範囲の外は端の絵）"""
+        index = round((angle - self.base_angle) / self.step) + self.side
+        return min(max(index, 0), len(self._frames) - 1)
+
+    def angle_of(self, index: int) -> float:
+        """絵の番号に対応する角度（度）"""
+        return self.base_angle + (index - self.side) * self.step
+
+    def _frame(self, index: int) -> pygame.Surface:
+        """番号の絵を取得する（まだなければ描画する）"""
+        frame = self._frames[index]
+        if frame is None:
+            source = self.surface
+            if self.flip_x:
+                # 反転は全角度で共通なので1回だけ行う
+                if self._flipped is None:
+                    self._flipped = self._created(f"{self.name}@flipped", pygame.transform.flip(source, True, False))
+                source = self._flipped
+            frame = self._frames[index] = self._created(f"{self.name}@{self.angle_of(index):g}deg",
+                                                        pygame.transform.rotate(source, self.angle_of(index)))
+        return frame
+
+    def _created(self, name: str, surface: pygame.Surface) -> pygame.Surface:
+        """作った絵を保持中のサーフェスとして登録し、描画中に作った分として数える"""
+        if self.track:
+            self.track(name, surface)
+        if self.transient:
+            self.transient(surface)
+        return surface
+
+    def frame(self, angle: float) -> pygame.Surface:
+        """
+        角度に最も近い回転済みの絵を取得する
+
+        Args:
+            angle: 反時計回りの回転角度（度）
+
+        Returns:
+            回転済みの絵
+        """
+        return self._frame(self._index(angle))
+
+    def blit(self, target, center, angle: float) -> pygame.Rect:
+        """
+        角度に最も近い絵を、中心を指定して描画する
+
+        Args:
+            target: 描画先（pygame.Surface または TextureCanvas）
+            center: 描画する中心の座標
+            angle: 反時計回りの回転角度（度）
+
+        Returns:
+            描画した領域の矩形
+        """
+        if not isinstance(target, pygame.Surface):
+            # テクスチャの描画先ではレンダラーが回転する（刻みはサーフェスと揃える）
+            return blit_rotated(target, self.surface, center, self.angle_of(self._index(angle)), self.flip_x,
+                                transient=self.transient)
+        frame = self.frame(angle)
+        rect = frame.get_rect(center=center)
+        target.blit(frame, rect)
+        return rect
@@ -0,0 +1,258 @@
+"""
+大量の値を一定のメモリで集計する統計処理を定義するモジュール
+"""
+import math
+from typing import List, Optional
+
+
+class StreamingHistogram:
+    """
+    固定幅の区間で値を数えるヒストグラム
+
+    区間の数は最初に決めた数から増えないため、何件追加してもメモリは一定。
+    同じ区間設定のヒストグラム同士は足し合わせられるので、
+    プロセスごとに集計した結果をまとめるのに使える。
+    """
+
+    def __init__(self, low: float = 0.0, high: float = 300.0, bins: int = 3000):
+        """
+        ヒストグラムの初期化
+
+        Args:
+            low: 最初の区間の下限
+            high: 最後の区間の上限（これ以上の値は上限超えとして数える）
+            bins: 区間の数
+        """
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self.width = (high - low) / bins
+        self.counts: List[int] = [0] * bins
+        self.underflow = 0
+        self.overflow = 0
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def add(self, value: float):
+        """
+        値を1件追加する
+
+        Args:
+            value: 追加する値
+        """
+        index = int((value - self.low) / self.width)
+        if index < 0:
+            self.underflow += 1
+        elif index >= self.bins:
+            self.overflow += 1
+        else:
+            self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.total_sq += value * value
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+
+    def add_array(self, values):
+        """
+        NumPy配列の値をまとめて追加する（大量の値を集計する場合用、NumPyが必要）
+
+        Args:
+            values: 追加する値の1次元配列
+        """
+        import numpy as np
+
+        values = np.asarray(values, dtype=np.float64)
+        if not values.size:
+            return
+        index = np.floor((values - self.low) / self.width)
+        self.underflow += int(np.count_nonzero(index < 0))
+        self.overflow += int(np.count_nonzero(index >= self.bins))
+        inside = index[(index >= 0) & (index < self.bins)].astype(np.int64)
+        counts = np.bincount(inside, minlength=self.bins)
+        self.counts = [a + int(b) for a, b in zip(self.counts, counts)]
+        self.count += int(values.size)
+        self.total += float(values.sum())
+        self.total_sq += float(np.dot(values, values))
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+
+    def merge(self, other: "StreamingHistogram"):
+        """
+        同じ区間設定の別のヒストグラムを足し合わせる
+
+        Args:
+            other: 足し合わせるヒストグラム
+        """
+        if (other.low, other.high, other.bins) != (self.low, self.high, self.bins):
+            raise ValueError("Histograms with different bin settings cannot be merged")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    @property
+    def mean(self) -> float:
+        """平均値"""
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def stdev(self) -> float:
+        """標準偏差"""
+        if self.count < 2:
+            return 0.0
+        variance = (self.total_sq - self.total * self.total / self.count) / (self.count - 1)
+        return math.sqrt(max(0.0, variance))
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """
+        区間内を線形補間して分位点を求める
+
+        Args:
+            fraction: 0〜1の割合（例: 0.5で中央値）
+
+        Returns:
+            分位点（値がない場合はNone）
+        """
+        if not self.count:
+            return None
+        target = fraction * self.count
+        cumulative = self.underflow
+        if cumulative >= target:
+            return self.minimum
+        for index, bin_count in enumerate(self.counts):
+            if bin_count and cumulative + bin_count >= target:
+                position = (target - cumulative) / bin_count
+                return self.low + (index + position) * self.width
+            cumulative += bin_count
+        return self.maximum
+
+    def to_dict(self, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95, 0.99)) -> dict:
+        """
+        書き出し用の辞書に変換する
+
+        Args:
+            quantiles: 出力する分位点
+
+        Returns:
+            要約統計と区間ごとの件数を含む辞書
+        """
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "stdev": self.stdev,
+            "min": self.minimum if self.count else None,
+            "max": self.maximum if self.count else None,
+            "quantiles": {str(q): self.quantile(q) for q in quantiles},
+            "bins": {"low": self.low, "high": self.high, "width": self.width},
+            "counts": self.counts,
+            "underflow": self.underflow,
+            "overflow": self.overflow
+        }
+
+
+class RunningStats:
+    """
+    件数・平均・分散をWelford法で逐次計算するクラス
+
+    値を保持せずに1件ずつ更新するため、何件追加してもメモリは一定。
+    二乗和から求める方法と違い、件数が多く値が近い場合も桁落ちしない。
+    別々に集計した結果は merge で足し合わせられる（Chanらの方法）。
+    """
+
+    __slots__ = ("count", "mean", "m2", "minimum", "maximum")
+
+    def __init__(self):
+        """集計の初期化"""
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # 平均からの偏差の二乗和
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def add(self, value: float):
+        """
+        値を1件追加する
+
+        Args:
+            value: 追加する値
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+
+    def add_array(self, values):
+        """
+        NumPy配列の値をまとめて追加する（大量の値を集計する場合用、NumPyが必要）
+
+        Args:
+            values: 追加する値の1次元配列
+        """
+        import numpy as np
+
+        values = np.asarray(values, dtype=np.float64)
+        if not values.size:
+            return
+        chunk = RunningStats()
+        chunk.count = int(values.size)
+        chunk.mean = float(values.mean())
+        chunk.m2 = float(np.square(values - chunk.mean).sum())
+        chunk.minimum = float(values.min())
+        chunk.maximum = float(values.max())
+        self.merge(chunk)
+
+    def merge(self, other: "RunningStats"):
+        """
+        別の集計結果を足し合わせる
+
+        Args:
+            other: 足し合わせる集計結果
+        """
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    @property
+    def variance(self) -> float:
+        """不偏分散"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        """標準偏差"""
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> dict:
+        """
+        書き出し用の辞書に変換する
+
+        Returns:
+            件数・平均・標準偏差・最小値・最大値の辞書
+        """
+        return {
+            "count": self.count,
+            "mean": self.mean if self.count else None,
+            "stdev": self.stdev,
+            "min": self.minimum if self.count else None,
+            "max": self.maximum if self.count else None
+        }
@@ -0,0 +1,90 @@
+"""
+半透明サーフェスを再利用するためのプールを定義するモジュール
+"""
+import pygame
+from typing import Dict, Optional, Tuple
+
+from number_drive.memory import MemoryAccounting
+
+
+class SurfacePool:
+    """
+    オーバーレイや光彩などの半透明レイヤーを保持するクラス
+
+    サイズと色の組み合わせごとに一度だけSRCALPHAサーフェスを作成して塗りつぶし、
+    以降のフレームでは同じサーフェスを返す。返されたサーフェスは共有されるため、
+    呼び出し側で描き換えてはいけない。
+    """
+
+    def __init__(self, memory: Optional[MemoryAccounting] = None):
+        """
+        サーフェスプールの初期化
+
+        Args:
+            memory: 新しく作ったサーフェスを数える集計先
+        """
+        self.memory = memory
+        self._surfaces: Dict[tuple, pygame.Surface] = {}
+
+    def get_overlay(self, size: Tuple[int, int], color: Tuple[int, int, int, int]) -> pygame.Surface:
+        """
+        全面を塗りつぶした半透明サーフェスを取得する
+
+        Args:
+            size: サーフェスのサイズ（幅, 高さ）
+            color: 塗りつぶし色（RGBA）
+
+        Returns:
+            塗りつぶし済みのサーフェス
+        """
+        size = (int(size[0]), int(size[1]))
+        key = ("overlay", size, tuple(color))
+        surface = self._surfaces.get(key)
+        if surface is None:
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            surface.fill(color)
+            self._surfaces[key] = surface
+            if self.memory is not None:
+                self.memory.transient(surface)
+        return surface
+
+    def get_rounded_rect(self, size: Tuple[int, int], color: Tuple[int, int, int, int],
+                         border_radius: int) -> pygame.Surface:
+        """
+        角丸長方形を描画済みの半透明サーフェスを取得する
+
+        Args:
+            size: サーフェスのサイズ（幅, 高さ）
+            color: 角丸長方形の色（RGBA）
+            border_radius: 角丸の半径
+
+        Returns:
+            角丸長方形を描画済みのサーフェス
+        """
+        size = (int(size[0]), int(size[1]))
+        key = ("rounded_rect", size, tuple(color), border_radius)
+        surface = self._surfaces.get(key)
+        if surface is None:
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.draw.rect(surface, color, (0, 0, size[0], size[1]), border_radius=border_radius)
+            self._surfaces[key] = surface
+            if self.memory is not None:
+                self.memory.transient(surface)
+        return surface
+
+    def surfaces(self):
+        """
+        保持しているサーフェスを列挙する（メモリ集計用）
+
+        Returns:
+            (名前, サーフェス) のリスト
+        """
+        return [(":".join(str(part) for part in key), surface) for key, surface in list(self._surfaces.items())]
+
+    def clear(self):
+        """保持しているサーフェスをすべて破棄する"""
+        self._surfaces.clear()
+
+    def __len__(self) -> int:
+        """保持しているサーフェスの数を返す"""
+        return len(self._surfaces)
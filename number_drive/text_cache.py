@@ -0,0 +1,79 @@
+"""
+描画済みの文字列を使い回すモジュール
+"""
+import pygame
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from number_drive.memory import MemoryAccounting
+
+# 描画済み文字列のキャッシュの利用状況（全キャッシュの合計）
+rendered_text_stats = {"hits": 0, "misses": 0}
+
+
+class TextCache:
+    """
+    Font.render の結果を (フォント, 文字列, 色) ごとに保持するクラス
+
+    見出しや操作ヘルプのように毎フレーム同じ文字列を描画する場合に、
+    ラスタライズを初回だけにする。返すサーフェスが同じなので、テクスチャで描画する場合も
+    テクスチャへの変換は初回だけになる。保持する数を超えたら使われていないものから捨てる。
+    """
+
+    def __init__(self, max_entries: int = 256, memory: Optional[MemoryAccounting] = None):
+        """
+        キャッシュの初期化
+
+        Args:
+            max_entries: 保持する文字列の数
+            memory: 新しく描画したサーフェスを数える集計先
+        """
+        self.max_entries = max_entries
+        self.memory = memory
+        self._surfaces: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+
+    def render(self, font: pygame.font.Font, text: str, color: Tuple[int, ...]) -> pygame.Surface:
+        """
+        文字列を描画したサーフェスを取得する（font.render(text, True, color) の代わり）
+
+        Args:
+            font: フォント（get_font で取得したもの）
+            text: 文字列
+            color: 文字色
+
+        Returns:
+            文字列を描画したサーフェス（共有されるため描き換えてはいけない）
+        """
+        key = (font, text, tuple(color))
+        surfaces = self._surfaces
+        surface = surfaces.get(key)
+        if surface is not None:
+            rendered_text_stats["hits"] += 1
+            surfaces.move_to_end(key)
+            return surface
+        rendered_text_stats["misses"] += 1
+
+        surface = surfaces[key] = font.render(text, True, color)
+        if self.memory is not None:
+            self.memory.transient(surface)
+        if len(surfaces) > self.max_entries:
+            surfaces.popitem(last=False)
+        return surface
+
+    def surfaces(self):
+        """
+        保持しているサーフェスを列挙する（メモリ集計用）
+
+        Returns:
+            (名前, サーフェス) のリスト
+        """
+        return [(f"text:{font.get_height()}:{text}", surface)
+                for (font, text, _), surface in list(self._surfaces.items())]
+
+    def clear(self):
+        """保持しているサーフェスをすべて破棄する"""
+        self._surfaces.clear()
+
+    def __len__(self) -> int:
+        """保持している文字列の数を返す"""
+        return len(self._surfaces)
@@ -0,0 +1,3 @@
+"""
+ゲーム本体とは別に実行する分析・開発用のツール
+"""
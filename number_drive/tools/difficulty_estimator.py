@@ -0,0 +1,211 @@
+"""
+ゲームモードごとのクリアタイムをモンテカルロ法で推定するツール
+
+ゲーム本体と同じ出題ルール（generate_questions）で問題を作り、プレイヤーモデルで
+クリアタイムをシミュレーションする。セッションは一定数ごとのシャードに分けて
+ProcessPoolExecutor で並列に実行し、モードごとのヒストグラムに足し合わせる。
+
+    python -m number_drive.tools.difficulty_estimator --sessions 1000000 --workers 8
+    python -m number_drive.tools.difficulty_estimator --model mypackage.models:FastPlayer
+    python -m number_drive.tools.difficulty_estimator --type-ahead --auto-submit
+"""
+import argparse
+import importlib
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from number_drive.difficulty import LinearPlayerModel, simulate_session
+from number_drive.game_enums import GameMode
+from number_drive.number_plate import generate_questions
+from number_drive.plate_sampler import DifficultyWeightedSampler
+from number_drive.stats import StreamingHistogram
+
+# ヒストグラムの区間設定（クリアタイム 0〜300秒を0.1秒刻み）
+HISTOGRAM_LOW = 0.0
+HISTOGRAM_HIGH = 300.0
+HISTOGRAM_BINS = 3000
+
+DEFAULT_MODEL = "number_drive.difficulty:LinearPlayerModel"
+
+
+def load_model(spec: str):
+    """
+    "モジュール:クラス" 形式の指定からプレイヤーモデルを作成する
+
+    Args:
+        spec: プレイヤーモデルの指定
+
+    Returns:
+        プレイヤーモデルのインスタンス
+    """
+    module_name, _, attribute = spec.partition(":")
+    if not attribute:
+        raise ValueError(f"Model must be given as 'module:Class', got {spec!r}")
+    factory = getattr(importlib.import_module(module_name), attribute)
+    return factory()
+
+
+def run_shard(mode_name: str, shard: int, sessions: int, seed: int, model_spec: str,
+              weighted_plates: bool = False, type_ahead: bool = False,
+              auto_submit: bool = False) -> Tuple[str, StreamingHistogram]:
+    """
+    1シャード分のセッションをシミュレーションする（ワーカープロセスで実行）
+
+    Args:
+        mode_name: ゲームモードの名前
+        shard: シャード番号（乱数の系列を分けるのに使う）
+        sessions: シミュレーションするセッション数
+        seed: 全体のシード
+        model_spec: プレイヤーモデルの指定
+        weighted_plates: 難しさの目標分布に従って出題するかどうか
+        type_ahead: マルバツの表示中に打ったキーが適用されるかどうか
+        auto_submit: 答えと同じ文字数を入力したら自動で確定するかどうか
+
+    Returns:
+        ゲームモードの名前とクリアタイムのヒストグラム
+    """
+    mode = GameMode[mode_name]
+    model = load_model(model_spec)
+    sampler = DifficultyWeightedSampler() if weighted_plates else None
+    rng = random.Random(f"{seed}:{mode_name}:{shard}")
+    histogram = StreamingHistogram(HISTOGRAM_LOW, HISTOGRAM_HIGH, HISTOGRAM_BINS)
+    for _ in range(sessions):
+        plates = generate_questions(mode, rng, sampler)
+        histogram.add(simulate_session(model, plates, rng, type_ahead, auto_submit))
+    return mode_name, histogram
+
+
+def plan_shards(modes: List[str], sessions: int, shard_size: int) -> List[Tuple[str, int, int]]:
+    """
+    モードごとのセッションをシャードに分割する
+
+    Args:
+        modes: ゲームモードの名前
+        sessions: モードごとのセッション数
+        shard_size: 1シャードあたりのセッション数
+
+    Returns:
+        (モード名, シャード番号, セッション数) のリスト
+    """
+    shards = []
+    for mode_name in modes:
+        remaining = sessions
+        shard = 0
+        while remaining > 0:
+            count = min(shard_size, remaining)
+            shards.append((mode_name, shard, count))
+            remaining -= count
+            shard += 1
+    return shards
+
+
+def estimate(modes: List[str], sessions: int, workers: int, shard_size: int, seed: int,
+             model_spec: str, weighted_plates: bool = False, type_ahead: bool = False,
+             auto_submit: bool = False) -> Dict[str, StreamingHistogram]:
+    """
+    全シャードを並列に実行し、モードごとにヒストグラムを足し合わせる
+
+    Args:
+        modes: ゲームモードの名前
+        sessions: モードごとのセッション数
+        workers: ワーカープロセス数（1ならプロセスを使わずに実行）
+        shard_size: 1シャードあたりのセッション数
+        seed: 全体のシード
+        model_spec: プレイヤーモデルの指定
+        weighted_plates: 難しさの目標分布に従って出題するかどうか
+        type_ahead: マルバツの表示中に打ったキーが適用されるかどうか
+        auto_submit: 答えと同じ文字数を入力したら自動で確定するかどうか
+
+    Returns:
+        モード名ごとのクリアタイムのヒストグラム
+    """
+    results = {mode_name: StreamingHistogram(HISTOGRAM_LOW, HISTOGRAM_HIGH, HISTOGRAM_BINS) for mode_name in modes}
+    shards = plan_shards(modes, sessions, shard_size)
+
+    if workers <= 1:
+        for mode_name, shard, count in shards:
+            _, histogram = run_shard(mode_name, shard, count, seed, model_spec, weighted_plates,
+                                     type_ahead, auto_submit)
+            results[mode_name].merge(histogram)
+        return results
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed  # 並列に実行するときだけ読み込む
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(run_shard, mode_name, shard, count, seed, model_spec, weighted_plates,
+                            type_ahead, auto_submit)
+            for mode_name, shard, count in shards
+        ]
+        # 終わったシャードから順に足し合わせる（結果を溜め込まない）
+        for future in as_completed(futures):
+            mode_name, histogram = future.result()
+            results[mode_name].merge(histogram)
+    return results
+
+
+def parse_args(argv=None):
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description="ゲームモードごとのクリアタイムをモンテカルロ法で推定する")
+    parser.add_argument("--sessions", type=int, default=100000, help="モードごとにシミュレーションするセッション数")
+    parser.add_argument("--modes", nargs="+", default=[mode.name for mode in GameMode],
+                        type=str.upper, choices=[mode.name for mode in GameMode], help="対象のゲームモード")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="ワーカープロセス数")
+    parser.add_argument("--shard-size", type=int, default=20000, help="1シャードあたりのセッション数")
+    parser.add_argument("--seed", type=int, default=0, help="乱数のシード")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="プレイヤーモデル（'モジュール:クラス'）")
+    parser.add_argument("--weighted-plates", action="store_true", help="難しさの目標分布に従って出題する")
+    parser.add_argument("--type-ahead", action="store_true",
+                        help="マルバツの表示中に打ったキーが次の問題に適用されるものとして計算する")
+    parser.add_argument("--auto-submit", action="store_true",
+                        help="答えと同じ文字数を入力したら自動で確定するものとして計算する")
+    parser.add_argument("--json", metavar="PATH", help="ヒストグラムを含む結果をJSONで書き出す")
+    args = parser.parse_args(argv)
+    for name in ("sessions", "workers", "shard_size"):
+        if getattr(args, name) < 1:
+            parser.error(f"--{name.replace('_', '-')} must be at least 1")
+    return args
+
+
+def main(argv=None):
+    """メイン関数"""
+    args = parse_args(argv)
+    load_model(args.model)  # ワーカーを起動する前に指定の誤りを検出する
+    if args.weighted_plates:
+        DifficultyWeightedSampler()  # 難しさのテーブルを先にキャッシュしておく
+
+    start = time.perf_counter()
+    results = estimate(args.modes, args.sessions, args.workers, args.shard_size, args.seed, args.model,
+                       args.weighted_plates, args.type_ahead, args.auto_submit)
+    elapsed = time.perf_counter() - start
+
+    total_sessions = args.sessions * len(args.modes)
+    print(f"{total_sessions} sessions in {elapsed:.2f} s "
+          f"({total_sessions / elapsed:,.0f} sessions/s, {args.workers} workers)")
+    for mode_name in args.modes:
+        histogram = results[mode_name]
+        print(f"{mode_name:<8} mean={histogram.mean:6.2f}s sd={histogram.stdev:5.2f}s "
+              f"p5={histogram.quantile(0.05):6.2f}s p50={histogram.quantile(0.5):6.2f}s "
+              f"p95={histogram.quantile(0.95):6.2f}s")
+
+    if args.json:
+        report = {
+            "sessions_per_mode": args.sessions,
+            "seed": args.seed,
+            "model": args.model,
+            "weighted_plates": args.weighted_plates,
+            "type_ahead": args.type_ahead,
+            "auto_submit": args.auto_submit,
+            "elapsed_seconds": elapsed,
+            "modes": {mode_name: results[mode_name].to_dict() for mode_name in args.modes}
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,373 @@
+"""
+描画結果を基準画像（ゴールデンフレーム）と比較するツール
+
+シードを固定したゲームで各画面・各難易度・フィードバックやモーダルの状態を
+ヘッドレス（SDLのdummyドライバー）で描画し、コミット済みのPNGとピクセル単位で比較する。
+差分の計算は pygame.surfarray と NumPy でまとめて行うため、全パターンを数秒で確認できる。
+描画の最適化（キャッシュ・アトラスなど）で見た目が変わっていないことの確認に使う。
+
+    python -m number_drive.tools.golden_frames
+    python -m number_drive.tools.golden_frames --only "playing_*" --diff-dir /tmp/golden_diff
+    python -m number_drive.tools.golden_frames --update   # 基準画像を作り直す
+
+プレートの文字はシステムの Arial（なければ代替フォント）で描画されるため、
+フォント環境の異なるマシンでは --update で基準画像を作り直してから使う。
+テクスチャ描画（--display texture）はレンダラーごとに回転・拡大縮小の補間が異なり
+基準画像と一致しないため対象外（サーフェスへの描画 window / canvas だけを比較する）。
+"""
+import argparse
+import fnmatch
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from number_drive.config import BASE_DIR, CAR_DRIVE_SECONDS, CAR_WOBBLE_PERIOD, LOGIC_HZ
+from number_drive.game_enums import GameMode, GameState, RunType
+from number_drive.number_plate import MODE_OPERATION_MIX, stream_questions
+
+# 基準画像の保存先
+GOLDEN_DIR = BASE_DIR / "golden_frames"
+
+# 基準画像を描画するときのシード
+GOLDEN_SEED = 2024
+
+# 差分の判定（チャンネルごとの差の許容値と、許容値を超えてよいピクセルの割合）
+DEFAULT_TOLERANCE = 8
+DEFAULT_MAX_FRACTION = 0.0005
+
+# 出題の乱数を探す回数の上限（最初の問題がその難易度で加わる演算になるまで）
+QUESTION_SEED_ATTEMPTS = 1000
+
+
+class FrameDiff:
+    """1枚の描画結果と基準画像の差分"""
+
+    def __init__(self, max_diff: int, bad_pixels: int, total_pixels: int, bad_mask=None):
+        """
+        差分の初期化
+
+        Args:
+            max_diff: チャンネルごとの差の最大値
+            bad_pixels: 許容値を超えたピクセル数
+            total_pixels: 全ピクセル数
+            bad_mask: 許容値を超えたピクセルの真偽値配列（幅 × 高さ）
+        """
+        self.max_diff = max_diff
+        self.bad_pixels = bad_pixels
+        self.total_pixels = total_pixels
+        self.bad_mask = bad_mask
+
+    @property
+    def bad_fraction(self) -> float:
+        """許容値を超えたピクセルの割合"""
+        return self.bad_pixels / self.total_pixels if self.total_pixels else 0.0
+
+
+def compare_frames(expected: pygame.Surface, actual: pygame.Surface, tolerance: int) -> FrameDiff:
+    """
+    2枚の画像をピクセル単位で比較する
+
+    Args:
+        expected: 基準画像
+        actual: 描画結果
+        tolerance: チャンネルごとの差の許容値
+
+    Returns:
+        差分（サイズが異なる場合は全ピクセルを不一致とする）
+    """
+    import numpy as np
+
+    if expected.get_size() != actual.get_size():
+        total = actual.get_width() * actual.get_height()
+        return FrameDiff(255, total, total)
+
+    a = pygame.surfarray.array3d(expected).astype(np.int16)
+    b = pygame.surfarray.array3d(actual).astype(np.int16)
+    per_pixel = np.abs(a - b).max(axis=2)
+    bad_mask = per_pixel > tolerance
+    return FrameDiff(int(per_pixel.max()), int(bad_mask.sum()), per_pixel.size, bad_mask)
+
+
+def diff_image(actual: pygame.Surface, diff: FrameDiff) -> pygame.Surface:
+    """
+    不一致のピクセルを赤く塗った確認用の画像を作る
+
+    Args:
+        actual: 描画結果
+        diff: compare_frames の結果
+
+    Returns:
+        描画結果を暗くして、不一致のピクセルを赤にした画像
+    """
+    pixels = pygame.surfarray.array3d(actual) // 3
+    if diff.bad_mask is not None:
+        pixels[diff.bad_mask] = (255, 0, 0)
+    return pygame.surfarray.make_surface(pixels)
+
+
+def _question_rng(game, name: str, mode: GameMode):
+    """
+    最初の問題がその難易度で加わる演算（MODE_OPERATION_MIX の最後の演算）になる出題の乱数を作る
+
+    難易度ごとの基準画像に、足し算・引き算・掛け算・割り算のプレートがそれぞれ写るようにする。
+
+    Args:
+        game: ゲームのインスタンス
+        name: 乱数の用途の名前
+        mode: 難易度
+
+    Returns:
+        乱数生成器
+    """
+    operation = MODE_OPERATION_MIX[mode][-1][0]
+    for attempt in range(QUESTION_SEED_ATTEMPTS):
+        rng_name = f"{name}:{attempt}"
+        first = next(stream_questions(mode, game.create_rng(rng_name), game.plate_sampler))
+        if first.operation_type == operation:
+            return game.create_rng(rng_name)
+    raise RuntimeError(f"No {name} seed starts {mode.name} with {operation.name}")
+
+
+def _reset_game(game, mode: GameMode):
+    """ケースごとに、前のケースの影響が残らないようロジック時計と出題の乱数を戻す"""
+    game.logic_ticks = 0
+    game._logic_accumulator = 0.0
+    game.game_mode = mode
+    game.run_type = RunType.STANDARD
+    game.game_screen.question_rng = _question_rng(game, "questions", mode)
+    game.versus_screen.question_rng = _question_rng(game, "versus_questions", mode)
+    game.game_screen.session.feedback = None
+    game.game_screen.session.feedback_time = None
+    game.game_screen.show_modal = False
+
+
+def _setup_title(game, mode: GameMode):
+    """タイトル画面（難易度を選択した状態）"""
+    game.change_state(GameState.TITLE)
+    game.title_screen.selected_mode = list(GameMode).index(mode)
+    game.title_screen.hovered_button = None
+
+
+def _setup_title_wobble(game, mode: GameMode):
+    """タイトル画面（車が揺れている途中）"""
+    _setup_title(game, mode)
+    game.logic_ticks += int(LOGIC_HZ * CAR_WOBBLE_PERIOD * 0.3)
+
+
+def _setup_prepare(game, mode: GameMode):
+    """準備画面（スタート待ち）"""
+    game.change_state(GameState.PREPARE)
+
+
+def _setup_countdown(game, mode: GameMode):
+    """準備画面（カウントダウン中）"""
+    game.change_state(GameState.PREPARE)
+    game.prepare_screen.waiting_for_start = False
+    game.prepare_screen.start_time = game.logic_time
+
+
+def _setup_playing(game, mode: GameMode):
+    """ゲーム画面（入力中）"""
+    game.change_state(GameState.PLAYING)
+    game.game_screen.session.current_input = "12"
+
+
+def _setup_correct(game, mode: GameMode):
+    """ゲーム画面（正解のフィードバック）"""
+    game.change_state(GameState.PLAYING)
+    game.game_screen.session.feedback = True
+    game.game_screen.session.feedback_time = game.logic_time
+
+
+def _setup_driving(game, mode: GameMode):
+    """ゲーム画面（正解して車が走り抜けている途中）"""
+    game.change_state(GameState.PLAYING)
+    game.game_screen.session.feedback = True
+    game.game_screen.session.feedback_time = game.logic_time
+    game.game_screen.car_drive_start = game.logic_time
+    game.logic_ticks += int(LOGIC_HZ * CAR_DRIVE_SECONDS * 0.4)
+
+
+def _setup_wrong(game, mode: GameMode):
+    """ゲーム画面（不正解のフィードバック）"""
+    game.change_state(GameState.PLAYING)
+    game.game_screen.session.current_input = "-7"
+    game.game_screen.session.feedback = False
+    game.game_screen.session.feedback_time = game.logic_time
+
+
+def _setup_paused(game, mode: GameMode):
+    """ゲーム画面（一時停止のモーダル）"""
+    game.change_state(GameState.PLAYING)
+    game.game_screen.show_modal = True
+    game.game_screen._setup_modal_buttons()
+    game.game_screen.selected_button_index = 1
+
+
+def _setup_versus(game, mode: GameMode):
+    """対戦画面（左は入力中、右は正解のフィードバック）"""
+    game.run_type = RunType.VERSUS
+    game.change_state(GameState.VERSUS)
+    left, right = game.versus_screen.sessions
+    left.current_input = "12"
+    right.feedback = True
+    right.feedback_time = game.logic_time
+
+
+def _setup_versus_result(game, mode: GameMode):
+    """対戦の結果画面"""
+    game.run_type = RunType.VERSUS
+    game.set_clear_time(42.5)
+    game.versus_winner = 1
+    game.versus_scores = (7, 10)
+    game.change_state(GameState.RESULT)
+
+
+def _setup_result(game, mode: GameMode):
+    """結果画面"""
+    game.set_clear_time(42.5)
+    game.change_state(GameState.RESULT)
+
+
+# 画面の状態ごとの準備（難易度ごとに描画する）
+SCENES: List[Tuple[str, Callable]] = [
+    ("title", _setup_title),
+    ("title_wobble", _setup_title_wobble),
+    ("prepare", _setup_prepare),
+    ("countdown", _setup_countdown),
+    ("playing", _setup_playing),
+    ("correct", _setup_correct),
+    ("driving", _setup_driving),
+    ("wrong", _setup_wrong),
+    ("paused", _setup_paused),
+    ("result", _setup_result),
+    ("versus", _setup_versus),
+    ("versus_result", _setup_versus_result),
+]
+
+
+def build_cases(pattern: Optional[str] = None) -> List[Tuple[str, Callable, GameMode]]:
+    """
+    比較するケースの一覧を作る
+
+    Args:
+        pattern: ケース名を絞り込むワイルドカード（例: "playing_*"）
+
+    Returns:
+        (ケース名, 準備する関数, 難易度) のリスト
+    """
+    cases = [
+        (f"{scene}_{mode.name.lower()}", setup, mode)
+        for scene, setup in SCENES
+        for mode in GameMode
+    ]
+    if pattern:
+        cases = [case for case in cases if fnmatch.fnmatch(case[0], pattern)]
+    return cases
+
+
+def render_case(game, setup: Callable, mode: GameMode) -> pygame.Surface:
+    """
+    1つのケースを描画する
+
+    Args:
+        game: ゲームのインスタンス
+        setup: 画面の状態を準備する関数
+        mode: 難易度
+
+    Returns:
+        描画結果（論理サイズのサーフェスの複製）
+    """
+    _reset_game(game, mode)
+    setup(game, mode)
+    game.render()
+    screen = game.screen
+    if isinstance(screen, pygame.Surface):
+        return screen.copy()
+    return screen.to_surface()
+
+
+def parse_args(argv=None):
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description="描画結果を基準画像と比較する")
+    parser.add_argument("--update", action="store_true", help="比較せずに基準画像を書き直す")
+    parser.add_argument("--golden-dir", type=Path, default=GOLDEN_DIR, help="基準画像のディレクトリ")
+    parser.add_argument("--only", metavar="PATTERN", help="ケース名を絞り込む（例: 'playing_*'）")
+    parser.add_argument("--tolerance", type=int, default=DEFAULT_TOLERANCE,
+                        help="チャンネルごとの差の許容値（0〜255）")
+    parser.add_argument("--max-fraction", type=float, default=DEFAULT_MAX_FRACTION,
+                        help="許容値を超えてよいピクセルの割合")
+    parser.add_argument("--diff-dir", type=Path, help="不一致だったケースの描画結果と差分画像の出力先")
+    parser.add_argument("--display", choices=["window", "canvas"], default="window",
+                        help="描画方式（基準画像は window で作成する、テクスチャ描画は対象外）")
+    parser.add_argument("--low-memory", action="store_true", help="省メモリモードで描画する")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """
+    メイン関数
+
+    Returns:
+        終了コード（不一致や基準画像の欠落があれば1）
+    """
+    args = parse_args(argv)
+    try:
+        import numpy  # noqa: F401  pygame.surfarray が使う
+    except ImportError:
+        print("golden_frames requires numpy (uv sync --extra tools, or pip install numpy)")
+        return 1
+
+    from number_drive.game import Game
+
+    start = time.perf_counter()
+    pygame.init()
+    game = Game(seed=GOLDEN_SEED, display_mode=args.display, low_memory=args.low_memory)
+    cases = build_cases(args.only)
+    if not cases:
+        print(f"No cases match {args.only!r}")
+        return 1
+
+    if args.update:
+        args.golden_dir.mkdir(parents=True, exist_ok=True)
+        for name, setup, mode in cases:
+            pygame.image.save(render_case(game, setup, mode), str(args.golden_dir / f"{name}.png"))
+        print(f"Updated {len(cases)} golden frames in {args.golden_dir} ({time.perf_counter() - start:.2f} s)")
+        return 0
+
+    failures = 0
+    for name, setup, mode in cases:
+        actual = render_case(game, setup, mode)
+        golden_path = args.golden_dir / f"{name}.png"
+        if not golden_path.exists():
+            print(f"MISSING {name}: {golden_path} (run with --update)")
+            failures += 1
+            continue
+
+        diff = compare_frames(pygame.image.load(str(golden_path)), actual, args.tolerance)
+        if diff.bad_fraction <= args.max_fraction:
+            print(f"ok      {name} (max diff {diff.max_diff})")
+            continue
+
+        failures += 1
+        print(f"FAIL    {name}: {diff.bad_pixels} pixels ({diff.bad_fraction:.3%}) differ by more than "
+              f"{args.tolerance}, max diff {diff.max_diff}")
+        if args.diff_dir:
+            args.diff_dir.mkdir(parents=True, exist_ok=True)
+            pygame.image.save(actual, str(args.diff_dir / f"{name}.actual.png"))
+            pygame.image.save(diff_image(actual, diff), str(args.diff_dir / f"{name}.diff.png"))
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(cases) - failures}/{len(cases)} frames match ({elapsed:.2f} s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+"""
+記録したプレイ（main.py の --record）を動画やPNG連番に書き出すツール
+
+記録を実際の画面クラスでヘッドレスに再生し、指定したフレームレートの時刻ごとに描画する。
+フレームは一定数ごとのチャンクに分けて ProcessPoolExecutor で並列に描画し、各ワーカーは
+シードとイベントの列からチャンクの先頭の時刻までロジックだけを進めて状態を作り直す
+（ワーカーの再生状態はチャンクをまたいで使い回すので、前に進む分だけで済む）。
+
+描画したフレームは、PNG連番ならワーカーがそのまま書き出し、MP4/GIFなら圧縮して
+メインプロセスに返し、順番どおりに ffmpeg の標準入力へ流す。同時に処理中のチャンクは
+ワーカー数の2倍までなので、記録の長さによらずメモリ使用量は一定。
+
+    python -m number_drive.tools.replay_export play.jsonl play.mp4
+    python -m number_drive.tools.replay_export play.jsonl play.gif --fps 15 --scale 0.5
+    python -m number_drive.tools.replay_export play.jsonl frames/ --start 30 --duration 10
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from number_drive.config import LOGIC_HZ, SCREEN_HEIGHT, SCREEN_WIDTH
+from number_drive.replay import Recording, SessionReplay
+
+# 出力先の拡張子ごとの ffmpeg の出力オプション（それ以外はPNG連番のディレクトリとして扱う）
+ENCODER_OPTIONS = {
+    ".mp4": ["-c:v", "libx264", "-pix_fmt", "yuv420p", "-movflags", "+faststart"],
+    ".gif": ["-vf", "split[a][b];[a]palettegen[p];[b][p]paletteuse"],
+}
+
+# PNG連番のファイル名
+FRAME_NAME = "frame_{:06d}.png"
+
+# ワーカープロセスごとの再生状態（チャンクをまたいで使い回す）
+_replay: Optional[SessionReplay] = None
+_replay_path: Optional[str] = None
+
+
+def plan_frames(start_tick: int, end_tick: int, fps: float) -> List[int]:
+    """
+    フレームごとに描画するロジックのティック数を求める
+
+    Args:
+        start_tick: 最初のフレームのティック数
+        end_tick: 最後のティック数（これを超えるフレームは作らない）
+        fps: 出力のフレームレート
+
+    Returns:
+        フレーム順のティック数のリスト
+    """
+    ticks = []
+    index = 0
+    while True:
+        tick = start_tick + round(index * LOGIC_HZ / fps)
+        if tick > end_tick:
+            return ticks
+        ticks.append(tick)
+        index += 1
+
+
+def plan_chunks(ticks: Sequence[int], chunk_frames: int) -> List[Tuple[int, List[int]]]:
+    """
+    フレームを連続したチャンクに分割する
+
+    Args:
+        ticks: フレーム順のティック数
+        chunk_frames: 1チャンクあたりのフレーム数
+
+    Returns:
+        (最初のフレーム番号, ティック数のリスト) のリスト
+    """
+    return [(first, list(ticks[first:first + chunk_frames])) for first in range(0, len(ticks), chunk_frames)]
+
+
+def _worker_replay(path: str) -> SessionReplay:
+    """このプロセスの再生状態を取得する（初回、または別の記録なら作り直す）"""
+    global _replay, _replay_path
+    if _replay is None or _replay_path != path:
+        _replay = SessionReplay(Recording.load(path))
+        _replay_path = path
+    return _replay
+
+
+def render_chunk(path: str, first_frame: int, ticks: List[int], size: Tuple[int, int],
+                 png_dir: Optional[str] = None) -> Tuple[int, List[bytes]]:
+    """
+    1チャンク分のフレームを描画する（ワーカープロセスで実行する）
+
+    Args:
+        path: 記録のパス
+        first_frame: 最初のフレーム番号
+        ticks: 描画するティック数（昇順）
+        size: 出力する (幅, 高さ)
+        png_dir: PNG連番の出力先（Noneならフレームを返す）
+
+    Returns:
+        (最初のフレーム番号, zlibで圧縮したRGBのバイト列のリスト（PNG連番では空）)
+    """
+    replay = _worker_replay(path)
+    scaled = pygame.Surface(size) if size != (SCREEN_WIDTH, SCREEN_HEIGHT) else None
+    frames = []
+    for index, tick in enumerate(ticks, first_frame):
+        surface = replay.render(tick)
+        if not isinstance(surface, pygame.Surface):
+            surface = surface.to_surface()
+        if scaled is not None:
+            pygame.transform.smoothscale(surface, size, scaled)
+            surface = scaled
+        if png_dir is not None:
+            pygame.image.save(surface, os.path.join(png_dir, FRAME_NAME.format(index)))
+        else:
+            frames.append(zlib.compress(pygame.image.tostring(surface, "RGB"), 1))
+    return first_frame, frames
+
+
+def iter_chunks(executor: Optional[Executor], chunks: Sequence[Tuple[int, List[int]]], window: int,
+                path: str, size: Tuple[int, int], png_dir: Optional[str]) -> Iterator[Tuple[int, List[bytes]]]:
+    """
+    チャンクを並列に描画し、フレーム順に結果を返す
+
+    同時に投入するチャンクは window 個までにして、先に終わったチャンクの結果が溜まり続けないようにする。
+
+    Args:
+        executor: ワーカープロセスのプール（Noneならこのプロセスで順に描画する）
+        chunks: plan_chunks の結果
+        window: 同時に投入するチャンク数
+        path: 記録のパス
+        size: 出力する (幅, 高さ)
+        png_dir: PNG連番の出力先（Noneならフレームを返す）
+
+    Yields:
+        render_chunk の結果（フレーム順）
+    """
+    if executor is None:
+        for first, ticks in chunks:
+            yield render_chunk(path, first, ticks, size, png_dir)
+        return
+
+    remaining = iter(chunks)
+    pending = deque()
+    for first, ticks in remaining:
+        pending.append(executor.submit(render_chunk, path, first, ticks, size, png_dir))
+        if len(pending) >= window:
+            break
+    while pending:
+        result = pending.popleft().result()
+        # 1つ受け取ったら次のチャンクを1つ投入する
+        for first, ticks in remaining:
+            pending.append(executor.submit(render_chunk, path, first, ticks, size, png_dir))
+            break
+        yield result
+
+
+def open_encoder(ffmpeg: str, output: Path, size: Tuple[int, int], fps: float) -> subprocess.Popen:
+    """
+    RGBの生フレームを標準入力から受け取る ffmpeg を起動する
+
+    Args:
+        ffmpeg: ffmpeg の実行ファイル
+        output: 出力先（拡張子で形式を決める）
+        size: フレームの (幅, 高さ)
+        fps: フレームレート
+
+    Returns:
+        起動したプロセス
+    """
+    command = [
+        ffmpeg, "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{size[0]}x{size[1]}", "-r", str(fps), "-i", "-",
+        *ENCODER_OPTIONS[output.suffix.lower()], str(output)
+    ]
+    return subprocess.Popen(command, stdin=subprocess.PIPE)
+
+
+def parse_args(argv=None):
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description="記録したプレイを動画やPNG連番に書き出す")
+    parser.add_argument("recording", type=Path, help="main.py の --record で記録したファイル")
+    parser.add_argument("output", type=Path,
+                        help="出力先（.mp4 / .gif なら ffmpeg で動画に、それ以外はPNG連番のディレクトリ）")
+    parser.add_argument("--fps", type=float, default=30.0, help="出力のフレームレート")
+    parser.add_argument("--scale", type=float, default=1.0, help="出力の倍率（論理サイズに対する）")
+    parser.add_argument("--start", type=float, default=0.0, help="書き出しを始める時刻（秒）")
+    parser.add_argument("--duration", type=float, help="書き出す長さ（秒、省略時は記録の終わりまで）")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="ワーカープロセス数")
+    parser.add_argument("--chunk-frames", type=int, default=60, help="1チャンクあたりのフレーム数")
+    parser.add_argument("--ffmpeg", default="ffmpeg", help="ffmpeg の実行ファイル")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """
+    メイン関数
+
+    Returns:
+        終了コード
+    """
+    args = parse_args(argv)
+    try:
+        recording = Recording.load(args.recording)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Could not load recording {args.recording}: {e}")
+        return 1
+
+    encode = args.output.suffix.lower() in ENCODER_OPTIONS
+    ffmpeg = shutil.which(args.ffmpeg) if encode else None
+    if encode and ffmpeg is None:
+        print(f"{args.ffmpeg} was not found; install ffmpeg or give a directory to write a PNG sequence")
+        return 1
+
+    # yuv420p は幅と高さが偶数である必要があるので、偶数に切り下げる
+    size = (max(2, int(SCREEN_WIDTH * args.scale)) // 2 * 2, max(2, int(SCREEN_HEIGHT * args.scale)) // 2 * 2)
+    start_tick = round(args.start * LOGIC_HZ)
+    end_tick = recording.end_tick
+    if args.duration is not None:
+        end_tick = min(end_tick, start_tick + round(args.duration * LOGIC_HZ))
+    ticks = plan_frames(start_tick, end_tick, args.fps)
+    if not ticks:
+        print(f"No frames to export (recording is {recording.end_tick / LOGIC_HZ:.1f} s long)")
+        return 1
+    chunks = plan_chunks(ticks, max(1, args.chunk_frames))
+
+    png_dir = None
+    encoder = None
+    if encode:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        encoder = open_encoder(ffmpeg, args.output, size, args.fps)
+    else:
+        args.output.mkdir(parents=True, exist_ok=True)
+        png_dir = str(args.output)
+
+    start = time.perf_counter()
+    executor = None
+    if args.workers > 1 and len(chunks) > 1:
+        from concurrent.futures import ProcessPoolExecutor  # 並列に実行するときだけ読み込む
+        executor = ProcessPoolExecutor(max_workers=args.workers)
+    frames = 0
+    try:
+        for _, chunk_frames in iter_chunks(executor, chunks, args.workers * 2, str(args.recording), size, png_dir):
+            for frame in chunk_frames:
+                encoder.stdin.write(zlib.decompress(frame))
+        frames = len(ticks)
+    except BrokenPipeError:
+        print(f"{args.ffmpeg} exited before all frames were written")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if encoder is not None:
+            try:
+                encoder.stdin.close()
+            except BrokenPipeError:
+                pass
+            if encoder.wait() != 0:
+                print(f"{args.ffmpeg} failed with exit code {encoder.returncode}")
+                frames = 0
+    if not frames:
+        return 1
+
+    elapsed = time.perf_counter() - start
+    print(f"{frames} frames ({(ticks[-1] - ticks[0]) / LOGIC_HZ:.1f} s of play, {size[0]}x{size[1]} @ {args.fps:g} fps) "
+          f"in {elapsed:.2f} s ({frames / elapsed:.1f} frames/s, {args.workers} workers) -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
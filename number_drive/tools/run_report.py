@@ -0,0 +1,641 @@
+"""
+プレイの記録（main.py の --run-log）を集計するツール
+
+難易度ごとのクリアタイムの分位点、演算ごとの解答時間、数字の大きさごとの誤答率、
+日ごとの推移を求める。集計の方法は2通りある。
+
+- JSON Lines をそのまま読む: 1行ずつ生成器で読みながら、Welford法の平均・分散と
+  固定区間のヒストグラム（分位点）に足し込むので、件数によらずメモリは一定。
+  ファイルが複数あれば --workers でファイルごとに並列に集計して足し合わせる。
+- 列ごとのバイナリに変換してから読む: --export-columns で一度だけ変換しておくと、
+  --columns で numpy.memmap として開き、一定行数ずつNumPyでまとめて集計する。
+  数千万件のプレイでも数秒で集計できる（NumPyが必要）。
+
+    python -m number_drive.tools.run_report runs.jsonl
+    python -m number_drive.tools.run_report kiosk-*.jsonl.gz --workers 4 --json report.json
+    python -m number_drive.tools.run_report runs.jsonl --export-columns runs_columns
+    python -m number_drive.tools.run_report --columns runs_columns
+"""
+import argparse
+import datetime
+import gzip
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from number_drive.game_enums import GameMode, RunType
+from number_drive.number_plate import OperationType
+from number_drive.run_log import QUESTION_RECORD, RUN_RECORD
+from number_drive.stats import RunningStats, StreamingHistogram
+
+# 分位点を求めるヒストグラムの区間設定（下限, 上限, 区間の数）
+CLEAR_TIME_BINS = (0.0, 300.0, 3000)   # クリアタイム 0〜300秒を0.1秒刻み
+SOLVE_TIME_BINS = (0.0, 60.0, 6000)    # 1問の解答時間 0〜60秒を0.01秒刻み
+
+# 出力する分位点
+QUANTILES = (0.5, 0.9, 0.99)
+
+# 誤答率を集計する数字の区切り（大きい方の数字を10ごとに分ける）
+OPERAND_BUCKETS = 10
+
+# 列ごとのバイナリの形式（列名: NumPyの型）
+RUN_COLUMNS = {"mode": "i1", "type": "i1", "day": "i4", "time": "f4", "questions": "i4", "wrong": "i4"}
+QUESTION_COLUMNS = {"op": "i1", "a": "i2", "b": "i2", "sec": "f4", "wrong": "i2"}
+
+# 列ごとのバイナリを集計するときの1回あたりの行数
+CHUNK_ROWS = 1 << 22
+
+MODES = [mode.name for mode in GameMode]
+RUN_TYPES = [run_type.name for run_type in RunType]
+OPERATIONS = [operation.name for operation in OperationType]
+
+
+def operand_bucket(a: int, b: int) -> int:
+    """
+    誤答率を集計する数字の区分を求める
+
+    Args:
+        a: 前の数字
+        b: 後ろの数字
+
+    Returns:
+        大きい方の数字の10の位（0〜OPERAND_BUCKETS - 1）
+    """
+    return min(max(a, b) // 10, OPERAND_BUCKETS - 1)
+
+
+def operand_label(bucket: int) -> str:
+    """数字の区分の表示名（例: "20-29"）"""
+    return f"{bucket * 10}-{bucket * 10 + 9}"
+
+
+class TimeSummary:
+    """平均・標準偏差（Welford法）と分位点（ヒストグラム）をまとめて集計する"""
+
+    def __init__(self, bins: Tuple[float, float, int]):
+        """
+        集計の初期化
+
+        Args:
+            bins: 分位点を求めるヒストグラムの区間設定
+        """
+        self.stats = RunningStats()
+        self.histogram = StreamingHistogram(*bins)
+
+    def add(self, value: float):
+        """値を1件追加する"""
+        self.stats.add(value)
+        self.histogram.add(value)
+
+    def add_array(self, values):
+        """NumPy配列の値をまとめて追加する"""
+        self.stats.add_array(values)
+        self.histogram.add_array(values)
+
+    def merge(self, other: "TimeSummary"):
+        """別の集計結果を足し合わせる"""
+        self.stats.merge(other.stats)
+        self.histogram.merge(other.histogram)
+
+    def to_dict(self) -> dict:
+        """件数・平均・標準偏差・最小値・最大値と分位点の辞書に変換する"""
+        result = self.stats.to_dict()
+        for q in QUANTILES:
+            value = self.histogram.quantile(q)
+            if value is not None:
+                # 区間内の補間で実際の最小値・最大値をはみ出さないようにする
+                value = min(max(value, self.stats.minimum), self.stats.maximum)
+            result[f"p{round(q * 100)}"] = value
+        return result
+
+
+class DaySummary:
+    """1日分のプレイの集計"""
+
+    __slots__ = ("runs", "clear_time", "questions", "wrong")
+
+    def __init__(self):
+        """集計の初期化"""
+        self.runs = 0
+        self.clear_time = RunningStats()  # 10問のプレイのクリアタイム
+        self.questions = 0
+        self.wrong = 0
+
+    def merge(self, other: "DaySummary"):
+        """別の集計結果を足し合わせる"""
+        self.runs += other.runs
+        self.clear_time.merge(other.clear_time)
+        self.questions += other.questions
+        self.wrong += other.wrong
+
+
+class RunHistoryReport:
+    """
+    プレイの記録の集計
+
+    記録を1件ずつ add するか、列ごとの配列を add_run_columns / add_question_columns で
+    まとめて足し込む。保持するのは集計値だけなので、記録の件数によらずメモリは一定
+    （日ごとの集計だけは日数に比例する）。
+    """
+
+    def __init__(self):
+        """集計の初期化"""
+        self.records = 0
+        self.skipped = 0  # 読めなかった行・知らない値の記録
+        self.clear_time = {mode: TimeSummary(CLEAR_TIME_BINS) for mode in MODES}
+        self.solve_time = {operation: TimeSummary(SOLVE_TIME_BINS) for operation in OPERATIONS}
+        # 演算・数字の区分ごとの [問題数, 誤答数の合計, 誤答のあった問題数]
+        self.wrong_by_operand = {operation: [[0, 0, 0] for _ in range(OPERAND_BUCKETS)]
+                                 for operation in OPERATIONS}
+        self.days: Dict[str, DaySummary] = {}
+
+    def add(self, record: dict):
+        """
+        記録を1件集計する
+
+        Args:
+            record: run_log の1行分の記録
+        """
+        # 値の検証を先に済ませ、壊れた記録は集計に含めない
+        try:
+            kind = record["t"]
+            if kind == QUESTION_RECORD:
+                solve_time = self.solve_time[record["op"]]
+                seconds = float(record["sec"])
+                wrong = int(record["wrong"])
+                counts = self.wrong_by_operand[record["op"]][operand_bucket(int(record["a"]), int(record["b"]))]
+            elif kind == RUN_RECORD:
+                clear_time = self.clear_time[record["mode"]]
+                standard = record["type"] == RunType.STANDARD.name
+                seconds = float(record["time"])
+                questions = int(record.get("questions", 0))
+                wrong = int(record.get("wrong", 0))
+                label = str(record["day"])
+            else:
+                raise ValueError(kind)
+        except (KeyError, TypeError, ValueError):
+            self.skipped += 1
+            return
+
+        self.records += 1
+        if kind == QUESTION_RECORD:
+            solve_time.add(seconds)
+            counts[0] += 1
+            counts[1] += wrong
+            counts[2] += wrong > 0
+            return
+
+        day = self.days.get(label)
+        if day is None:
+            day = self.days[label] = DaySummary()
+        day.runs += 1
+        day.questions += questions
+        day.wrong += wrong
+        if standard:
+            clear_time.add(seconds)
+            day.clear_time.add(seconds)
+
+    def add_run_columns(self, columns: Dict[str, "object"]):
+        """
+        プレイの記録の列をまとめて集計する（NumPyが必要）
+
+        Args:
+            columns: RUN_COLUMNS の列名ごとの配列（同じ長さ）
+        """
+        import numpy as np
+
+        mode, run_type, day, clear_time = columns["mode"], columns["type"], columns["day"], columns["time"]
+        self.records += len(mode)
+        standard = run_type == RUN_TYPES.index(RunType.STANDARD.name)
+        for code, name in enumerate(MODES):
+            self.clear_time[name].add_array(clear_time[standard & (mode == code)])
+
+        # 日ごとの集計は日付の番号でまとめて数える（日数分のループで配列全体を見ない）
+        days, inverse = np.unique(day, return_inverse=True)
+        inverse = inverse.ravel()
+        runs = np.bincount(inverse, minlength=len(days))
+        questions = np.bincount(inverse, weights=columns["questions"], minlength=len(days))
+        wrong = np.bincount(inverse, weights=columns["wrong"], minlength=len(days))
+        clear_stats = _grouped_stats(inverse[standard], clear_time[standard], len(days))
+        for i, day_number in enumerate(days):
+            label = (datetime.date(1970, 1, 1) + datetime.timedelta(days=int(day_number))).isoformat()
+            summary = DaySummary()
+            summary.runs = int(runs[i])
+            summary.questions = int(questions[i])
+            summary.wrong = int(wrong[i])
+            summary.clear_time = clear_stats[i]
+            self._merge_day(label, summary)
+
+    def add_question_columns(self, columns: Dict[str, "object"]):
+        """
+        問題ごとの記録の列をまとめて集計する（NumPyが必要）
+
+        Args:
+            columns: QUESTION_COLUMNS の列名ごとの配列（同じ長さ）
+        """
+        import numpy as np
+
+        operation, seconds, wrong = columns["op"], columns["sec"], columns["wrong"]
+        self.records += len(operation)
+        buckets = np.minimum(np.maximum(columns["a"], columns["b"]).astype(np.int64) // 10, OPERAND_BUCKETS - 1)
+        keys = operation.astype(np.int64) * OPERAND_BUCKETS + buckets
+        size = len(OPERATIONS) * OPERAND_BUCKETS
+        questions = np.bincount(keys, minlength=size)
+        wrong_total = np.bincount(keys, weights=wrong, minlength=size)
+        wrong_questions = np.bincount(keys, weights=wrong > 0, minlength=size)
+        for code, name in enumerate(OPERATIONS):
+            self.solve_time[name].add_array(seconds[operation == code])
+            for bucket in range(OPERAND_BUCKETS):
+                key = code * OPERAND_BUCKETS + bucket
+                counts = self.wrong_by_operand[name][bucket]
+                counts[0] += int(questions[key])
+                counts[1] += int(wrong_total[key])
+                counts[2] += int(wrong_questions[key])
+
+    def _merge_day(self, label: str, summary: DaySummary):
+        """日ごとの集計を足し合わせる"""
+        day = self.days.get(label)
+        if day is None:
+            self.days[label] = summary
+        else:
+            day.merge(summary)
+
+    def merge(self, other: "RunHistoryReport"):
+        """
+        別の集計結果を足し合わせる（ファイルごとに並列に集計した結果をまとめる）
+
+        Args:
+            other: 足し合わせる集計結果
+        """
+        self.records += other.records
+        self.skipped += other.skipped
+        for mode in MODES:
+            self.clear_time[mode].merge(other.clear_time[mode])
+        for operation in OPERATIONS:
+            self.solve_time[operation].merge(other.solve_time[operation])
+            for counts, other_counts in zip(self.wrong_by_operand[operation], other.wrong_by_operand[operation]):
+                for i, value in enumerate(other_counts):
+                    counts[i] += value
+        for label, summary in other.days.items():
+            self._merge_day(label, summary)
+
+    def to_dict(self) -> dict:
+        """
+        書き出し用の辞書に変換する
+
+        Returns:
+            集計結果の辞書
+        """
+        wrong_by_operand = {}
+        for operation in OPERATIONS:
+            rows = {}
+            for bucket, (questions, wrong, wrong_questions) in enumerate(self.wrong_by_operand[operation]):
+                if questions:
+                    rows[operand_label(bucket)] = {
+                        "questions": questions,
+                        "wrong_per_question": wrong / questions,
+                        "wrong_rate": wrong_questions / questions
+                    }
+            wrong_by_operand[operation] = rows
+
+        return {
+            "records": self.records,
+            "skipped": self.skipped,
+            "clear_time": {mode: self.clear_time[mode].to_dict() for mode in MODES},
+            "solve_time": {operation: self.solve_time[operation].to_dict() for operation in OPERATIONS},
+            "wrong_by_operand": wrong_by_operand,
+            "days": {
+                label: {
+                    "runs": day.runs,
+                    "mean_clear_time": day.clear_time.mean if day.clear_time.count else None,
+                    "questions": day.questions,
+                    "wrong_per_question": day.wrong / day.questions if day.questions else None
+                }
+                for label, day in sorted(self.days.items())
+            }
+        }
+
+
+def _grouped_stats(groups, values, size: int) -> List[RunningStats]:
+    """
+    グループごとの件数・平均・分散・最小値・最大値をまとめて求める（NumPyが必要）
+
+    Args:
+        groups: 値ごとのグループ番号（0〜size - 1）
+        values: 値
+        size: グループの数
+
+    Returns:
+        グループごとの集計結果
+    """
+    import numpy as np
+
+    values = np.asarray(values, dtype=np.float64)
+    counts = np.bincount(groups, minlength=size)
+    sums = np.bincount(groups, weights=values, minlength=size)
+    means = np.divide(sums, counts, out=np.zeros(size), where=counts > 0)
+    m2 = np.bincount(groups, weights=np.square(values - means[groups]), minlength=size)
+    minimum = np.full(size, np.inf)
+    maximum = np.full(size, -np.inf)
+    np.minimum.at(minimum, groups, values)
+    np.maximum.at(maximum, groups, values)
+
+    results = []
+    for i in range(size):
+        stats = RunningStats()
+        if counts[i]:
+            stats.count = int(counts[i])
+            stats.mean = float(means[i])
+            stats.m2 = float(m2[i])
+            stats.minimum = float(minimum[i])
+            stats.maximum = float(maximum[i])
+        results.append(stats)
+    return results
+
+
+def read_records(paths: Iterable[Path]) -> Iterator[Optional[dict]]:
+    """
+    記録のファイルを1行ずつ読む（.gz は展開しながら読む）
+
+    Args:
+        paths: JSON Lines のファイルのパス
+
+    Yields:
+        1行分の記録（読めなかった行はNone）
+    """
+    for path in paths:
+        opener = gzip.open if str(path).endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield None
+
+
+def summarize_files(paths: List[str]) -> RunHistoryReport:
+    """
+    記録のファイルを読んで集計する（ワーカープロセスでも実行される）
+
+    Args:
+        paths: JSON Lines のファイルのパス
+
+    Returns:
+        集計結果
+    """
+    report = RunHistoryReport()
+    add = report.add
+    for record in read_records(Path(path) for path in paths):
+        if isinstance(record, dict):
+            add(record)
+        else:
+            report.skipped += 1
+    return report
+
+
+def summarize_parallel(paths: List[str], workers: int) -> RunHistoryReport:
+    """
+    ファイルごとに並列に集計して足し合わせる
+
+    Args:
+        paths: JSON Lines のファイルのパス
+        workers: ワーカープロセス数（1ならプロセスを使わずに実行）
+
+    Returns:
+        集計結果
+    """
+    if workers <= 1 or len(paths) <= 1:
+        return summarize_files(paths)
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed  # 並列に実行するときだけ読み込む
+
+    report = RunHistoryReport()
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+        futures = [executor.submit(summarize_files, [path]) for path in paths]
+        # 終わったファイルから順に足し合わせる（結果を溜め込まない）
+        for future in as_completed(futures):
+            report.merge(future.result())
+    return report
+
+
+class _ColumnWriter:
+    """列ごとのバイナリファイルに一定行数ずつ書き足す"""
+
+    def __init__(self, directory: Path, prefix: str, columns: Dict[str, str]):
+        """
+        書き込みの初期化
+
+        Args:
+            directory: 出力先のディレクトリ
+            prefix: ファイル名の接頭辞（"runs" または "questions"）
+            columns: 列名と型
+        """
+        self.columns = columns
+        self.rows = 0
+        self._buffers: Dict[str, list] = {name: [] for name in columns}
+        self._files = {name: open(directory / f"{prefix}.{name}.bin", "wb") for name in columns}
+
+    def append(self, values: Tuple):
+        """1行分の値（columns の順）を追加する"""
+        for buffer, value in zip(self._buffers.values(), values):
+            buffer.append(value)
+        self.rows += 1
+        if self.rows % CHUNK_ROWS == 0:
+            self.flush()
+
+    def flush(self):
+        """溜まった行を書き出す"""
+        import numpy as np
+
+        for name, dtype in self.columns.items():
+            np.asarray(self._buffers[name], dtype=dtype).tofile(self._files[name])
+            self._buffers[name].clear()
+
+    def close(self):
+        """残りの行を書き出してファイルを閉じる"""
+        self.flush()
+        for f in self._files.values():
+            f.close()
+
+
+def export_columns(records: Iterable[Optional[dict]], directory: Path) -> Tuple[int, int]:
+    """
+    記録を列ごとのバイナリファイルに変換する（一定行数ずつ書き出すのでメモリは一定）
+
+    Args:
+        records: read_records で読んだ記録
+        directory: 出力先のディレクトリ
+
+    Returns:
+        (プレイの記録の数, 問題ごとの記録の数)
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    runs = _ColumnWriter(directory, "runs", RUN_COLUMNS)
+    questions = _ColumnWriter(directory, "questions", QUESTION_COLUMNS)
+    epoch = datetime.date(1970, 1, 1).toordinal()
+    skipped = 0
+    for record in records:
+        try:
+            if record["t"] == QUESTION_RECORD:
+                questions.append((OPERATIONS.index(record["op"]), record["a"], record["b"],
+                                  record["sec"], record["wrong"]))
+            elif record["t"] == RUN_RECORD:
+                day = datetime.date.fromisoformat(record["day"]).toordinal() - epoch
+                runs.append((MODES.index(record["mode"]), RUN_TYPES.index(record["type"]), day,
+                             record["time"], record.get("questions", 0), record.get("wrong", 0)))
+            else:
+                skipped += 1
+        except (KeyError, TypeError, ValueError):
+            skipped += 1
+    runs.close()
+    questions.close()
+
+    meta = {
+        "runs": runs.rows, "questions": questions.rows, "skipped": skipped,
+        "run_columns": RUN_COLUMNS, "question_columns": QUESTION_COLUMNS,
+        "modes": MODES, "run_types": RUN_TYPES, "operations": OPERATIONS
+    }
+    with open(directory / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return runs.rows, questions.rows
+
+
+def summarize_columns(directory: Path) -> RunHistoryReport:
+    """
+    列ごとのバイナリファイルを memmap で開き、CHUNK_ROWS 行ずつ集計する
+
+    Args:
+        directory: export_columns の出力先
+
+    Returns:
+        集計結果
+    """
+    import numpy as np
+
+    with open(directory / "meta.json", encoding="utf-8") as f:
+        meta = json.load(f)
+    if (meta["modes"], meta["run_types"], meta["operations"]) != (MODES, RUN_TYPES, OPERATIONS):
+        raise ValueError(f"{directory} was exported with different enum values, export it again")
+
+    report = RunHistoryReport()
+    report.skipped = meta["skipped"]
+    for prefix, columns, rows, add in (
+        ("runs", meta["run_columns"], meta["runs"], report.add_run_columns),
+        ("questions", meta["question_columns"], meta["questions"], report.add_question_columns),
+    ):
+        if not rows:
+            continue
+        arrays = {name: np.memmap(directory / f"{prefix}.{name}.bin", dtype=dtype, mode="r", shape=(rows,))
+                  for name, dtype in columns.items()}
+        for start in range(0, rows, CHUNK_ROWS):
+            add({name: array[start:start + CHUNK_ROWS] for name, array in arrays.items()})
+    return report
+
+
+def _format_seconds(value: Optional[float]) -> str:
+    """秒数を表の1マス分の文字列にする"""
+    return f"{value:8.2f}" if value is not None else f"{'-':>8}"
+
+
+def format_report(report: dict) -> str:
+    """
+    集計結果を表形式の文字列にする
+
+    Args:
+        report: RunHistoryReport.to_dict の結果
+
+    Returns:
+        表示用の文字列
+    """
+    lines = [f"{report['records']:,} records ({report['skipped']:,} skipped)", "",
+             "Clear time (10-question runs, seconds)",
+             f"{'mode':<15}{'runs':>10}{'mean':>8}{'sd':>8}{'p50':>8}{'p90':>8}{'p99':>8}"]
+    for name, summary in report["clear_time"].items():
+        lines.append(f"{name:<15}{summary['count']:>10,}{_format_seconds(summary['mean'])}"
+                     f"{summary['stdev']:8.2f}{_format_seconds(summary['p50'])}"
+                     f"{_format_seconds(summary['p90'])}{_format_seconds(summary['p99'])}")
+
+    lines += ["", "Solve time per question (seconds)",
+              f"{'operation':<15}{'questions':>10}{'mean':>8}{'sd':>8}{'p50':>8}{'p90':>8}{'p99':>8}"]
+    for name, summary in report["solve_time"].items():
+        lines.append(f"{name:<15}{summary['count']:>10,}{_format_seconds(summary['mean'])}"
+                     f"{summary['stdev']:8.2f}{_format_seconds(summary['p50'])}"
+                     f"{_format_seconds(summary['p90'])}{_format_seconds(summary['p99'])}")
+
+    lines += ["", "Wrong attempts by larger operand",
+              f"{'operation':<15}{'operand':>8}{'questions':>10}{'wrong/q':>9}{'rate':>8}"]
+    for name, rows in report["wrong_by_operand"].items():
+        for label, row in rows.items():
+            lines.append(f"{name:<15}{label:>8}{row['questions']:>10,}{row['wrong_per_question']:9.3f}"
+                         f"{row['wrong_rate']:8.1%}")
+
+    lines += ["", "Daily trend",
+              f"{'day':<12}{'runs':>8}{'clear':>8}{'questions':>10}{'wrong/q':>9}"]
+    for label, day in report["days"].items():
+        wrong = f"{day['wrong_per_question']:9.3f}" if day["wrong_per_question"] is not None else f"{'-':>9}"
+        lines.append(f"{label:<12}{day['runs']:>8,}{_format_seconds(day['mean_clear_time'])}"
+                     f"{day['questions']:>10,}{wrong}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description="プレイの記録（--run-log）を集計する")
+    parser.add_argument("logs", nargs="*", help="JSON Lines の記録ファイル（.gz も可）")
+    parser.add_argument("--columns", type=Path, metavar="DIR",
+                        help="--export-columns で変換した列ごとのファイルを集計する（NumPyが必要）")
+    parser.add_argument("--export-columns", type=Path, metavar="DIR",
+                        help="記録を列ごとのバイナリファイルに変換する（集計はしない、NumPyが必要）")
+    parser.add_argument("--workers", type=int, default=1, help="ファイルごとに並列に集計するワーカープロセス数")
+    parser.add_argument("--json", metavar="PATH", help="集計結果をJSONで書き出す")
+    args = parser.parse_args(argv)
+    if not args.logs and not args.columns:
+        parser.error("give log files or --columns DIR")
+    if args.export_columns and not args.logs:
+        parser.error("--export-columns needs log files")
+    return args
+
+
+def main(argv=None) -> int:
+    """
+    メイン関数
+
+    Returns:
+        終了コード
+    """
+    args = parse_args(argv)
+    if args.columns or args.export_columns:
+        try:
+            import numpy  # noqa: F401  列ごとの読み書きに使う
+        except ImportError:
+            print("--columns and --export-columns require numpy (uv sync --extra tools, or pip install numpy)")
+            return 1
+
+    start = time.perf_counter()
+    if args.export_columns:
+        runs, questions = export_columns(read_records(Path(path) for path in args.logs), args.export_columns)
+        print(f"Exported {runs:,} runs and {questions:,} questions to {args.export_columns} "
+              f"({time.perf_counter() - start:.2f} s)")
+        return 0
+
+    if args.columns:
+        report = summarize_columns(args.columns)
+    else:
+        report = summarize_parallel(args.logs, args.workers)
+    result = report.to_dict()
+    elapsed = time.perf_counter() - start
+
+    print(format_report(result))
+    print(f"\n{report.records:,} records in {elapsed:.2f} s ({report.records / max(elapsed, 1e-9):,.0f} records/s)")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())